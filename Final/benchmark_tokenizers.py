@@ -0,0 +1,253 @@
+# benchmark_tokenizers.py
+# Banc d'essai commun des tokeniseurs (regex base/base1/base2, spaCy, mBERT)
+# sur les mêmes tranches du corpus BioMedTok/Wikipedia, de taille croissante.
+#
+# Pour chaque (tokeniseur, taille de tranche) on mesure dans un processus neuf :
+#   - tokens/s, nombre de tokens et de types
+#   - pic de RSS (et surcoût par rapport au RSS après chargement du tokeniseur)
+# puis on ajuste la loi de Heaps V(N) = K * N^beta sur la plus grande tranche.
+# Sorties : tableau CSV + JSON et figures de comparaison dans OUT_DIR.
+
+import argparse
+import csv
+import json
+import math
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+from freq_store import TokenFreqStore
+from regex_tokenizer import make_regex_tokenizer
+
+# ---------- CONFIG ----------
+DATASET = "BioMedTok/Wikipedia"
+SLICE_SIZES = [100, 250, 500, 1000]
+VARIANTS = ["base", "base1", "base2", "spacy", "mbert"]
+SPACY_MODEL = "fr_core_news_sm"
+MBERT_MODEL = "bert-base-multilingual-cased"
+OUT_DIR = Path(__file__).resolve().parent.parent / "sortie" / "benchmark"
+HEAPS_POINTS = 60  # points (log-espacés) de la courbe de croissance du vocabulaire
+# ----------------------------
+
+LABELS = {
+    "base": "lower-punct",
+    "base1": "lower-punct-digit",
+    "base2": "lower-punct-digit-web",
+    "spacy": "spacy-raw",
+    "mbert": "subword-mbert",
+}
+
+
+# --- Tokeniseurs --------------------------------------------------------------
+
+def make_spacy_tokenizer():
+    """Reproduit split_text_spacy de exo1_exo2_spaCy.py (tokenisation brute, sans espaces)."""
+    import spacy
+    nlp = spacy.load(SPACY_MODEL)
+
+    def split_text(texts):
+        tokens = []
+        for doc in nlp.pipe(texts):
+            tokens.extend(tok.text for tok in doc if not tok.is_space)
+        return tokens
+    return split_text
+
+
+def make_mbert_tokenizer():
+    """Reproduit split_text de exo1_exo2_Bert.py (sous-mots mBERT, sans tokens spéciaux)."""
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(MBERT_MODEL)
+
+    def split_text(texts):
+        enc = tokenizer(
+            list(texts),
+            add_special_tokens=False,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        )
+        tokens = []
+        for ids in enc["input_ids"]:
+            tokens.extend(tokenizer.convert_ids_to_tokens(ids))
+        return tokens
+    return split_text
+
+
+def make_tokenizer(variant: str):
+    if variant in ("base", "base1", "base2"):
+        return make_regex_tokenizer(variant)
+    if variant == "spacy":
+        return make_spacy_tokenizer()
+    if variant == "mbert":
+        return make_mbert_tokenizer()
+    raise ValueError(f"Tokeniseur inconnu : {variant}")
+
+
+# --- Mesures ------------------------------------------------------------------
+
+def rss_mb() -> float:
+    """Pic de RSS du processus courant en Mo (ru_maxrss est en Ko sous Linux, en octets sous macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def vocab_growth_points(tokens, n_points: int = HEAPS_POINTS):
+    """Courbe (tokens lus, types vus) échantillonnée sur une grille log-espacée."""
+    n = len(tokens)
+    if n == 0:
+        return [], []
+    marks = sorted({max(1, int(round(n ** (i / (n_points - 1))))) for i in range(n_points)})
+    xs, ys = [], []
+    seen = set()
+    j = 0
+    for i, tok in enumerate(tokens, 1):
+        seen.add(tok)
+        if i == marks[j]:
+            xs.append(i)
+            ys.append(len(seen))
+            j += 1
+            if j == len(marks):
+                break
+    return xs, ys
+
+
+def fit_heaps(xs, ys):
+    """Ajuste log V = log K + beta log N par moindres carrés. Retourne (K, beta, r2)."""
+    pts = [(math.log(x), math.log(y)) for x, y in zip(xs, ys) if x > 0 and y > 0]
+    if len(pts) < 2:
+        return float("nan"), float("nan"), float("nan")
+    n = len(pts)
+    mx = sum(p[0] for p in pts) / n
+    my = sum(p[1] for p in pts) / n
+    sxx = sum((p[0] - mx) ** 2 for p in pts)
+    sxy = sum((p[0] - mx) * (p[1] - my) for p in pts)
+    beta = sxy / sxx if sxx else float("nan")
+    log_k = my - beta * mx
+    ss_tot = sum((p[1] - my) ** 2 for p in pts)
+    ss_res = sum((p[1] - (log_k + beta * p[0])) ** 2 for p in pts)
+    r2 = 1 - ss_res / ss_tot if ss_tot else float("nan")
+    return math.exp(log_k), beta, r2
+
+
+def run_one(variant: str, texts: list, with_growth: bool) -> dict:
+    """Exécuté dans un processus neuf : charge le tokeniseur, tokenise la tranche, mesure."""
+    split_text = make_tokenizer(variant)
+    rss_loaded = rss_mb()
+
+    start = time.perf_counter()
+    tokens = split_text(texts)
+    elapsed = time.perf_counter() - start
+
+    counter = TokenFreqStore()
+    counter.update(tokens)
+    row = {
+        "variant": variant,
+        "label": LABELS[variant],
+        "examples": len(texts),
+        "tokens": len(tokens),
+        "types": len(counter),
+        "time_s": elapsed,
+        "tokens_per_s": len(tokens) / elapsed if elapsed > 0 else float("nan"),
+        "peak_rss_mb": rss_mb(),
+        "tokenizer_rss_mb": rss_loaded,
+        "top20": counter.top_k(20),
+    }
+    row["delta_rss_mb"] = row["peak_rss_mb"] - rss_loaded
+    if with_growth:
+        row["growth"] = vocab_growth_points(tokens)
+    return row
+
+
+def load_texts(n: int) -> list:
+    from datasets import load_dataset
+    ds_train = load_dataset(DATASET)["train"]
+    return ds_train.select(range(n))["text"]
+
+
+# --- Sorties ------------------------------------------------------------------
+
+def write_results(rows: list, heaps: dict, out_dir: Path) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    fields = ["variant", "label", "examples", "tokens", "types", "time_s", "tokens_per_s",
+              "peak_rss_mb", "tokenizer_rss_mb", "delta_rss_mb", "heaps_k", "heaps_beta", "heaps_r2"]
+    with open(out_dir / "results.csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for r in rows:
+            writer.writerow({**r, **heaps.get(r["variant"], {})})
+    with open(out_dir / "results.json", "w", encoding="utf-8") as f:
+        json.dump({"rows": rows, "heaps": heaps}, f, ensure_ascii=False, indent=2)
+
+
+def plot_results(rows: list, heaps: dict, out_dir: Path) -> None:
+    import matplotlib.pyplot as plt
+
+    variants = list(dict.fromkeys(r["variant"] for r in rows))
+    fig, axes = plt.subplots(1, 3, figsize=(16, 4.5))
+    for v in variants:
+        sub = [r for r in rows if r["variant"] == v]
+        xs = [r["examples"] for r in sub]
+        axes[0].plot(xs, [r["tokens_per_s"] for r in sub], marker="o", label=LABELS[v])
+        axes[1].plot(xs, [r["peak_rss_mb"] for r in sub], marker="o", label=LABELS[v])
+        if "growth" in heaps.get(v, {}):
+            gx, gy = heaps[v]["growth"]
+            axes[2].loglog(gx, gy, label=f"{LABELS[v]} (β={heaps[v]['heaps_beta']:.3f})")
+    axes[0].set_title("Débit")
+    axes[0].set_xlabel("Nombre d'exemples")
+    axes[0].set_ylabel("Tokens / s")
+    axes[1].set_title("Pic de RSS")
+    axes[1].set_xlabel("Nombre d'exemples")
+    axes[1].set_ylabel("Mo")
+    axes[2].set_title("Loi de Heaps (plus grande tranche)")
+    axes[2].set_xlabel("Nombre de tokens lus")
+    axes[2].set_ylabel("Nombre de types")
+    for ax in axes:
+        ax.grid(True, alpha=0.3)
+        ax.legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(out_dir / "benchmark_tokenizers.png", dpi=150)
+    plt.close(fig)
+
+
+def main(sizes: list, variants: list, out_dir: Path, plot: bool) -> None:
+    sizes = sorted(sizes)
+    texts = load_texts(sizes[-1])
+    ctx = get_context("spawn")
+
+    rows = []
+    heaps = {}
+    for v in variants:
+        for n in sizes:
+            # Un processus par mesure : le pic de RSS n'est pas pollué par les mesures précédentes
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                row = pool.submit(run_one, v, texts[:n], n == sizes[-1]).result()
+            growth = row.pop("growth", None)
+            if growth:
+                k, beta, r2 = fit_heaps(*growth)
+                heaps[v] = {"heaps_k": k, "heaps_beta": beta, "heaps_r2": r2, "growth": growth}
+            rows.append(row)
+            print(f"# {row['label']} examples: {n} tokens: {row['tokens']} types: {row['types']} "
+                  f"time: {row['time_s']:.2f} (s) tok/s: {row['tokens_per_s']:,.0f} "
+                  f"peak RSS: {row['peak_rss_mb']:.0f} Mo")
+
+    write_results(rows, heaps, out_dir)
+    print("\nLoi de Heaps (V = K * N^beta) :")
+    for v, h in heaps.items():
+        print(f"- {LABELS[v]}: K={h['heaps_k']:.2f} beta={h['heaps_beta']:.3f} R²={h['heaps_r2']:.4f}")
+    if plot:
+        plot_results(rows, heaps, out_dir)
+    print(f"\n✅ Résultats écrits dans : {out_dir.resolve()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai des tokeniseurs sur des tranches identiques du corpus.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SLICE_SIZES,
+                        help="Tailles de tranches (nombre d'exemples).")
+    parser.add_argument("--variants", nargs="+", default=VARIANTS, choices=VARIANTS,
+                        help="Tokeniseurs à comparer.")
+    parser.add_argument("--out_dir", type=Path, default=OUT_DIR, help="Dossier de sortie.")
+    parser.add_argument("--no_plot", action="store_true", help="Ne pas générer les figures.")
+    args = parser.parse_args()
+    main(args.sizes, args.variants, args.out_dir, not args.no_plot)
@@ -0,0 +1,232 @@
+# freq_store.py
+# Table de fréquences compacte pour le comptage de tokens à l'échelle du corpus.
+#
+# Le vocabulaire est une table triée de chaînes UTF-8 à largeur fixe (numpy "S32",
+# 32 octets par type) alignée sur un tableau de comptes int64 : ni dict ni str Python
+# par type. Chaque lot est compté par Counter puis reporté dans la table (searchsorted
+# + np.add.at) ; les tokens nouveaux attendent dans un petit Counter fusionné par
+# blocs dans la table. Les tokens de plus de 32 octets (rares) restent dans un Counter
+# à part. Les comptes partiels de plusieurs workers se fusionnent avec merge(), le top-k
+# passe par np.argpartition et l'état se sauvegarde en .npy pour reprendre un comptage
+# interrompu.
+
+import argparse
+import json
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from regex_tokenizer import make_regex_tokenizer
+
+WIDTH = 32              # octets UTF-8 par entrée de la table
+FLUSH_EVERY = 1 << 16   # nouveaux types mis en attente avant fusion dans la table
+SNAPSHOT = Path(__file__).resolve().parent.parent / "sortie" / "freq" / "wikipedia"
+
+
+class TokenFreqStore:
+    """Compteur de tokens : table triée de chaînes à largeur fixe + comptes dans un tableau numpy."""
+
+    def __init__(self):
+        self.vocab = np.empty(0, dtype=f"S{WIDTH}")   # tokens triés (UTF-8)
+        self.counts = np.empty(0, dtype=np.int64)      # comptes alignés sur vocab
+        self._pending = Counter()   # bytes -> compte, types pas encore dans la table
+        self._long = Counter()      # str -> compte, tokens trop longs pour la table
+
+    # --- Vocabulaire ----------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.vocab) + len(self._pending) + len(self._long)
+
+    def __contains__(self, token: str) -> bool:
+        return self[token] > 0
+
+    def __getitem__(self, token: str) -> int:
+        b = token.encode("utf-8")
+        if not _fits(b):
+            return self._long[token]
+        pos, found = self._lookup(np.array([b], dtype=self.vocab.dtype))
+        return int(self.counts[pos[0]]) if found[0] else self._pending[b]
+
+    def _lookup(self, keys: np.ndarray) -> tuple:
+        """Positions des clés dans la table triée et masque des clés présentes."""
+        pos = np.searchsorted(self.vocab, keys)
+        found = np.zeros(len(keys), dtype=bool)
+        inside = pos < len(self.vocab)
+        found[inside] = self.vocab[pos[inside]] == keys[inside]
+        return pos, found
+
+    def _merge_table(self, keys: np.ndarray, freq: np.ndarray) -> None:
+        """Union triée de la table et de (keys, freq) ; les doublons sont sommés par np.add.at."""
+        self.vocab, inv = np.unique(np.concatenate([self.vocab, keys]), return_inverse=True)
+        counts = np.zeros(len(self.vocab), dtype=np.int64)
+        np.add.at(counts, inv.ravel(), np.concatenate([self.counts, freq]))
+        self.counts = counts
+
+    def _flush(self) -> None:
+        """Fait entrer les types en attente dans la table."""
+        if self._pending:
+            keys = np.array(list(self._pending), dtype=self.vocab.dtype)
+            freq = np.fromiter(self._pending.values(), dtype=np.int64, count=len(self._pending))
+            self._pending.clear()
+            self._merge_table(keys, freq)
+
+    # --- Comptage -------------------------------------------------------------
+
+    def update(self, tokens) -> None:
+        """Ajoute une séquence de tokens : Counter sur le lot, puis un np.add.at sur la table."""
+        short, freq = [], []
+        for tok, n in Counter(tokens).items():
+            b = tok.encode("utf-8")
+            if _fits(b):
+                short.append(b)
+                freq.append(n)
+            else:
+                self._long[tok] += n
+        if not short:
+            return
+        keys = np.array(short, dtype=self.vocab.dtype)
+        freq = np.array(freq, dtype=np.int64)
+        pos, found = self._lookup(keys)
+        np.add.at(self.counts, pos[found], freq[found])
+        for i in np.flatnonzero(~found).tolist():
+            self._pending[short[i]] += int(freq[i])
+        if len(self._pending) >= FLUSH_EVERY:
+            self._flush()
+
+    def merge(self, other: "TokenFreqStore") -> "TokenFreqStore":
+        """Fusionne les comptes partiels d'un autre store (ex. produit par un worker)."""
+        other._flush()
+        self._flush()
+        if len(other.vocab):
+            self._merge_table(other.vocab, other.counts)
+        self._long.update(other._long)
+        return self
+
+    @property
+    def total_tokens(self) -> int:
+        return int(self.counts.sum()) + sum(self._pending.values()) + sum(self._long.values())
+
+    def top_k(self, k: int = 20) -> list:
+        """Les k tokens les plus fréquents, via np.argpartition (O(n)) puis tri des k retenus."""
+        if k <= 0:
+            return []
+        self._flush()
+        counts = self.counts
+        idx = np.argpartition(-counts, k - 1)[:k] if k < len(counts) else np.arange(len(counts))
+        idx = idx[np.argsort(-counts[idx], kind="stable")]
+        best = [(self.vocab[i].decode("utf-8"), int(counts[i])) for i in idx.tolist()]
+        best += self._long.most_common(k)
+        return sorted(best, key=lambda kv: -kv[1])[:k]
+
+    def most_common(self, k: int = 20) -> list:
+        """Alias compatible avec collections.Counter."""
+        return self.top_k(k)
+
+    # --- Sauvegarde / reprise -------------------------------------------------
+
+    def save(self, prefix) -> None:
+        """
+        Écrit trois fichiers .npy :
+        - <prefix>.counts.npy  : comptes int64
+        - <prefix>.vocab.npy   : tokens encodés en UTF-8 et concaténés (uint8)
+        - <prefix>.offsets.npy : bornes de chaque token dans le blob (int64, n+1)
+        """
+        self._flush()
+        prefix = Path(prefix)
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+        encoded = self.vocab.tolist() + [t.encode("utf-8") for t in self._long]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in encoded]) if encoded else []
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        counts = np.concatenate([self.counts, np.fromiter(self._long.values(), dtype=np.int64)])
+        np.save(f"{prefix}.counts.npy", counts)
+        np.save(f"{prefix}.vocab.npy", blob)
+        np.save(f"{prefix}.offsets.npy", offsets)
+
+    @classmethod
+    def load(cls, prefix) -> "TokenFreqStore":
+        counts = np.load(f"{prefix}.counts.npy")
+        blob = np.load(f"{prefix}.vocab.npy").tobytes()
+        offsets = np.load(f"{prefix}.offsets.npy").tolist()
+        store = cls()
+        short, short_idx = [], []
+        for i, (a, b) in enumerate(zip(offsets[:-1], offsets[1:])):
+            tok = blob[a:b]
+            if _fits(tok):
+                short.append(tok)
+                short_idx.append(i)
+            else:
+                store._long[tok.decode("utf-8")] = int(counts[i])
+        if short:
+            store._merge_table(np.array(short, dtype=store.vocab.dtype), counts[short_idx])
+        return store
+
+
+def _fits(b: bytes) -> bool:
+    """Le token tient-il dans la table ? (numpy "S" tronque les octets nuls finaux)"""
+    return len(b) <= WIDTH and not b.endswith(b"\0")
+
+
+# --- Comptage parallèle -------------------------------------------------------
+
+def _count_chunk(mode: str, texts: list) -> TokenFreqStore:
+    """Exécuté dans un worker : tokenise un lot de textes et renvoie un store partiel."""
+    split_text = make_regex_tokenizer(mode)
+    store = TokenFreqStore()
+    for i in range(0, len(texts), 100):
+        store.update(split_text(texts[i:i + 100]))
+    return store
+
+
+def count_dataset(mode: str, dataset: str, snapshot: Path, workers: int = 4,
+                  chunk_size: int = 2000, resume: bool = False) -> TokenFreqStore:
+    """
+    Compte tout le split train de `dataset` avec le tokeniseur regex `mode`.
+    Les lots sont comptés en parallèle puis fusionnés ; un snapshot est écrit
+    après chaque vague de lots pour pouvoir reprendre avec resume=True.
+    """
+    from datasets import load_dataset
+    ds_train = load_dataset(dataset)["train"]
+
+    meta_path = Path(f"{snapshot}.meta.json")
+    store, done = TokenFreqStore(), 0
+    if resume and meta_path.exists():
+        store = TokenFreqStore.load(snapshot)
+        done = json.loads(meta_path.read_text())["examples_done"]
+        print(f"↩️ Reprise à l'exemple {done} ({len(store)} types déjà comptés)")
+
+    total = len(ds_train)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while done < total:
+            bounds = [(s, min(s + chunk_size, total))
+                      for s in range(done, min(done + workers * chunk_size, total), chunk_size)]
+            futures = [pool.submit(_count_chunk, mode, ds_train[a:b]["text"]) for a, b in bounds]
+            for fut in futures:
+                store.merge(fut.result())
+            done = bounds[-1][1]
+            store.save(snapshot)
+            meta_path.write_text(json.dumps({"examples_done": done, "mode": mode, "dataset": dataset}))
+            print(f"💾 {done}/{total} exemples — {len(store)} types — {time.perf_counter() - start:.1f} s")
+    return store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comptage de fréquences compact et reprenable sur tout le corpus.")
+    parser.add_argument("--mode", default="base2", choices=["base", "base1", "base2"], help="Mode du tokeniseur regex.")
+    parser.add_argument("--dataset", default="BioMedTok/Wikipedia")
+    parser.add_argument("--snapshot", type=Path, default=SNAPSHOT,
+                        help="Préfixe des fichiers .npy du snapshot.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk_size", type=int, default=2000)
+    parser.add_argument("--resume", action="store_true", help="Reprendre depuis le dernier snapshot.")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    store = count_dataset(args.mode, args.dataset, args.snapshot, args.workers, args.chunk_size, args.resume)
+    for tok, freq in store.top_k(args.top):
+        print(f"{tok} : {freq}")
+    print(f"# {args.mode} tokens: {store.total_tokens} types: {len(store)}")
@@ -0,0 +1,34 @@
+# regex_tokenizer.py
+# Tokeniseur regex de exo1_exo2_Regex.py (modes base / base1 / base2), expressions
+# compilées une seule fois. Partagé par benchmark_tokenizers.py et freq_store.py.
+
+import re
+import unicodedata
+
+DIGIT_RE = re.compile(r"\d")
+URL_RE = re.compile(r"https?://\S+")
+EMAIL_RE = re.compile(r"\b\S+@\S+\.\S+\b")
+USER_RE = re.compile(r"@\w+")
+HASHTAG_RE = re.compile(r"#\w+")
+SPACES_RE = re.compile(r"\s+")
+WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def make_regex_tokenizer(mode: str):
+    """Reproduit split_text de exo1_exo2_Regex.py pour un MODE donné."""
+    def split_text(texts):
+        tokens = []
+        for text in texts:
+            text = unicodedata.normalize("NFC", text)
+            if mode in ("base1", "base2"):
+                text = text.lower()
+                text = DIGIT_RE.sub("@", text)
+            if mode == "base2":
+                text = URL_RE.sub("<URL>", text)
+                text = EMAIL_RE.sub("<EMAIL>", text)
+                text = USER_RE.sub("<USER>", text)
+                text = HASHTAG_RE.sub("<HASHTAG>", text)
+            text = SPACES_RE.sub(" ", text).strip()
+            tokens.extend(WORD_RE.findall(text))
+        return tokens
+    return split_text
@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import argparse
 import csv
+import os
 import re
-from collections import defaultdict
+import threading
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from acl_anthology import Anthology
@@ -12,20 +15,44 @@ import json
 import requests
 from bs4 import BeautifulSoup
 from tqdm import tqdm
+
+from acl_instrument import Instrumentation
+
+# Instrumentation désactivée par défaut (voir --profile)
+INSTR = Instrumentation(enabled=False)
+
 # --- Récupération du résumé depuis la page web ACL ---------------------------
 
+# Cache LRU borné des résumés trouvés ; les échecs ("" : timeout, 5xx, page sans résumé) ne sont pas
+# mémorisés pour qu'un incident réseau passager ne vide pas définitivement le résumé.
+ABSTRACT_CACHE_SIZE = 4096
+_abstract_cache: OrderedDict[str, str] = OrderedDict()
+_abstract_lock = threading.Lock()  # l'export extrait les papiers dans un ThreadPoolExecutor
+
+
 def fetch_abstract_from_web(url: str) -> str:
     """Tente de récupérer le résumé depuis la page web ACL si absent des métadonnées."""
+    with _abstract_lock:
+        if url in _abstract_cache:
+            _abstract_cache.move_to_end(url)
+            INSTR.incr("fetch_cache_hits")
+            return _abstract_cache[url]
+    INSTR.incr("fetches")
     try:
         response = requests.get(url, timeout=10)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, "html.parser")
         abstract_div = soup.find("div", class_="card-body acl-abstract")
-        if abstract_div:
-            return abstract_div.text.strip()
+        abstract = abstract_div.text.strip() if abstract_div else ""
     except Exception:
-        pass
-    return ""
+        INSTR.incr("fetch_errors")
+        return ""
+    if abstract:
+        with _abstract_lock:
+            _abstract_cache[url] = abstract
+            if len(_abstract_cache) > ABSTRACT_CACHE_SIZE:
+                _abstract_cache.popitem(last=False)
+    return abstract
 
 # --- Utils --------------------------------------------------------------------
 
@@ -122,7 +149,8 @@ def extract_paper_info(paper: Any) -> dict:
     authors = paper_authors_str(paper)
     abstract = paper_field(paper, "abstract", default="")
     if not abstract and pdf_url:
-        abstract = fetch_abstract_from_web(pdf_url)
+        with INSTR.stage("fetch_abstract"):
+            abstract = fetch_abstract_from_web(pdf_url)
     return {
         "title": title,
         "year": year,
@@ -135,6 +163,135 @@ def extract_paper_info(paper: Any) -> dict:
     }
 
 
+# --- Mots-clés de classification (domaine, tâche, famille de modèle) ---------
+
+DOMAIN_KEYWORDS = {
+    "sentiment": r"sentiment|opinion|polarity|affect|emotion|mood|feeling",
+    "emotion": r"emotion|affective|empathy|feeling",
+    "topic": r"topic modeling|lda|subject|theme",
+    "hate_speech": r"hate speech|offensive|abusive|toxic",
+    "medical": r"medical|biomedical|clinical|health|patient|doctor",
+    "education": r"education|student|learning|pedagog",
+    "translation": r"translation|translat|mt|machine translation",
+    "dialogue": r"dialogue|conversation|chatbot|utterance",
+}
+
+TASK_KEYWORDS = {
+    "classification": r"classification|classifier|categorization",
+    "generation": r"text generation|summarization|captioning|data-to-text|gpt|llm|mistral",
+    "benchmark": r"benchmark|evaluation|shared task|leaderboard",
+    "clustering": r"clustering|unsupervised|grouping",
+    "sequence_labeling": r"sequence labeling|ner|named entity|pos tagging|sequence tag",
+}
+
+# Compilés avec re.IGNORECASE (comme la recherche d'origine, sans DOTALL : les lookarounds
+# `.*` ne dépassent pas la fin de ligne)
+MODEL_KEYWORDS = {
+    # === Modèles classiques ===
+    "svm": r"\bSVM\b|support\s+vector",
+    "naive_bayes": r"naive[- ]?bayes",
+    "logistic_regression": r"logistic\s+regression|régression\s+logistique",
+
+    # === Réseaux de neurones ===
+    "cnn": r"\bCNN\b|convolution(?:al)?\s+neural\s+network|réseau(?:x)?\s+convolutionnel",
+    "rnn": r"\bRNN\b(?![a-z])|recurrent\s+neural\s+network|réseau(?:x)?\s+récurrent",
+    "lstm": r"\bLSTM\b|long\s+short[- ]?term\s+memory",
+
+    # === Transformers & LLMs ===
+    # Transformer (éviter les transformateurs électriques)
+    "transformer": (
+        r"\btransformer\b"
+        r"(?=.*\b(self[- ]?attention|encoder[- ]?decoder|multi[- ]?head|attention)\b)"
+        r"(?!.*\b(power|electric|voltage|substation|distribution)\b)"
+    ),
+
+    # BERT et variantes
+    "bert": r"\bBERT\b|roberta|xlm[- ]?roberta|albert|deberta|distilbert|camembert",
+
+    # GPT uniquement (avec contexte NLP et exclusions sémantiques)
+    # - Contexte requis: transformer|language model|nlp|openai|llm|text|prompt|chat
+    # - Exclusions: usages historiques d'autres domaines (enzymes, Pareto, plasma, etc.)
+    "gpt": (
+        r"(?=.*\b(transformer|language\s+model|nlp|openai|llm|text|prompt|chat|few[- ]?shot)\b)"
+        r"(?!.*\b(glutamate|pyruvate|transaminase|enzyme|liver|pareto|plasma|thruster|projectile|geology)\b)"
+        r"\b(?:chat)?gpt(?:[- ]?(?:2|3(?:\.5)?|4(?:\.1|o|[- ]?turbo)?|5|j|neo(?:x)?))?\b"
+    ),
+
+    # Autres LLM (séparés de GPT pour éviter la confusion)
+    "llama": r"\bllama(?:[- ]?\d+)?\b|meta\s+llama",
+    "mistral": r"\bmistral\b",
+    "falcon": r"\bfalcon\b(?=.*\bllm|model|transformer\b)",
+    "bloom": r"\bbloom\b(?=.*\bllm|model|transformer\b)",
+    "vicuna": r"\bvicuna\b",
+    "gemma": r"\bgemma\b",
+    "qwen": r"\bqwen\b",
+    "phi": r"\bphi[- ]?\d*\b(?=.*\b(microsoft|llm|model)\b)",
+    "opt": r"\bOPT\b(?=.*\bmeta|facebook|llm|model\b)",
+    "gpt_neox": r"\bgpt[- ]?neo(?:x)?\b",
+    "gpt_j": r"\bgpt[- ]?j\b",
+
+    # === Modèles probabilistes ===
+    "crf": r"\bCRF\b|conditional\s+random\s+field",
+    "hmm": r"\bHMM\b|hidden\s+markov",
+
+    # === Spécialisés / embeddings / graphes ===
+    "word2vec": r"\bword2vec\b|skip[- ]?gram|cbow",
+    "gcn": r"\bGCN\b|graph\s+convolutional\s+network|\bGNN\b|graph\s+neural\s+network",
+
+    # === Basé sur règles ===
+    "rule_based": r"rule[- ]?based|pattern\s+matching|heuristic|regex|règle[- ]?basée",
+
+    # === Fourre-tout ===
+    "other": r"",
+}
+
+
+# Préfixe obligatoire de chaque motif à lookaround : le motif complet ne peut réussir qu'à une
+# position où ce préfixe réussit. On énumère ces positions (finditer sur (?=préfixe), donc sans
+# chevauchement manqué) puis on essaie full.match(text, pos) : même résultat que full.search(text),
+# mais les lookarounds `.*` ne sont évalués qu'aux quelques positions candidates au lieu de partout
+# (le motif "gpt", qui commence par ses lookaheads, était quadratique en la longueur du texte).
+LOOKAROUND_HEADS = {
+    "transformer": r"\btransformer\b",
+    "gpt": r"\b(?:chat)?gpt",
+    "falcon": r"\bfalcon\b",
+    "bloom": r"\bbloom\b",
+    "phi": r"\bphi",
+    "opt": r"\bOPT\b",
+}
+
+
+def compile_keywords(keywords: dict, flags: int = 0, heads: dict | None = None) -> list:
+    """[(nom, regex compilée, préfiltre compilé ou None)] dans l'ordre du dictionnaire."""
+    heads = heads or {}
+    return [
+        (name, re.compile(rx, flags), re.compile(f"(?={heads[name]})", flags) if name in heads else None)
+        for name, rx in keywords.items()
+    ]
+
+
+def pattern_matches(full: re.Pattern, head: re.Pattern | None, text: str) -> bool:
+    """Équivalent de bool(full.search(text)), via les positions candidates du préfiltre s'il existe."""
+    if not full.pattern:
+        return True  # motif vide ("other") : correspond toujours
+    if head is None:
+        return full.search(text) is not None
+    return any(full.match(text, m.start()) for m in head.finditer(text))
+
+
+def first_match(compiled: list, text: str, default: str) -> str:
+    """Nom du premier motif qui correspond (ordre du dictionnaire), sinon default."""
+    for name, full, head in compiled:
+        if pattern_matches(full, head, text):
+            return name
+    return default
+
+
+DOMAIN_PATTERNS = compile_keywords(DOMAIN_KEYWORDS)
+TASK_PATTERNS = compile_keywords(TASK_KEYWORDS)
+MODEL_PATTERNS = compile_keywords(MODEL_KEYWORDS, re.IGNORECASE, LOOKAROUND_HEADS)
+
+
 # --- Cartographie classification / benchmarks --------------------------------
 
 def cartographie_classification(anthology: Any, limit: int = 0) -> dict:
@@ -155,86 +312,6 @@ def cartographie_classification(anthology: Any, limit: int = 0) -> dict:
         "binary", "multiclass", "multilabel"
     ]
     
-    # --- Mots-clés pour la détection ---
-    domain_keywords = {
-        "sentiment": r"sentiment|opinion|polarity|affect|emotion|mood|feeling",
-        "emotion": r"emotion|affective|empathy|feeling",
-        "topic": r"topic modeling|lda|subject|theme",
-        "hate_speech": r"hate speech|offensive|abusive|toxic",
-        "medical": r"medical|biomedical|clinical|health|patient|doctor",
-        "education": r"education|student|learning|pedagog",
-        "translation": r"translation|translat|mt|machine translation",
-        "dialogue": r"dialogue|conversation|chatbot|utterance",
-    }
-
-    task_keywords = {
-        "classification": r"classification|classifier|categorization",
-        "generation": r"text generation|summarization|captioning|data-to-text|gpt|llm|mistral",
-        "benchmark": r"benchmark|evaluation|shared task|leaderboard",
-        "clustering": r"clustering|unsupervised|grouping",
-        "sequence_labeling": r"sequence labeling|ner|named entity|pos tagging|sequence tag",
-    }
-    
-    # À compiler avec: flags = re.IGNORECASE | re.DOTALL
-    model_keywords = {
-        # === Modèles classiques ===
-        "svm": r"\bSVM\b|support\s+vector",
-        "naive_bayes": r"naive[- ]?bayes",
-        "logistic_regression": r"logistic\s+regression|régression\s+logistique",
-
-        # === Réseaux de neurones ===
-        "cnn": r"\bCNN\b|convolution(?:al)?\s+neural\s+network|réseau(?:x)?\s+convolutionnel",
-        "rnn": r"\bRNN\b(?![a-z])|recurrent\s+neural\s+network|réseau(?:x)?\s+récurrent",
-        "lstm": r"\bLSTM\b|long\s+short[- ]?term\s+memory",
-
-        # === Transformers & LLMs ===
-        # Transformer (éviter les transformateurs électriques)
-        "transformer": (
-            r"\btransformer\b"
-            r"(?=.*\b(self[- ]?attention|encoder[- ]?decoder|multi[- ]?head|attention)\b)"
-            r"(?!.*\b(power|electric|voltage|substation|distribution)\b)"
-        ),
-
-        # BERT et variantes
-        "bert": r"\bBERT\b|roberta|xlm[- ]?roberta|albert|deberta|distilbert|camembert",
-
-        # GPT uniquement (avec contexte NLP et exclusions sémantiques)
-        # - Contexte requis: transformer|language model|nlp|openai|llm|text|prompt|chat
-        # - Exclusions: usages historiques d'autres domaines (enzymes, Pareto, plasma, etc.)
-        "gpt": (
-            r"(?=.*\b(transformer|language\s+model|nlp|openai|llm|text|prompt|chat|few[- ]?shot)\b)"
-            r"(?!.*\b(glutamate|pyruvate|transaminase|enzyme|liver|pareto|plasma|thruster|projectile|geology)\b)"
-            r"\b(?:chat)?gpt(?:[- ]?(?:2|3(?:\.5)?|4(?:\.1|o|[- ]?turbo)?|5|j|neo(?:x)?))?\b"
-        ),
-
-        # Autres LLM (séparés de GPT pour éviter la confusion)
-        "llama": r"\bllama(?:[- ]?\d+)?\b|meta\s+llama",
-        "mistral": r"\bmistral\b",
-        "falcon": r"\bfalcon\b(?=.*\bllm|model|transformer\b)",
-        "bloom": r"\bbloom\b(?=.*\bllm|model|transformer\b)",
-        "vicuna": r"\bvicuna\b",
-        "gemma": r"\bgemma\b",
-        "qwen": r"\bqwen\b",
-        "phi": r"\bphi[- ]?\d*\b(?=.*\b(microsoft|llm|model)\b)",
-        "opt": r"\bOPT\b(?=.*\bmeta|facebook|llm|model\b)",
-        "gpt_neox": r"\bgpt[- ]?neo(?:x)?\b",
-        "gpt_j": r"\bgpt[- ]?j\b",
-
-        # === Modèles probabilistes ===
-        "crf": r"\bCRF\b|conditional\s+random\s+field",
-        "hmm": r"\bHMM\b|hidden\s+markov",
-
-        # === Spécialisés / embeddings / graphes ===
-        "word2vec": r"\bword2vec\b|skip[- ]?gram|cbow",
-        "gcn": r"\bGCN\b|graph\s+convolutional\s+network|\bGNN\b|graph\s+neural\s+network",
-
-        # === Basé sur règles ===
-        "rule_based": r"rule[- ]?based|pattern\s+matching|heuristic|regex|règle[- ]?basée",
-
-        # === Fourre-tout ===
-        "other": r"",
-    }
-    
     pattern = re.compile("|".join(keywords), re.IGNORECASE)
 
     stats = defaultdict(int)
@@ -242,24 +319,30 @@ def cartographie_classification(anthology: Any, limit: int = 0) -> dict:
     details = []
 
     count = 0
-    for pid, paper in tqdm(iter_papers(anthology), desc="Analyse des papiers ACL", unit="papier"):
+    # cProfile échantillonné : le corps de boucle d'un papier sur N est profilé (--profile-every)
+    papers = INSTR.sampled_iter(INSTR.timed_iter("iter_papers", iter_papers(anthology)))
+    for pid, paper in tqdm(papers, desc="Analyse des papiers ACL", unit="papier"):
+        INSTR.incr("papers_seen")
         # --- Filtrage sur la conférence (modernes ou codes ACL historiques) ---
-        venues = set(getattr(paper, "venue_ids", []))
-        venue_ok = False
-        for v in venues:
-            v_lower = v.lower()
-            if v_lower in target_venues:
-                venue_ok = True
-                break
-            if v and v[0].upper() in venue_codes:
-                venue_ok = True
-                break
+        with INSTR.stage("venue_filter"):
+            venues = set(getattr(paper, "venue_ids", []))
+            venue_ok = False
+            for v in venues:
+                v_lower = v.lower()
+                if v_lower in target_venues:
+                    venue_ok = True
+                    break
+                if v and v[0].upper() in venue_codes:
+                    venue_ok = True
+                    break
         if not venue_ok:
+            INSTR.incr("venue_filtered")
             continue
 
         # --- Extraction du texte brut (MarkupText → str) ---
         # --- Extraction des métadonnées ---
-        info = extract_paper_info(paper)
+        with INSTR.stage("extract_paper_info"):
+            info = extract_paper_info(paper)
 
         # --- Extraction du texte brut (MarkupText → str) ---
         title = safe_text(getattr(paper, "title", ""))
@@ -270,7 +353,10 @@ def cartographie_classification(anthology: Any, limit: int = 0) -> dict:
         abstract_lc = abstract.lower()
 
         # --- Détection des mots-clés ---
-        if not pattern.search(title_lc + " " + abstract_lc):
+        with INSTR.stage("keyword_filter"):
+            keyword_ok = pattern.search(title_lc + " " + abstract_lc)
+        if not keyword_ok:
+            INSTR.incr("keyword_filtered")
             continue
         year_str = str(info.get("year", "")).strip()
         if year_str:
@@ -279,23 +365,10 @@ def cartographie_classification(anthology: Any, limit: int = 0) -> dict:
         # --- Détection des domaines et des tâches ---
         text = (title_lc + " " + abstract_lc)
 
-        detected_domain = "other"
-        for dom, regex in domain_keywords.items():
-            if re.search(regex, text):
-                detected_domain = dom
-                break
-
-        detected_task = "unspecified"
-        for task, regex in task_keywords.items():
-            if re.search(regex, text):
-                detected_task = task
-                break
-            
-        detected_model = "other"
-        for model, regex in model_keywords.items():
-            if re.search(regex, text, re.IGNORECASE):
-                detected_model = model
-                break
+        with INSTR.stage("classify_regex"):
+            detected_domain = first_match(DOMAIN_PATTERNS, text, "other")
+            detected_task = first_match(TASK_PATTERNS, text, "unspecified")
+            detected_model = first_match(MODEL_PATTERNS, text, "other")
 
         details.append({
             "paper_id": pid,
@@ -311,6 +384,7 @@ def cartographie_classification(anthology: Any, limit: int = 0) -> dict:
             "pdf_url": info["pdf_url"],
         })
 
+        INSTR.incr("classified")
         stats["total_papers"] += 1
         stats[f"type_{detected_task}"] += 1
         stats[f"domain_{detected_domain}"] += 1
@@ -368,47 +442,186 @@ def affichage_tendance(resultats: dict) -> None:
 
 # --- Export/affichage générique ----------------------------------------------
 
-def main() -> None:
-    parser = argparse.ArgumentParser(
-        description="Parcourir l'ACL Anthology et afficher/exporter des métadonnées."
-    )
+EXPORT_FIELDS = ["paper_id", "title", "year", "authors", "venue", "address", "abstract", "pdf_url", "doi"]
+
+
+class CsvSink:
+    """Écriture CSV en flux ; l'état de checkpoint est la taille du fichier (octets)."""
+
+    def __init__(self, path: str, state: dict | None = None):
+        resume = state is not None and os.path.exists(path)
+        self.f = open(path, "r+" if resume else "w", newline="", encoding="utf-8")
+        if resume:
+            # Les lignes écrites après le dernier checkpoint seront réextraites : on les retire
+            self.f.seek(state["offset"])
+            self.f.truncate()
+        self.writer = csv.DictWriter(self.f, fieldnames=EXPORT_FIELDS)
+        if not resume:
+            self.writer.writeheader()
+
+    def write(self, row: dict) -> None:
+        self.writer.writerow(row)
+
+    def flush(self) -> dict:
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        return {"offset": self.f.tell()}
+
+    def close(self) -> None:
+        self.f.close()
+
+
+class ParquetSink:
+    """Écriture Parquet en flux : un fichier part-NNNNN.parquet par checkpoint dans un dossier."""
+
+    def __init__(self, path: str, state: dict | None = None):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("pyarrow est requis pour l'export Parquet (pip install pyarrow)") from e
+        self.dir = path
+        os.makedirs(path, exist_ok=True)
+        self.part = state["part"] if state else 0
+        # Parts plus récentes que le checkpoint : incomplètes ou non comptées, on les supprime
+        for name in os.listdir(path):
+            if name.startswith("part-") and int(name[5:10]) >= self.part:
+                os.remove(os.path.join(path, name))
+        self.rows: list[dict] = []
+
+    def write(self, row: dict) -> None:
+        self.rows.append(row)
+
+    def flush(self) -> dict:
+        if self.rows:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pylist(self.rows, schema=pa.schema([(f, pa.string()) for f in EXPORT_FIELDS]))
+            pq.write_table(table, os.path.join(self.dir, f"part-{self.part:05d}.parquet"), compression="zstd")
+            self.part += 1
+            self.rows = []
+        return {"part": self.part}
+
+    def close(self) -> None:
+        self.flush()
+
+
+def extract_row(pid: str, paper: Any) -> dict:
+    info = extract_paper_info(paper)
+    return {"paper_id": pid, **{k: "" if v is None else str(v) for k, v in info.items()}}
+
+
+def iter_rows(anthology: Any, workers: int = 8, limit: int = 0, start_after: str | None = None):
+    """
+    Lignes d'export dans l'ordre de iter_papers, extraites par un pool de threads (les résumés
+    manquants sont récupérés sur le web en parallèle). Au plus workers × 4 extractions en vol :
+    rien n'est matérialisé. Avec start_after, on saute les papiers jusqu'à ce paper_id inclus.
+    """
+    papers = iter_papers(anthology)
+    if start_after is not None:
+        for pid, _ in papers:
+            if pid == start_after:
+                break
+        else:
+            raise ValueError(f"paper_id du checkpoint introuvable dans l'anthologie : {start_after} "
+                             "(anthologie modifiée ? supprimer le .ckpt.json pour repartir de zéro)")
+    pending: deque = deque()
+    submitted = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for pid, paper in papers:
+            if limit and submitted >= limit:
+                break
+            pending.append(pool.submit(extract_row, pid, paper))
+            submitted += 1
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+EXPORT_FORMATS = {"csv": CsvSink, "parquet": ParquetSink}
+
+
+def export(anthology: Any, out_path: str, workers: int = 8, limit: int = 0, resume: bool = False,
+           checkpoint_every: int = 500, fmt: str = "csv") -> int:
+    """Export CSV (fichier) ou Parquet (dossier de parts), reprenable via <sortie>.ckpt.json."""
+    ckpt_path = f"{out_path}.ckpt.json"
+    state = None
+    if resume and os.path.exists(ckpt_path):
+        with open(ckpt_path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("format", "csv") != fmt:
+            raise ValueError(f"Le checkpoint {ckpt_path} concerne un export {state.get('format', 'csv')}, pas {fmt}")
+        print(f"↩️ Reprise après {state['last_paper_id']} ({state['rows']} lignes déjà exportées)")
+    sink = EXPORT_FORMATS[fmt](out_path, state["sink"] if state else None)
+    written = state["rows"] if state else 0
+    remaining = max(limit - written, 0) if limit else 0
+    if limit and not remaining:
+        sink.close()
+        return written
+
+    def checkpoint(last_pid: str) -> None:
+        tmp = f"{ckpt_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"last_paper_id": last_pid, "rows": written, "format": fmt, "sink": sink.flush()}, f)
+        os.replace(tmp, ckpt_path)
+
+    last_pid = state["last_paper_id"] if state else None
+    try:
+        rows = iter_rows(anthology, workers, remaining, start_after=last_pid)
+        for row in tqdm(rows, desc="Export", unit="papier", initial=written):
+            sink.write(row)
+            written += 1
+            last_pid = row["paper_id"]
+            if written % checkpoint_every == 0:
+                checkpoint(last_pid)
+    finally:
+        if last_pid is not None:
+            checkpoint(last_pid)
+        sink.close()
+    return written
+
+
+def add_export_args(parser: argparse.ArgumentParser, subcommand: bool = False) -> None:
+    """Options d'export ; en sous-commande, --limit hérite de la valeur du parseur parent si absent."""
     parser.add_argument(
-        "--to-csv",
-        metavar="FICHIER",
-        help="Chemin d'export CSV (facultatif). Si non fourni, imprime en texte lisible.",
+        "--out",
+        metavar="CHEMIN",
+        help="Chemin d'export : fichier CSV, ou dossier de parts avec --format parquet (facultatif). "
+             "Si non fourni, imprime en texte lisible.",
     )
+    parser.add_argument("--to-csv", metavar="FICHIER", help="Équivalent de --out FICHIER --format csv.")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv", help="Format d'export.")
     parser.add_argument(
         "--limit",
         type=int,
-        default=0,
+        # SUPPRESS : sinon le défaut du sous-parseur écraserait « acl.py --limit 5 export »
+        default=argparse.SUPPRESS if subcommand else 0,
         help="Limiter le nombre d'articles affichés/exportés (0 = pas de limite).",
     )
-    args = parser.parse_args()
+    parser.add_argument("--workers", type=int, default=8, help="Threads d'extraction (récupération web en parallèle).")
+    parser.add_argument("--resume", action="store_true", help="Reprendre un export interrompu (<sortie>.ckpt.json).")
+    parser.add_argument("--checkpoint-every", type=int, default=500, help="Lignes entre deux checkpoints.")
+
+
+def run_export(args: argparse.Namespace, parser: argparse.ArgumentParser) -> None:
+    if args.to_csv and args.out:
+        parser.error("--to-csv et --out sont exclusifs")
+    if args.to_csv and args.format != "csv":
+        parser.error("--to-csv exporte en CSV : utiliser --out avec --format parquet")
+    out_path = args.out or args.to_csv
 
     # Charger la base locale (chemin ABSOLU recommandé)
     anthology = Anthology.from_repo(
         "/Users/gabrielferreira/Documents/Udem/IFT6285/ProjetSession1/acl-anthology"
     )
 
-    rows = []
-    for pid, paper in iter_papers(anthology):
-        info = extract_paper_info(paper)
-        rows.append({"paper_id": pid, **info})
-        if args.limit and len(rows) >= args.limit:
-            break
-
-    if args.to_csv:
-        with open(args.to_csv, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(
-                f,
-                fieldnames=["paper_id", "title", "year", "authors", "venue", "address", "abstract", "pdf_url", "doi"],
-            )
-            writer.writeheader()
-            writer.writerows(rows)
-        print(f"✅ Exporté {len(rows)} lignes vers {args.to_csv}")
+    if out_path:
+        n = export(anthology, out_path, args.workers, args.limit, args.resume, args.checkpoint_every, args.format)
+        print(f"✅ Exporté {n} lignes vers {out_path}")
     else:
-        # Affichage lisible
-        for r in rows:
+        # Affichage lisible (en flux)
+        n = 0
+        for r in iter_rows(anthology, args.workers, args.limit):
             print(
                 f"[{r['paper_id']}] {r['title']} ({r['year']})\n"
                 f"  Auteurs: {r['authors']}\n"
@@ -418,24 +631,58 @@ def main() -> None:
                 f"  PDF   : {r['pdf_url']}\n"
                 f"  DOI   : {r['doi']}\n"
             )
-        print(f"Total affiché: {len(rows)}")
-
+            n += 1
+        print(f"Total affiché: {n}")
 
-if __name__ == "__main__":
-    # Option A : listage générique
-    # main()
 
-    # Option B : cartographie ciblée + affichage du comptage par année
-    anthology = Anthology.from_repo(
-        "/Users/gabrielferreira/Documents/Udem/IFT6285/ProjetSession1/acl-anthology"
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Parcourir l'ACL Anthology et afficher/exporter des métadonnées."
     )
-    resultats = cartographie_classification(anthology)
+    add_export_args(parser)
+    run_export(parser.parse_args(), parser)
+
+
+if __name__ == "__main__":
+    # Option A : listage / export générique → python acl.py export [--out ... --format ... --resume]
+    # Option B : cartographie ciblée + affichage du comptage par année → python acl.py [--limit ...]
+    cli = argparse.ArgumentParser(description="Cartographie classification / benchmarks de l'ACL Anthology.")
+    cli.add_argument("--limit", type=int, default=0, help="Arrêter après N articles retenus (0 = pas de limite).")
+    cli.add_argument("--profile", metavar="RAPPORT_JSON", nargs="?", const="acl_profile.json", default=None,
+                     help="Active les timers par étape et compteurs, rapport JSON en fin de run.")
+    cli.add_argument("--profile-every", type=int, default=0, metavar="N",
+                     help="Avec --profile : cProfile sur un papier sur N (0 = désactivé).")
+    cli.add_argument("--pyinstrument", action="store_true",
+                     help="Avec --profile : profil pyinstrument de tout le run (rapport HTML à côté du JSON).")
+    sub = cli.add_subparsers(dest="cmd")
+    export_cli = sub.add_parser("export", help="Listage ou export CSV/Parquet reprenable des métadonnées (Option A).")
+    add_export_args(export_cli, subcommand=True)
+    cli_args = cli.parse_args()
+    if cli_args.cmd == "export":
+        run_export(cli_args, export_cli)
+        raise SystemExit(0)
+    if cli_args.profile:
+        INSTR = Instrumentation(enabled=True, sample_every=cli_args.profile_every,
+                                use_pyinstrument=cli_args.pyinstrument)
+        INSTR.start()
+
+    with INSTR.stage("load_xml"):
+        anthology = Anthology.from_repo(
+            "/Users/gabrielferreira/Documents/Udem/IFT6285/ProjetSession1/acl-anthology"
+        )
+    resultats = cartographie_classification(anthology, limit=cli_args.limit)
 
     # --- Sauvegarde JSON ---
     json_path = "resultats_classification_enrichie2.json"
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(resultats, f, ensure_ascii=False, indent=2)
+    with INSTR.stage("write_json"):
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(resultats, f, ensure_ascii=False, indent=2)
     print(f"\n💾 Fichier JSON enregistré : {json_path}")
 
+    if cli_args.profile:
+        INSTR.print_summary()
+        INSTR.save(cli_args.profile)
+        print(f"⏱️ Rapport de profilage : {cli_args.profile}")
+
     # --- Affichage graphique ---
-    affichage_tendance(resultats)
\ No newline at end of file
+    affichage_tendance(resultats)
@@ -4,6 +4,7 @@ import matplotlib.pyplot as plt
 from scipy.ndimage import gaussian_filter1d
 import os
 import re, os
+from acl_trends import TrendCube
 
 # === 1. Fonction pour lisser une série temporelle ===
 def smooth_series(values, sigma=1):
@@ -70,13 +71,18 @@ def plot_domaines(df, output_dir="figures"):
 
 
 # === 5. Évolution par thème ou modèle (si ajouté dans le JSON étendu) ===
-def plot_tendance_theme(df, column, output_dir="figures", smooth=False):
+def plot_tendance_theme(df, column, output_dir="figures", smooth=False, sigma: float = 1.2, cube: TrendCube | None = None):
     """
     Trace l’évolution par année d’une colonne catégorielle (ex: 'theme', 'model_family').
+    - cube : TrendCube déjà construit (sinon construit à partir de df pour cette colonne)
     """
     os.makedirs(output_dir, exist_ok=True)
-    df["year"] = df["year"].astype(int)
-    grouped = df.groupby(["year", column]).size().reset_index(name="count")
+    if cube is None or column not in cube.cubes:
+        cube = TrendCube.from_df(df, [column])
+    grouped = cube.series(column, smooth=smooth, sigma=sigma).reset_index().melt(
+        id_vars="year", var_name=column, value_name="count")
+    if not smooth:
+        grouped = grouped[grouped["count"] > 0]  # comme le groupby : pas de point pour les couples absents
 
     plt.figure(figsize=(10,6))
     sns.lineplot(data=grouped, x="year", y="count", hue=column, linewidth=2)
@@ -156,7 +162,7 @@ def plot_repartition_temps(df, output_dir="figures", yearly_from: int = 2015):
 
 # === 7. Évolution des familles de modèles par année ===
 
-def plot_evolution_model_family(df, output_dir="figures", normalize: bool = False, smooth: bool = False, sigma: float = 1.0, exclude_families=None, yscale: str | None = None):
+def plot_evolution_model_family(df, output_dir="figures", normalize: bool = False, smooth: bool = False, sigma: float = 1.0, exclude_families=None, yscale: str | None = None, cube: TrendCube | None = None):
     """
     Trace l'évolution annuelle des familles de modèles présentes dans la colonne `model_family`.
     - normalize=False : affiche des comptes bruts.
@@ -164,39 +170,21 @@ def plot_evolution_model_family(df, output_dir="figures", normalize: bool = Fals
     - smooth=True     : applique un lissage gaussien (sigma configurable).
     - exclude_families : liste des familles à exclure du graphique (ex: ['other'])
     - yscale : type d'échelle y ("log", "symlog", ou None)
+    - cube : TrendCube déjà construit (voir acl_trends.py), réutilisé entre les appels
     """
     os.makedirs(output_dir, exist_ok=True)
 
-    # Garder uniquement les années numériques et les familles non vides
-    df = df[df["year"].astype(str).str.isnumeric()].copy()
     if "model_family" not in df.columns:
         raise ValueError("La colonne 'model_family' est absente du DataFrame. Assure-toi d'avoir enrichi le JSON.")
-
-    df["year"] = df["year"].astype(int)
-    df["model_family"] = df["model_family"].fillna("other")
-
-    # Comptage par (year, model_family)
-    grouped = df.groupby(["year", "model_family"]).size().reset_index(name="count")
-    pivot = grouped.pivot(index="year", columns="model_family", values="count").fillna(0).sort_index()
-
-    # Normalisation en % par année si demandé
-    if normalize:
-        row_sums = pivot.sum(axis=1)
-        row_sums[row_sums == 0] = 1  # éviter division par zéro
-        pivot = pivot.div(row_sums, axis=0) * 100.0
-
-    # Lissage optionnel
-    if smooth and len(pivot) > 3:
-        for col in pivot.columns:
-            pivot[col] = smooth_series(pivot[col].values, sigma=sigma)
+    # Comptes (année × famille) précalculés une fois ; normalisation / lissage vectorisés et mémorisés
+    if cube is None or "model_family" not in cube.cubes:
+        cube = TrendCube.from_df(df, ["model_family"])
+    pivot = cube.series("model_family", normalize=normalize, smooth=smooth, sigma=sigma,
+                        exclude=exclude_families)
 
     # Mise en forme pour seaborn
     plot_df = pivot.reset_index().melt(id_vars="year", var_name="model_family", value_name="value")
 
-    # Exclure certaines familles (ex.: 'other') si demandé
-    if exclude_families:
-        plot_df = plot_df[~plot_df["model_family"].isin(exclude_families)]
-
     plt.figure(figsize=(12, 6))
     ax = sns.lineplot(data=plot_df, x="year", y="value", hue="model_family", linewidth=2)
 
@@ -485,13 +473,14 @@ with open("resultats_classification_enrichie2.json") as f:
     resultats = json.load(f)
 
 df = pd.DataFrame(resultats["details"])
+cube = TrendCube.from_json("resultats_classification_enrichie2.json")  # recharge le .cube.npz s'il est à jour
 
 # plot_evolution_annee(df)
 # plot_taches(df)
 # plot_domaines(df)
 #plot_repartition_temps(df)
-# plot_evolution_model_family(df, normalize=False, smooth=True, sigma=1.2, exclude_families=["other"], yscale="symlog")
-# plot_evolution_model_family(df, normalize=True, smooth=True, sigma=1.2, exclude_families=["other"], yscale=None)
+# plot_evolution_model_family(df, normalize=False, smooth=True, sigma=1.2, exclude_families=["other"], yscale="symlog", cube=cube)
+# plot_evolution_model_family(df, normalize=True, smooth=True, sigma=1.2, exclude_families=["other"], yscale=None, cube=cube)
 #plot_histogram_venue(df, top_n=20)  # histogramme des 30 venues les plus fréquentes
 #plot_histogram_country(df, top_n=20)  # histogramme des pays
 plot_classification_types(df)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import pstats
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Any, Iterable, Iterator
+
+# --- Instrumentation optionnelle du pipeline acl.py ---------------------------
+# Désactivée par défaut : stage() renvoie un nullcontext et incr() ne fait rien.
+# Activée (--profile), elle accumule :
+#   - le temps cumulé et le nombre d'appels par étape (les étapes peuvent être imbriquées :
+#     "extract_paper_info" inclut "fetch_abstract")
+#   - des compteurs (papiers vus, filtrés, requêtes web, hits du cache...)
+#   - un profil cProfile échantillonné (1 papier sur N) ou pyinstrument sur tout le run si installé
+# et écrit un rapport JSON à la fin du run.
+
+
+class Instrumentation:
+    def __init__(self, enabled: bool = False, sample_every: int = 0, use_pyinstrument: bool = False):
+        self.enabled = enabled
+        self.sample_every = sample_every
+        self.timers: dict[str, float] = defaultdict(float)
+        self.calls: dict[str, int] = defaultdict(int)
+        self.counters: dict[str, int] = defaultdict(int)
+        self.profiler = cProfile.Profile() if enabled and sample_every else None
+        self.pyinstrument = None
+        if enabled and use_pyinstrument:
+            try:
+                from pyinstrument import Profiler
+                self.pyinstrument = Profiler()
+                self.profiler = None  # un seul profileur actif à la fois (sys.setprofile)
+            except ImportError:
+                print("⚠️ pyinstrument non installé — seul cProfile est utilisé.")
+        self._start = time.perf_counter()
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        if self.pyinstrument is not None:
+            self.pyinstrument.start()
+
+    def stage(self, name: str):
+        """Context manager qui ajoute la durée du bloc au temps cumulé de l'étape."""
+        if not self.enabled:
+            return nullcontext()
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] += time.perf_counter() - t0
+            self.calls[name] += 1
+
+    def incr(self, name: str, n: int = 1) -> None:
+        if self.enabled:
+            self.counters[name] += n
+
+    def timed_iter(self, name: str, iterable: Iterable) -> Iterator:
+        """Mesure le temps passé à produire chaque élément d'un itérateur (ex: iter_papers)."""
+        if not self.enabled:
+            yield from iterable
+            return
+        it = iter(iterable)
+        while True:
+            t0 = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.timers[name] += time.perf_counter() - t0
+                return
+            self.timers[name] += time.perf_counter() - t0
+            self.calls[name] += 1
+            yield item
+
+    def sampled_iter(self, iterable: Iterable) -> Iterator:
+        """Active cProfile pendant le traitement d'un élément sur sample_every (entre deux next())."""
+        if self.profiler is None:
+            yield from iterable
+            return
+        for i, item in enumerate(iterable):
+            if i % self.sample_every:
+                yield item
+                continue
+            self.counters["profiled_samples"] += 1
+            self.profiler.enable()
+            try:
+                yield item
+            finally:
+                self.profiler.disable()
+
+    def report(self, top: int = 25) -> dict[str, Any]:
+        wall = time.perf_counter() - self._start
+        stages = {
+            name: {"seconds": round(sec, 4), "calls": self.calls[name],
+                   "share_of_wall": round(sec / wall, 4) if wall else None}
+            for name, sec in sorted(self.timers.items(), key=lambda kv: -kv[1])
+        }
+        out: dict[str, Any] = {"wall_seconds": round(wall, 3), "stages": stages, "counters": dict(self.counters)}
+        if self.profiler is not None and self.counters["profiled_samples"]:
+            stats = pstats.Stats(self.profiler).sort_stats("cumulative")
+            out["cprofile_top"] = [
+                {"function": f"{fn[0]}:{fn[1]}({fn[2]})", "ncalls": nc, "tottime": round(tt, 4), "cumtime": round(ct, 4)}
+                for fn, (_, nc, tt, ct, _) in sorted(stats.stats.items(), key=lambda kv: -kv[1][3])[:top]
+            ]
+        return out
+
+    def save(self, path: str) -> dict[str, Any]:
+        if self.pyinstrument is not None:
+            self.pyinstrument.stop()
+            html_path = path.rsplit(".", 1)[0] + ".html"
+            with open(html_path, "w", encoding="utf-8") as f:
+                f.write(self.pyinstrument.output_html())
+        rep = self.report()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rep, f, ensure_ascii=False, indent=2)
+        return rep
+
+    def print_summary(self) -> None:
+        rep = self.report()
+        print(f"\n⏱️ Profil ({rep['wall_seconds']} s au total)")
+        for name, s in rep["stages"].items():
+            print(f"- {name:<20} {s['seconds']:>9.3f} s  ({s['calls']} appels)")
+        for name, n in rep["counters"].items():
+            print(f"- {name:<20} {n}")
+        if self.profiler is not None and self.counters["profiled_samples"]:
+            buf = io.StringIO()
+            pstats.Stats(self.profiler, stream=buf).sort_stats("cumulative").print_stats(10)
+            print(buf.getvalue())
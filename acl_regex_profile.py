@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import time
+
+import numpy as np
+
+from acl import (DOMAIN_KEYWORDS, DOMAIN_PATTERNS, LOOKAROUND_HEADS, MODEL_KEYWORDS, MODEL_PATTERNS,
+                 TASK_KEYWORDS, TASK_PATTERNS, first_match, pattern_matches)
+
+# --- Profilage des motifs de classification de acl.py ------------------------
+#   1) temps de chaque motif de MODEL_KEYWORDS sur le corpus réel (details du JSON de cartographie) :
+#      recherche naïve re.search vs recherche par positions candidates (acl.pattern_matches)
+#   2) croissance sur des textes synthétiques de longueur croissante : pente log-log du temps
+#      (≈ 1 linéaire, ≈ 2 quadratique) ; les motifs au-delà de --superlinear sont signalés
+#   3) parité : domaine / tâche / famille de modèle identiques entre l'ancienne boucle
+#      (re.search sur les dictionnaires) et acl.first_match, texte par texte
+#   4) variantes bornées à K mots : les lookarounds `.*` deviennent une fenêtre de K mots
+#      (linéaire par construction) ; on propose le plus petit K qui garde 100 % d'accord sur le corpus
+#
+# Exemple :
+#   python acl_regex_profile.py --json resultats_classification_enrichie2.json --out regex_profile.json
+
+FILLER = ("the model we propose results data task language neural corpus evaluation method "
+          "approach performance training system annotation features baseline").split()
+
+
+def load_texts(json_path: str) -> list[str]:
+    """Textes tels que classés par cartographie_classification (titre + résumé en minuscules)."""
+    with open(json_path, encoding="utf-8") as f:
+        details = json.load(f)["details"]
+    return [f"{(d.get('title') or '').lower()} {(d.get('abstract') or '').lower()}" for d in details]
+
+
+def naive_first_match(keywords: dict, text: str, default: str, flags: int = 0) -> str:
+    """Boucle d'origine de acl.py (re.search sur chaque motif non compilé)."""
+    for name, rx in keywords.items():
+        if re.search(rx, text, flags):
+            return name
+    return default
+
+
+def time_patterns(texts: list[str]) -> list[dict]:
+    rows = []
+    for name, full, head in MODEL_PATTERNS:
+        if not full.pattern:
+            continue
+        t0 = time.perf_counter()
+        naive = [full.search(t) is not None for t in texts]
+        t1 = time.perf_counter()
+        fast = [pattern_matches(full, head, t) for t in texts]
+        t2 = time.perf_counter()
+        rows.append({"pattern": name, "naive_s": round(t1 - t0, 5), "fast_s": round(t2 - t1, 5),
+                     "speedup": round((t1 - t0) / (t2 - t1), 2) if t2 > t1 else None,
+                     "matches": int(sum(naive)), "identical": naive == fast})
+    return sorted(rows, key=lambda r: -r["naive_s"])
+
+
+def synthetic_text(n_words: int, trigger: str | None, rng: random.Random, every: int = 50) -> str:
+    words = [rng.choice(FILLER) for _ in range(n_words)]
+    if trigger:
+        for i in range(0, n_words, every):
+            words[i] = trigger
+    return " ".join(words)
+
+
+def growth_slope(fn, sizes: list[int], trigger: str | None, repeats: int = 2) -> float:
+    """Pente log-log du temps de fn(texte) en fonction du nombre de mots."""
+    rng = random.Random(0)
+    times = []
+    for n in sizes:
+        text = synthetic_text(n, trigger, rng)
+        best = float("inf")
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            fn(text)
+            best = min(best, time.perf_counter() - t0)
+        times.append(max(best, 1e-7))
+    return float(np.polyfit(np.log(sizes), np.log(times), 1)[0])
+
+
+def trigger_word(name: str) -> str | None:
+    """Un mot qui déclenche le préfixe du motif (pour exercer les lookarounds)."""
+    head = LOOKAROUND_HEADS.get(name)
+    if head is None:
+        return None
+    return re.sub(r"\\b|\(\?:chat\)\?", "", head).lower()
+
+
+def growth_report(sizes: list[int], threshold: float) -> list[dict]:
+    rows = []
+    for name, full, head in MODEL_PATTERNS:
+        if not full.pattern:
+            continue
+        trig = trigger_word(name)
+        naive = growth_slope(lambda t: full.search(t), sizes, trig)
+        fast = growth_slope(lambda t: pattern_matches(full, head, t), sizes, trig)
+        rows.append({"pattern": name, "naive_slope": round(naive, 2), "fast_slope": round(fast, 2),
+                     "superlinear": naive > threshold, "fast_superlinear": fast > threshold})
+    return rows
+
+
+def window_variant(rx: str, k: int) -> str:
+    """Remplace `.*` en tête des lookarounds par une fenêtre d'au plus k mots (sur la même ligne)."""
+    window = rf"(?:\S*[^\S\n]+){{0,{k}}}\S*?"
+    return rx.replace("(?=.*", f"(?={window}").replace("(?!.*", f"(?!{window}")
+
+
+def window_proposals(texts: list[str], windows: list[int]) -> list[dict]:
+    rows = []
+    for name, full, _ in MODEL_PATTERNS:
+        if "(?=.*" not in full.pattern and "(?!.*" not in full.pattern:
+            continue
+        ref = [full.search(t) is not None for t in texts]
+        candidates = []
+        for k in windows:
+            variant = re.compile(window_variant(MODEL_KEYWORDS[name], k), re.IGNORECASE)
+            t0 = time.perf_counter()
+            got = [variant.search(t) is not None for t in texts]
+            elapsed = time.perf_counter() - t0
+            agreement = float(np.mean([a == b for a, b in zip(ref, got)])) if texts else 1.0
+            candidates.append({"k": k, "agreement": round(agreement, 5), "seconds": round(elapsed, 5),
+                               "pattern": variant.pattern})
+        exact = [c for c in candidates if c["agreement"] == 1.0]
+        rows.append({"pattern": name, "candidates": candidates,
+                     "proposed_k": exact[0]["k"] if exact else None})
+    return rows
+
+
+def parity(texts: list[str]) -> dict:
+    mismatches = {"domain": 0, "task": 0, "model_family": 0}
+    t_naive = t_fast = 0.0
+    for text in texts:
+        t0 = time.perf_counter()
+        old = (naive_first_match(DOMAIN_KEYWORDS, text, "other"),
+               naive_first_match(TASK_KEYWORDS, text, "unspecified"),
+               naive_first_match(MODEL_KEYWORDS, text, "other", re.IGNORECASE))
+        t1 = time.perf_counter()
+        new = (first_match(DOMAIN_PATTERNS, text, "other"),
+               first_match(TASK_PATTERNS, text, "unspecified"),
+               first_match(MODEL_PATTERNS, text, "other"))
+        t2 = time.perf_counter()
+        t_naive += t1 - t0
+        t_fast += t2 - t1
+        for key, a, b in zip(mismatches, old, new):
+            mismatches[key] += a != b
+    return {"texts": len(texts), "mismatches": mismatches, "naive_s": round(t_naive, 4),
+            "fast_s": round(t_fast, 4), "speedup": round(t_naive / t_fast, 2) if t_fast else None}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coût des motifs regex de acl.py et variantes bornées.")
+    parser.add_argument("--json", default="resultats_classification_enrichie2.json",
+                        help="Sortie de cartographie_classification (clé details)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 400, 800, 1600],
+                        help="Longueurs (mots) des textes synthétiques")
+    parser.add_argument("--superlinear", type=float, default=1.3, help="Pente log-log au-delà de laquelle on signale")
+    parser.add_argument("--windows", type=int, nargs="+", default=[8, 16, 32, 64, 128])
+    parser.add_argument("--sample", type=int, default=2000,
+                        help="Nombre de textes du corpus (0 = tous ; la version naïve de \"gpt\" est lente)")
+    parser.add_argument("--out", default="regex_profile.json")
+    args = parser.parse_args()
+
+    texts = load_texts(args.json)
+    if args.sample and len(texts) > args.sample:
+        texts = random.Random(0).sample(texts, args.sample)
+    print(f"📄 {len(texts)} textes chargés depuis {args.json}")
+
+    report = {"patterns": time_patterns(texts), "growth": growth_report(args.sizes, args.superlinear),
+              "windows": window_proposals(texts, args.windows), "parity": parity(texts)}
+
+    print("\n⏱️ Coût par motif sur le corpus (naïf → candidats) :")
+    for r in report["patterns"][:10]:
+        print(f"- {r['pattern']:<20} {r['naive_s']:.4f} s → {r['fast_s']:.4f} s (x{r['speedup']}) "
+              f"{'✅' if r['identical'] else '❌'}")
+    print("\n📈 Motifs super-linéaires (textes synthétiques) :")
+    for r in report["growth"]:
+        if r["superlinear"] or r["fast_superlinear"]:
+            print(f"- {r['pattern']:<20} pente naïve={r['naive_slope']} | candidats={r['fast_slope']}")
+    print("\n🪟 Variantes bornées proposées :")
+    for r in report["windows"]:
+        print(f"- {r['pattern']:<20} k={r['proposed_k']}")
+    p = report["parity"]
+    print(f"\n🔎 Parité sur {p['texts']} textes : {p['mismatches']} | classification x{p['speedup']}")
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Rapport : {args.out}")
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import time
+from typing import Any
+
+# --- Index plein texte des papiers classés par acl.cartographie_classification ---
+# SQLite FTS5 (titre + résumé, tokenizer porter/unicode61, classement BM25 avec un poids
+# plus fort sur le titre) + colonnes de facettes indexées : année, venue, task_type, domain,
+# model_family. Un papier peut avoir plusieurs venues (ex: "emnlp, ws") : table paper_venues.
+#
+# Exemples :
+#   python acl_search.py build --json resultats_classification_enrichie2.json
+#   python acl_search.py query "lora" --year 2023 --venue emnlp
+#   python acl_search.py query '"few shot" NEAR/5 sentiment' --facets domain model_family
+
+DEFAULT_DB = "acl_index.sqlite"
+FACETS = ("year", "venue", "task_type", "domain", "model_family")
+TITLE_WEIGHT, ABSTRACT_WEIGHT = 10.0, 1.0
+
+SCHEMA = """
+CREATE TABLE papers (
+    id INTEGER PRIMARY KEY,
+    paper_id TEXT, title TEXT, abstract TEXT, year INTEGER, authors TEXT, venue TEXT,
+    task_type TEXT, domain TEXT, model_family TEXT, pdf_url TEXT
+);
+CREATE TABLE paper_venues (id INTEGER, venue TEXT);
+CREATE VIRTUAL TABLE papers_fts USING fts5(
+    title, abstract, content='papers', content_rowid='id', tokenize='porter unicode61'
+);
+"""
+INDEXES = """
+CREATE INDEX idx_year ON papers(year);
+CREATE INDEX idx_task ON papers(task_type);
+CREATE INDEX idx_domain ON papers(domain);
+CREATE INDEX idx_model ON papers(model_family);
+CREATE INDEX idx_venue ON paper_venues(venue, id);
+"""
+
+
+def _year(value: Any) -> int | None:
+    s = str(value or "").strip()
+    return int(s) if s.isdigit() else None
+
+
+def build_index(json_path: str, db_path: str = DEFAULT_DB) -> int:
+    """(Re)construit l'index à partir des details du JSON de cartographie."""
+    with open(json_path, encoding="utf-8") as f:
+        details = json.load(f)["details"]
+
+    con = sqlite3.connect(db_path)
+    con.executescript("DROP TABLE IF EXISTS papers_fts; DROP TABLE IF EXISTS paper_venues; DROP TABLE IF EXISTS papers;")
+    con.executescript(SCHEMA)
+    with con:
+        con.executemany(
+            "INSERT INTO papers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            ((i, d.get("paper_id"), d.get("title") or "", d.get("abstract") or "", _year(d.get("year")),
+              d.get("authors"), d.get("venue"), d.get("task_type"), d.get("domain"), d.get("model_family"),
+              d.get("pdf_url")) for i, d in enumerate(details)),
+        )
+        con.executemany(
+            "INSERT INTO paper_venues VALUES (?, ?)",
+            ((i, v.strip().lower()) for i, d in enumerate(details)
+             for v in str(d.get("venue") or "").split(",") if v.strip()),
+        )
+        con.execute("INSERT INTO papers_fts(papers_fts) VALUES ('rebuild')")
+        con.executescript(INDEXES)
+        con.execute("INSERT INTO papers_fts(papers_fts) VALUES ('optimize')")
+    con.execute("ANALYZE")
+    con.close()
+    print(f"🗂️ {len(details)} papiers indexés → {db_path}")
+    return len(details)
+
+
+class AclIndex:
+    """API de recherche : hits classés (BM25) + comptes par facette sur l'ensemble filtré."""
+
+    def __init__(self, db_path: str = DEFAULT_DB):
+        self.con = sqlite3.connect(db_path)
+        self.con.row_factory = sqlite3.Row
+
+    def close(self) -> None:
+        self.con.close()
+
+    def _filters(self, query: str | None, year: int | tuple | None, **facets: Any) -> tuple[str, list]:
+        where, params = [], []
+        if query:
+            where.append("p.id IN (SELECT rowid FROM papers_fts WHERE papers_fts MATCH ?)")
+            params.append(query)
+        if isinstance(year, (tuple, list)):
+            where.append("p.year BETWEEN ? AND ?")
+            params.extend(year)
+        elif year is not None:
+            where.append("p.year = ?")
+            params.append(int(year))
+        for col, value in facets.items():
+            if value is None:
+                continue
+            values = [value] if isinstance(value, str) else list(value)
+            marks = ", ".join("?" * len(values))
+            if col == "venue":
+                where.append(f"p.id IN (SELECT id FROM paper_venues WHERE venue IN ({marks}))")
+                values = [v.lower() for v in values]
+            else:
+                where.append(f"p.{col} IN ({marks})")
+            params.extend(values)
+        return (" AND ".join(where) or "1"), params
+
+    def search(self, query: str | None = None, year: int | tuple | None = None, venue: str | list | None = None,
+               task_type: str | list | None = None, domain: str | list | None = None,
+               model_family: str | list | None = None, limit: int = 20, facets: tuple = FACETS) -> dict:
+        """
+        query : syntaxe FTS5 ("lora", '"few shot"', 'bert NOT roberta', 'title:benchmark'...) ou None.
+        year : une année ou un intervalle (début, fin). Les autres filtres acceptent une valeur ou une liste.
+        """
+        t0 = time.perf_counter()
+        where, params = self._filters(query, year, venue=venue, task_type=task_type, domain=domain,
+                                      model_family=model_family)
+        if query:
+            sql = f"""
+                SELECT p.paper_id, p.title, p.year, p.venue, p.task_type, p.domain, p.model_family, p.pdf_url,
+                       bm25(papers_fts, {TITLE_WEIGHT}, {ABSTRACT_WEIGHT}) AS score,
+                       snippet(papers_fts, 1, '[', ']', '…', 12) AS snippet
+                FROM papers_fts JOIN papers p ON p.id = papers_fts.rowid
+                WHERE papers_fts MATCH ? AND {where}
+                ORDER BY score LIMIT ?"""
+            rows = self.con.execute(sql, [query, *params, limit]).fetchall()
+        else:
+            sql = f"""
+                SELECT p.paper_id, p.title, p.year, p.venue, p.task_type, p.domain, p.model_family, p.pdf_url
+                FROM papers p WHERE {where} ORDER BY p.year DESC LIMIT ?"""
+            rows = self.con.execute(sql, [*params, limit]).fetchall()
+
+        total = self.con.execute(f"SELECT COUNT(*) FROM papers p WHERE {where}", params).fetchone()[0]
+        facet_counts = {}
+        for col in facets:
+            if col == "venue":
+                sql = (f"SELECT v.venue AS value, COUNT(*) AS n FROM paper_venues v JOIN papers p ON p.id = v.id "
+                       f"WHERE {where} GROUP BY v.venue ORDER BY n DESC")
+            else:
+                sql = f"SELECT p.{col} AS value, COUNT(*) AS n FROM papers p WHERE {where} GROUP BY p.{col} ORDER BY n DESC"
+            facet_counts[col] = {r["value"]: r["n"] for r in self.con.execute(sql, params)}
+        return {"total": total, "hits": [dict(r) for r in rows], "facets": facet_counts,
+                "ms": round((time.perf_counter() - t0) * 1000, 2)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index FTS5 et recherche à facettes sur les papiers ACL classés.")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="Construire l'index")
+    b.add_argument("--json", default="resultats_classification_enrichie2.json")
+    q = sub.add_parser("query", help="Rechercher")
+    q.add_argument("query", nargs="?", default=None, help="Requête FTS5 (vide = filtres seuls)")
+    q.add_argument("--year", type=int, nargs="+", default=None, help="Année ou intervalle début fin")
+    q.add_argument("--venue", nargs="+", default=None)
+    q.add_argument("--task_type", nargs="+", default=None)
+    q.add_argument("--domain", nargs="+", default=None)
+    q.add_argument("--model_family", nargs="+", default=None)
+    q.add_argument("--limit", type=int, default=10)
+    q.add_argument("--facets", nargs="*", default=list(FACETS), choices=FACETS)
+    args = parser.parse_args()
+
+    if args.cmd == "build":
+        build_index(args.json, args.db)
+    else:
+        year = None if args.year is None else (args.year[0] if len(args.year) == 1 else tuple(args.year[:2]))
+        index = AclIndex(args.db)
+        res = index.search(args.query, year, args.venue, args.task_type, args.domain, args.model_family,
+                           args.limit, tuple(args.facets))
+        index.close()
+        print(f"🔎 {res['total']} papiers ({res['ms']} ms)")
+        for h in res["hits"]:
+            print(f"- {h['year']} | {h['venue']} | {h['title']} ({h['task_type']}, {h['domain']}, {h['model_family']})")
+            if h.get("snippet"):
+                print(f"    {h['snippet']}")
+        for col, counts in res["facets"].items():
+            top = ", ".join(f"{k}={v}" for k, v in list(counts.items())[:8])
+            print(f"📊 {col}: {top}")
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+# --- Classification sémantique des papiers ACL (alternative aux regex de acl.py) ---
+# 1) encodage titre + résumé avec un encodeur de phrases local (sentence-transformers), par gros
+#    batches triés par longueur ; vecteurs normalisés stockés en float16 dans une matrice mmappée
+#    (cache/acl_embeddings/<modèle>.f16.npy + .ids.json) : seuls les paper_id absents sont encodés
+# 2) affectation de task_type / domain / model_family à partir des vecteurs en cache :
+#    - prototypes : centroïde des descriptions textuelles de chaque catégorie (--definitions, ou
+#      les alternatives des regex de acl.py par défaut), seuil --min_sim sinon catégorie par défaut
+#    - centroids  : centroïde des papiers étiquetés par les regex (supervision faible)
+#    - linear     : régression logistique sur les étiquettes regex, prédictions hors échantillon
+#      (validation croisée stratifiée) pour que l'accord avec les regex ne soit pas mesuré sur le train
+# Changer les définitions ne touche que la matrice en cache (quelques secondes).
+#
+# Exemple :
+#   python acl_semantic.py --json resultats_classification_enrichie2.json --mode prototypes
+#   python acl_semantic.py --mode prototypes --definitions mes_categories.json
+
+CACHE_DIR = os.path.join("cache", "acl_embeddings")
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+FIELDS = {"task_type": "unspecified", "domain": "other", "model_family": "other"}
+LINEAR_FOLDS = 5  # mode linear : plis de validation croisée
+
+
+def paper_text(d: dict) -> str:
+    return f"{d.get('title') or ''}. {d.get('abstract') or ''}".strip()
+
+
+def load_encoder(model_name: str):
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError as e:
+        raise ImportError("sentence-transformers est requis (pip install sentence-transformers)") from e
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def encode(encoder, texts: list[str], batch_size: int = 256) -> np.ndarray:
+    """Vecteurs normalisés (float32), encodés par batches triés par longueur."""
+    order = np.argsort([len(t) for t in texts], kind="stable")
+    out = np.empty((len(texts), encoder.get_sentence_embedding_dimension()), dtype=np.float32)
+    for i in range(0, len(texts), batch_size):
+        idx = order[i:i + batch_size]
+        out[idx] = encoder.encode([texts[j] for j in idx], batch_size=batch_size,
+                                  normalize_embeddings=True, convert_to_numpy=True)
+    return out
+
+
+class EmbeddingCache:
+    """Matrice float16 mmappée (une ligne par papier) + index paper_id → ligne."""
+
+    def __init__(self, model_name: str, cache_dir: str = CACHE_DIR):
+        slug = model_name.replace("/", "-")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.matrix_path = os.path.join(cache_dir, f"{slug}.f16.npy")
+        self.ids_path = os.path.join(cache_dir, f"{slug}.ids.json")
+        self.ids: list[str] = []
+        if os.path.exists(self.ids_path) and os.path.exists(self.matrix_path):
+            with open(self.ids_path, encoding="utf-8") as f:
+                self.ids = json.load(f)
+        self.row = {pid: i for i, pid in enumerate(self.ids)}
+
+    def matrix(self) -> np.ndarray:
+        if not self.ids:
+            return np.empty((0, 0), dtype=np.float16)
+        return np.load(self.matrix_path, mmap_mode="r")
+
+    def add(self, ids: list[str], vectors: np.ndarray) -> None:
+        """Ajoute des lignes : nouvelle matrice = ancienne + nouvelles (copie séquentielle)."""
+        old = self.matrix()
+        n_old, dim = len(self.ids), vectors.shape[1]
+        tmp = self.matrix_path + ".tmp.npy"
+        mm = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float16, shape=(n_old + len(ids), dim))
+        if n_old:
+            mm[:n_old] = old
+        mm[n_old:] = vectors.astype(np.float16)
+        mm.flush()
+        del mm, old
+        os.replace(tmp, self.matrix_path)
+        self.ids.extend(ids)
+        self.row = {pid: i for i, pid in enumerate(self.ids)}
+        with open(self.ids_path, "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+
+    def get(self, ids: list[str]) -> np.ndarray:
+        rows = np.fromiter((self.row[pid] for pid in ids), dtype=np.int64, count=len(ids))
+        return np.asarray(self.matrix()[rows], dtype=np.float32)
+
+
+def ensure_embeddings(details: list[dict], cache: EmbeddingCache, model_name: str, batch_size: int) -> None:
+    missing = list({d["paper_id"]: d for d in details if d["paper_id"] not in cache.row}.values())  # 1 par paper_id
+    if not missing:
+        print(f"🗃️ {len(details)} vecteurs déjà en cache")
+        return
+    t0 = time.perf_counter()
+    vectors = encode(load_encoder(model_name), [paper_text(d) for d in missing], batch_size)
+    cache.add([d["paper_id"] for d in missing], vectors)
+    dt = time.perf_counter() - t0
+    print(f"🧮 {len(missing)} papiers encodés en {dt:.1f} s ({len(missing) / dt:.0f} papiers/s)")
+
+
+def strip_lookarounds(rx: str) -> str:
+    """Retire les groupes (?=...) / (?!...) (contexte de désambiguïsation, pas une description)."""
+    out, i = [], 0
+    while i < len(rx):
+        if rx.startswith(("(?=", "(?!"), i):
+            depth = 0
+            while i < len(rx):
+                if rx[i] == "\\":
+                    i += 2
+                    continue
+                depth += (rx[i] == "(") - (rx[i] == ")")
+                i += 1
+                if depth == 0:
+                    break
+        else:
+            out.append(rx[i])
+            i += 1
+    return "".join(out)
+
+
+def regex_phrases(rx: str) -> list[str]:
+    """Alternatives de premier niveau d'une regex, réduites à du texte ("convolution(?:al)?\\s+network" → "convolution network")."""
+    rx = strip_lookarounds(rx)
+    while True:  # groupes optionnels (?:...)? → supprimés
+        reduced = re.sub(r"\((?:\?:)?[^()]*\)\?", "", rx)
+        if reduced == rx:
+            break
+        rx = reduced
+    parts, depth, cur = [], 0, []
+    for ch in rx:
+        depth += (ch == "(") - (ch == ")")
+        if ch == "|" and depth == 0:
+            parts.append("".join(cur))
+            cur = []
+        else:
+            cur.append(ch)
+    parts.append("".join(cur))
+    phrases = []
+    for p in parts:
+        p = re.sub(r"\\[bd][*+]?|\[- \]\??", " ", p)
+        p = re.sub(r"\\s[*+]?", " ", p)
+        p = re.sub(r"[\\()?:\[\]{}+*|]", " ", p)
+        p = " ".join(p.split())
+        if len(p) > 1:
+            phrases.append(p)
+    return phrases
+
+
+def definitions_from_regex() -> dict:
+    """Descriptions par défaut : les alternatives des regex de acl.py (catégories par défaut exclues)."""
+    from acl import DOMAIN_KEYWORDS, MODEL_KEYWORDS, TASK_KEYWORDS
+    defs = {}
+    for field, keywords in (("task_type", TASK_KEYWORDS), ("domain", DOMAIN_KEYWORDS), ("model_family", MODEL_KEYWORDS)):
+        defs[field] = {}
+        for name, rx in keywords.items():
+            phrases = regex_phrases(rx)
+            if phrases:
+                defs[field][name] = [f"{name.replace('_', ' ')}: {p}" for p in phrases]
+    return defs
+
+
+def prototypes(encoder, definitions: dict) -> dict:
+    """{champ: (noms, matrice des centroïdes normalisés)} à partir des descriptions textuelles."""
+    out = {}
+    for field, cats in definitions.items():
+        names = list(cats)
+        cents = np.stack([encode(encoder, list(cats[n])).mean(axis=0) for n in names])
+        out[field] = (names, cents / np.linalg.norm(cents, axis=1, keepdims=True))
+    return out
+
+
+def label_centroids(X: np.ndarray, labels: list[str]) -> tuple[list, np.ndarray]:
+    """Centroïdes des papiers regroupés par étiquette (une somme par catégorie via np.add.at)."""
+    names, inv = np.unique(np.asarray(labels, dtype=object).astype(str), return_inverse=True)
+    sums = np.zeros((len(names), X.shape[1]), dtype=np.float64)
+    np.add.at(sums, inv, X)
+    return list(names), sums / np.linalg.norm(sums, axis=1, keepdims=True)
+
+
+def nearest(X: np.ndarray, names: list, cents: np.ndarray, default: str, min_sim: float) -> tuple[list, np.ndarray]:
+    sims = X @ cents.T
+    best = sims.argmax(axis=1)
+    score = sims[np.arange(len(X)), best]
+    labels = [names[b] if s >= min_sim else default for b, s in zip(best, score)]
+    return labels, score
+
+
+def classify(details: list[dict], X: np.ndarray, mode: str, min_sim: float, definitions: dict | None,
+             model_name: str) -> dict:
+    """{champ: (étiquettes, scores)} pour chaque champ de FIELDS."""
+    out = {}
+    if mode == "prototypes":
+        protos = prototypes(load_encoder(model_name), definitions or definitions_from_regex())
+    for field, default in FIELDS.items():
+        if mode == "prototypes":
+            if field not in protos:
+                continue
+            names, cents = protos[field]
+            out[field] = nearest(X, names, cents, default, min_sim)
+        elif mode == "centroids":
+            names, cents = label_centroids(X, [d.get(field) for d in details])
+            out[field] = nearest(X, names, cents, default, -1.0)
+        else:
+            from sklearn.linear_model import LogisticRegression
+            from sklearn.model_selection import StratifiedKFold, cross_val_predict
+            y = np.asarray([str(d.get(field)) for d in details])
+            classes, counts = np.unique(y, return_counts=True)
+            # Plis stratifiés : les deux classes les plus fréquentes sont présentes dans chaque train
+            n_splits = min(LINEAR_FOLDS, int(np.sort(counts)[-2])) if len(classes) > 1 else 0
+            if n_splits < 2:
+                continue
+            cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=0)
+            proba = cross_val_predict(LogisticRegression(max_iter=1000), X, y, cv=cv,
+                                      method="predict_proba", n_jobs=-1)
+            out[field] = (list(classes[proba.argmax(axis=1)]), proba.max(axis=1))
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classification sémantique (encodeur de phrases) des papiers ACL.")
+    parser.add_argument("--json", default="resultats_classification_enrichie2.json",
+                        help="Sortie de cartographie_classification (clé details)")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--batch_size", type=int, default=256)
+    parser.add_argument("--mode", default="prototypes", choices=["prototypes", "centroids", "linear"])
+    parser.add_argument("--definitions", default=None,
+                        help="JSON {champ: {catégorie: [descriptions...]}} (défaut : dérivé des regex de acl.py)")
+    parser.add_argument("--min_sim", type=float, default=0.3, help="Similarité minimale (mode prototypes)")
+    parser.add_argument("--out", default="resultats_classification_semantique.json")
+    args = parser.parse_args()
+
+    with open(args.json, encoding="utf-8") as f:
+        resultats = json.load(f)
+    details = resultats["details"]
+
+    cache = EmbeddingCache(args.model)
+    ensure_embeddings(details, cache, args.model, args.batch_size)
+
+    t0 = time.perf_counter()
+    X = cache.get([d["paper_id"] for d in details])
+    definitions = None
+    if args.definitions:
+        with open(args.definitions, encoding="utf-8") as f:
+            definitions = json.load(f)
+    assigned = classify(details, X, args.mode, args.min_sim, definitions, args.model)
+    print(f"🏷️ Classification ({args.mode}) en {time.perf_counter() - t0:.2f} s")
+
+    for field, (labels, scores) in assigned.items():
+        agree = np.mean([lab == d.get(field) for lab, d in zip(labels, details)])
+        print(f"- {field:<13} accord avec les regex : {agree:.1%}")
+        for d, lab, s in zip(details, labels, scores):
+            d[f"{field}_semantic"] = lab
+            d[f"{field}_semantic_score"] = round(float(s), 4)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(resultats, f, ensure_ascii=False, indent=2)
+    print(f"💾 {args.out}")
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.ndimage import gaussian_filter1d
+
+# --- Cube de tendances année × catégorie pour les papiers classés -------------
+# Construit une fois (un np.bincount par colonne catégorielle) puis sauvegardé en .npz à côté du
+# JSON de cartographie. Toutes les statistiques portent sur la matrice (années × catégories) entière :
+#   - normalisation en % par année, lissage gaussien le long des années (toutes les catégories d'un coup)
+#   - croissance d'une année sur l'autre
+#   - point de rupture : meilleure coupure en deux segments de moyennes différentes (sommes cumulées)
+# Les séries demandées sont mémorisées : une requête répétée (tableau de bord) ne recalcule rien.
+#
+# Exemple :
+#   python acl_trends.py --json resultats_classification_enrichie2.json --column model_family
+
+CATEGORICAL = ("task_type", "domain", "model_family")
+FILLNA = {"model_family": "other"}  # comme plot_evolution_model_family ; ailleurs les NaN sont ignorés
+
+
+class TrendCube:
+    def __init__(self, years: np.ndarray, cubes: dict[str, tuple[list, np.ndarray]]):
+        self.years = years
+        self.cubes = cubes  # colonne → (catégories, comptes int64 années × catégories)
+        self._memo: dict = {}
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame, columns=CATEGORICAL) -> "TrendCube":
+        df = df[df["year"].astype(str).str.isnumeric()]
+        year_vals = df["year"].astype(int).to_numpy()
+        years = np.unique(year_vals)
+        year_codes = np.searchsorted(years, year_vals)
+        cubes = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            values = df[col].fillna(FILLNA[col]) if col in FILLNA else df[col]
+            cat = pd.Categorical(values)
+            codes = np.asarray(cat.codes)
+            keep = codes >= 0
+            n_cat = len(cat.categories)
+            flat = year_codes[keep] * n_cat + codes[keep]
+            counts = np.bincount(flat, minlength=len(years) * n_cat).reshape(len(years), n_cat)
+            cubes[col] = ([str(c) for c in cat.categories], counts)
+        return cls(years, cubes)
+
+    @classmethod
+    def from_json(cls, json_path: str, cube_path: str | None = None, columns=CATEGORICAL) -> "TrendCube":
+        """Recharge le cube sauvegardé s'il est plus récent que le JSON, sinon le reconstruit et le sauvegarde."""
+        cube_path = cube_path or os.path.splitext(json_path)[0] + ".cube.npz"
+        if os.path.exists(cube_path) and os.path.getmtime(cube_path) >= os.path.getmtime(json_path):
+            cube = cls.load(cube_path)
+            if all(c in cube.cubes for c in columns):
+                return cube
+        with open(json_path, encoding="utf-8") as f:
+            cube = cls.from_df(pd.DataFrame(json.load(f)["details"]), columns)
+        cube.save(cube_path)
+        return cube
+
+    def save(self, path: str) -> None:
+        arrays = {"years": self.years}
+        for col, (cats, counts) in self.cubes.items():
+            arrays[f"{col}__categories"] = np.asarray(cats, dtype=str)
+            arrays[f"{col}__counts"] = counts
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "TrendCube":
+        with np.load(path) as data:
+            cols = [k[:-len("__counts")] for k in data.files if k.endswith("__counts")]
+            cubes = {c: (data[f"{c}__categories"].tolist(), data[f"{c}__counts"]) for c in cols}
+            return cls(data["years"], cubes)
+
+    # --- Requêtes ---------------------------------------------------------------
+
+    def matrix(self, column: str, normalize: bool = False, smooth: bool = False, sigma: float = 1.0) -> tuple[list, np.ndarray]:
+        """(catégories, matrice float années × catégories) normalisée et/ou lissée."""
+        key = ("matrix", column, normalize, smooth, sigma)
+        if key not in self._memo:
+            cats, counts = self.cubes[column]
+            m = counts.astype(float)
+            if normalize:
+                row_sums = m.sum(axis=1, keepdims=True)
+                row_sums[row_sums == 0] = 1
+                m = m / row_sums * 100.0
+            if smooth and len(m) > 3:
+                m = gaussian_filter1d(m, sigma=sigma, axis=0)
+            self._memo[key] = (cats, m)
+        return self._memo[key]
+
+    def series(self, column: str, normalize: bool = False, smooth: bool = False, sigma: float = 1.0,
+               exclude=None) -> pd.DataFrame:
+        """DataFrame indexé par année, une colonne par catégorie (équivalent du pivot d'origine)."""
+        key = ("series", column, normalize, smooth, sigma, tuple(exclude or ()))
+        if key not in self._memo:
+            cats, m = self.matrix(column, normalize, smooth, sigma)
+            df = pd.DataFrame(m, index=pd.Index(self.years, name="year"), columns=pd.Index(cats, name=column))
+            if exclude:
+                df = df.drop(columns=[c for c in exclude if c in df.columns])
+            self._memo[key] = df
+        return self._memo[key]
+
+    def growth(self, column: str, normalize: bool = False) -> pd.DataFrame:
+        """Croissance relative d'une année à l'autre (NaN si l'année précédente vaut 0)."""
+        key = ("growth", column, normalize)
+        if key not in self._memo:
+            cats, m = self.matrix(column, normalize)
+            prev = m[:-1]
+            g = np.divide(m[1:] - prev, prev, out=np.full(prev.shape, np.nan), where=prev > 0)
+            self._memo[key] = pd.DataFrame(g, index=pd.Index(self.years[1:], name="year"), columns=cats)
+        return self._memo[key]
+
+    def changepoints(self, column: str, normalize: bool = False, min_size: int = 2) -> pd.DataFrame:
+        """
+        Pour chaque catégorie, la coupure k qui minimise la somme des carrés intra-segments
+        (moyenne avant / après) : gain = n1·n2/n · (moyenne_après − moyenne_avant)², pour toutes
+        les coupures et toutes les catégories à la fois.
+        """
+        key = ("changepoints", column, normalize, min_size)
+        if key not in self._memo:
+            cats, m = self.matrix(column, normalize)
+            n = len(m)
+            ks = np.arange(min_size, n - min_size + 1)
+            if len(ks) == 0:
+                return pd.DataFrame(columns=["category", "year", "mean_before", "mean_after", "gain"])
+            csum = np.cumsum(m, axis=0)
+            total = csum[-1]
+            before = csum[ks - 1] / ks[:, None]
+            after = (total - csum[ks - 1]) / (n - ks)[:, None]
+            gain = (ks * (n - ks) / n)[:, None] * (after - before) ** 2
+            best = gain.argmax(axis=0)
+            cols = np.arange(len(cats))
+            self._memo[key] = pd.DataFrame({
+                "category": cats,
+                "year": self.years[ks[best]],  # première année du second segment
+                "mean_before": before[best, cols],
+                "mean_after": after[best, cols],
+                "gain": gain[best, cols],
+            }).sort_values("gain", ascending=False, ignore_index=True)
+        return self._memo[key]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cube de tendances année × catégorie des papiers ACL classés.")
+    parser.add_argument("--json", default="resultats_classification_enrichie2.json")
+    parser.add_argument("--column", default="model_family", choices=CATEGORICAL)
+    parser.add_argument("--normalize", action="store_true")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    cube = TrendCube.from_json(args.json)
+    print(f"🧊 Cube prêt en {(time.perf_counter() - t0) * 1000:.1f} ms "
+          f"({len(cube.years)} années, {', '.join(f'{c}={len(v[0])}' for c, v in cube.cubes.items())})")
+
+    t0 = time.perf_counter()
+    cube.series(args.column, args.normalize, smooth=True, sigma=1.2)
+    t1 = time.perf_counter()
+    cube.series(args.column, args.normalize, smooth=True, sigma=1.2)
+    t2 = time.perf_counter()
+    print(f"⏱️ Série lissée : {(t1 - t0) * 1000:.2f} ms (premier appel), {(t2 - t1) * 1000:.3f} ms (répété)")
+
+    print(f"\n📈 Croissance {cube.years[-1]} vs {cube.years[-2]} :" if len(cube.years) > 1 else "")
+    if len(cube.years) > 1:
+        last = cube.growth(args.column, args.normalize).iloc[-1].dropna().sort_values(ascending=False)
+        for cat, g in last.head(8).items():
+            print(f"- {cat:<20} {g:+.1%}")
+    print("\n🔀 Points de rupture :")
+    for r in cube.changepoints(args.column, args.normalize).head(8).itertuples():
+        print(f"- {r.category:<20} dès {r.year} : {r.mean_before:.1f} → {r.mean_after:.1f}")
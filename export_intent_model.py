@@ -0,0 +1,101 @@
+# export_intent_model.py
+# Exporte le modèle d'intention entraîné par model.py en plusieurs variantes TF.js
+# (float32, float16, uint8) et compare :
+#   - la taille des artefacts (dossier et ZIP deflate)
+#   - le temps de rechargement Python des artefacts TF.js (tensorflowjs → Keras) : utile pour comparer
+#     les variantes entre elles, mais ce n'est PAS un démarrage à froid TF.js dans le navigateur ou Node
+#   - la parité des prédictions avec le modèle Keras (écart max des probabilités, accord des argmax)
+#
+# Exemple :
+#   python model.py --corpus "data/intents/*.tsv"
+#   python export_intent_model.py --sample "data/intents/valid.tsv" --n 2000
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+import tensorflowjs as tfjs
+
+from model import DEMO_LINES, EXPORT_PATH, OUT_DIR, OOV, PAD, QUANTIZATION, export_tfjs, iter_lines, tokenize
+
+
+def encode(lines, vocab):
+    """Phrases TSV → matrice (n, max_len) paddée à droite, comme le hook JS."""
+    word_index, max_len = vocab["word_index"], vocab["max_len"]
+    X = np.full((len(lines), max_len), PAD, dtype=np.int32)
+    for i, line in enumerate(lines):
+        ids = [word_index.get(w, OOV) for w in tokenize(line.partition("\t")[2])][:max_len]
+        X[i, :len(ids)] = ids
+    return X
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def time_python_reload(path, repeats):
+    """Médiane du rechargement Python (tensorflowjs) de model.json + poids, sans le runtime JS."""
+    times = []
+    for _ in range(repeats):
+        tf.keras.backend.clear_session()
+        start = time.perf_counter()
+        loaded = tfjs.converters.load_keras_model(os.path.join(path, "model.json"))
+        times.append(time.perf_counter() - start)
+    return loaded, float(np.median(times))
+
+
+def main(out_dir, export_root, sample_files, n, repeats):
+    with open(os.path.join(out_dir, "vocab.json"), encoding="utf-8") as f:
+        vocab = json.load(f)
+    model = tf.keras.models.load_model(os.path.join(out_dir, "model.keras"))
+
+    lines = []
+    for line in iter_lines(sample_files) if sample_files else DEMO_LINES:
+        if "\t" in line:
+            lines.append(line)
+        if len(lines) >= n:
+            break
+    X = encode(lines, vocab)
+    ref = model.predict(X, batch_size=256, verbose=0)
+
+    report = {}
+    for quantize in QUANTIZATION:
+        path = f"{export_root}_{quantize}"
+        export_tfjs(model, path, vocab, quantize)
+        loaded, reload_s = time_python_reload(path, repeats)
+        probs = loaded.predict(X, batch_size=256, verbose=0)
+        report[quantize] = {
+            "dir_bytes": dir_size(path),
+            "weights_bytes": sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path) if f.endswith(".bin")),
+            "zip_bytes": os.path.getsize(f"{path}.zip"),
+            "vocab_index_bytes": os.path.getsize(os.path.join(path, "vocab_index.json")),
+            "py_reload_s": round(reload_s, 4),
+            "max_abs_diff": float(np.abs(probs - ref).max()),
+            "argmax_agreement": float((probs.argmax(-1) == ref.argmax(-1)).mean()),
+            "samples": len(lines),
+        }
+        r = report[quantize]
+        print(f"📦 {quantize:<8} zip={r['zip_bytes'] / 1024:8.1f} Ko | rechargement py={r['py_reload_s'] * 1000:7.1f} ms "
+              f"| écart max={r['max_abs_diff']:.2e} | accord={r['argmax_agreement']:.4f}")
+
+    base = report["none"]["zip_bytes"]
+    for r in report.values():
+        r["zip_ratio_vs_fp32"] = round(r["zip_bytes"] / base, 4)
+    with open(f"{export_root}_report.json", "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Rapport : {export_root}_report.json")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exports TF.js quantifiés du modèle d'intention + rapport taille/rechargement Python/parité.")
+    parser.add_argument("--out_dir", default=OUT_DIR, help="Dossier du modèle Keras et de vocab.json (model.py)")
+    parser.add_argument("--export_root", default=EXPORT_PATH, help="Préfixe des exports (ex: tfjs_model_uint8/)")
+    parser.add_argument("--sample", nargs="*", default=None, help="Fichiers TSV pour la parité (défaut : phrases de démo)")
+    parser.add_argument("--n", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    main(args.out_dir, args.export_root, args.sample, args.n, args.repeats)
@@ -0,0 +1,182 @@
+# intent_server.py
+# Service HTTP de prédiction d'intention autour des artefacts de model.py
+# (intent_model/model.keras + vocab.json, même tokenisation que l'entraînement).
+#
+# Les requêtes concurrentes sont regroupées en micro-batches : le premier texte arrivé ouvre une
+# fenêtre de --window_ms, on ajoute tout ce qui arrive jusqu'à --max_batch textes, puis un seul
+# predict_on_batch est exécuté (dans un thread, la boucle asyncio reste libre).
+#
+#   POST /predict   {"text": "..."} ou {"texts": ["...", ...]}
+#                   → {"intents": [...], "labels": [...], "probs": [[...], ...]}
+#   GET  /stats     histogrammes de latence (attente, modèle, total) et des tailles de batch
+#
+# Exemple :
+#   python intent_server.py --port 8090 --window_ms 5 --max_batch 128
+#   curl -X POST localhost:8090/predict -d '{"text": "mets une playlist jazz"}'
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+from aiohttp import web
+
+from intent_text import OOV, OUT_DIR, PAD, tokenize
+
+# Bornes supérieures des buckets des histogrammes (ms) ; la dernière case compte le reste
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+BATCH_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = np.asarray(bounds, dtype=float)
+        self.counts = np.zeros(len(bounds) + 1, dtype=np.int64)
+        self.total = 0.0
+        self.n = 0
+
+    def add(self, values):
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        self.counts += np.bincount(np.searchsorted(self.bounds, values), minlength=len(self.counts))
+        self.total += float(values.sum())
+        self.n += len(values)
+
+    def quantile(self, q):
+        """Borne supérieure du bucket contenant le quantile q (estimation par histogramme)."""
+        if self.n == 0:
+            return None
+        i = int(np.searchsorted(np.cumsum(self.counts), q * self.n))
+        return float(self.bounds[i]) if i < len(self.bounds) else float("inf")
+
+    def to_dict(self):
+        labels = [f"<={b:g}" for b in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return {
+            "count": self.n,
+            "mean": self.total / self.n if self.n else None,
+            "p50": self.quantile(0.5), "p95": self.quantile(0.95), "p99": self.quantile(0.99),
+            "buckets": dict(zip(labels, self.counts.tolist())),
+        }
+
+
+class MicroBatcher:
+    """File d'attente de textes → un appel au modèle par micro-batch."""
+
+    def __init__(self, model, vocab, window_ms=5.0, max_batch=128):
+        self.model = model
+        self.word_index = vocab["word_index"]
+        self.labels = vocab["labels"]
+        self.max_len = vocab["max_len"]
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.stats = {"wait_ms": Histogram(LATENCY_BUCKETS_MS), "model_ms": Histogram(LATENCY_BUCKETS_MS),
+                      "total_ms": Histogram(LATENCY_BUCKETS_MS), "batch_size": Histogram(BATCH_BUCKETS)}
+        self._task = None
+
+    def encode(self, texts):
+        """Padding au plus long du batch (au plus max_len), comme les buckets de l'entraînement."""
+        seqs = [[self.word_index.get(w, OOV) for w in tokenize(t)][:self.max_len] or [OOV] for t in texts]
+        X = np.full((len(seqs), max(map(len, seqs))), PAD, dtype=np.int32)
+        for i, ids in enumerate(seqs):
+            X[i, :len(ids)] = ids
+        return X
+
+    async def start(self, app=None):
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self, app=None):
+        self._task.cancel()
+
+    async def predict(self, texts):
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            fut = loop.create_future()
+            await self.queue.put((text, fut, time.perf_counter()))
+            futures.append(fut)
+        return await asyncio.gather(*futures)
+
+    async def _loop(self):
+        while True:
+            batch = [await self.queue.get()]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts, futures, arrivals = zip(*batch)
+            t0 = time.perf_counter()
+            try:
+                probs = await asyncio.to_thread(self.model.predict_on_batch, self.encode(texts))
+            except Exception as e:
+                for fut in futures:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            t1 = time.perf_counter()
+            probs = np.asarray(probs)
+            for fut, p in zip(futures, probs):
+                if not fut.done():
+                    fut.set_result(p)
+
+            arrivals = np.asarray(arrivals)
+            self.stats["wait_ms"].add((t0 - arrivals) * 1000)
+            self.stats["model_ms"].add((t1 - t0) * 1000)
+            self.stats["total_ms"].add((t1 - arrivals) * 1000)
+            self.stats["batch_size"].add(len(batch))
+
+
+def make_app(batcher: MicroBatcher) -> web.Application:
+    async def predict(request: web.Request) -> web.Response:
+        try:
+            payload = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text="corps JSON invalide")
+        if not isinstance(payload, dict):
+            raise web.HTTPBadRequest(text='attendu : {"text": "..."} ou {"texts": ["...", ...]}')
+        texts = payload["texts"] if "texts" in payload else [payload.get("text")]
+        if not isinstance(texts, list) or not texts or not all(isinstance(t, str) for t in texts):
+            raise web.HTTPBadRequest(text='"text" (chaîne) ou "texts" (liste non vide de chaînes) requis')
+        probs = await batcher.predict(texts)
+        intents = [int(p.argmax()) for p in probs]
+        return web.json_response({
+            "intents": intents,
+            "labels": [batcher.labels[i] for i in intents],
+            "probs": [p.round(6).tolist() for p in probs],
+        })
+
+    async def stats(request: web.Request) -> web.Response:
+        return web.json_response({name: h.to_dict() for name, h in batcher.stats.items()},
+                                 dumps=lambda o: json.dumps(o, indent=2))
+
+    app = web.Application()
+    app.router.add_post("/predict", predict)
+    app.router.add_get("/stats", stats)
+    app.on_startup.append(batcher.start)
+    app.on_cleanup.append(batcher.stop)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service de prédiction d'intention avec micro-batching.")
+    parser.add_argument("--model_dir", default=OUT_DIR, help="Dossier produit par model.py (model.keras + vocab.json)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--window_ms", type=float, default=5.0, help="Fenêtre de regroupement des requêtes (ms).")
+    parser.add_argument("--max_batch", type=int, default=128)
+    args = parser.parse_args()
+
+    import tensorflow as tf
+    with open(os.path.join(args.model_dir, "vocab.json"), encoding="utf-8") as f:
+        vocab = json.load(f)
+    model = tf.keras.models.load_model(os.path.join(args.model_dir, "model.keras"))
+    model.predict_on_batch(np.full((1, 1), OOV, dtype=np.int32))  # préchauffage (traçage du graphe)
+    print(f"🚀 Modèle chargé ({len(vocab['word_index'])} mots, {len(vocab['labels'])} intentions)")
+    web.run_app(make_app(MicroBatcher(model, vocab, args.window_ms, args.max_batch)), host=args.host, port=args.port)
@@ -0,0 +1,17 @@
+# intent_text.py
+# Prétraitement du texte partagé par model.py (entraînement, tf.data) et intent_server.py (service).
+# Volontairement sans TensorFlow : le serveur n'importe TF qu'au chargement du modèle.
+
+import re
+
+# --- CONFIG ---
+OUT_DIR = "intent_model"
+# Mêmes filtres que keras.preprocessing.text.Tokenizer
+FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n'
+FILTER_RE = "[" + re.escape(FILTERS) + "]"
+PAD, OOV = 0, 1               # ids réservés ; les mots commencent à 2
+
+
+def tokenize(text):
+    """Même découpage que le pipeline tf.data (minuscules, filtres → espaces, split)."""
+    return re.sub(FILTER_RE, " ", text.lower()).split()
@@ -0,0 +1,179 @@
+# jsonl_loader.py
+# Lecture efficace des corpus JSONL du type brighter_subset_explained.jsonl ({"text", "explanation"} par ligne).
+#
+#   - index des positions (début, fin) de chaque enregistrement, construit une fois avec numpy sur le
+#     fichier mmappé puis sauvegardé à côté (<fichier>.idx.npy) et réutilisé tant que le fichier ne change pas
+#   - accès O(1) à n'importe quel enregistrement : ds[i] ne lit que les octets de la ligne i
+#   - itération paresseuse par batches (orjson si installé, sinon json), éventuellement sur un shard
+#   - map_shards : un traitement par shard dans des processus séparés
+#   - to_parquet : conversion en Parquet colonnaire par row groups, sans tout charger en mémoire
+#
+# Exemple :
+#   python jsonl_loader.py brighter_subset_explained.jsonl --show 2 --parquet brighter.parquet
+
+import argparse
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:  # repli : json de la bibliothèque standard (plus lent)
+    import json
+    loads = json.loads
+
+
+def build_index(path: str, chunk_bytes: int = 64 << 20) -> np.ndarray:
+    """Tableau (n, 2) int64 des positions [début, fin) de chaque ligne non vide."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    newlines = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for start in range(0, size, chunk_bytes):
+            block = np.frombuffer(mm, dtype=np.uint8, count=min(chunk_bytes, size - start), offset=start)
+            newlines.append(np.flatnonzero(block == ord("\n")) + start)
+            del block  # libère la vue avant la fermeture du mmap
+        ends = np.concatenate(newlines + [np.array([size], dtype=np.int64)])
+        starts = np.concatenate([[0], ends[:-1] + 1])
+        keep = ends > starts  # un enregistrement d'un octet (ex: "1") est valide
+        # Seules les lignes qui commencent par un blanc peuvent être vides ("\r" seul, espaces) :
+        # on ne relit que celles-là, les enregistrements JSON commencent par un caractère visible
+        data = np.frombuffer(mm, dtype=np.uint8)
+        first = data[np.minimum(starts, size - 1)]
+        del data
+        for i in np.flatnonzero(keep & np.isin(first, np.frombuffer(b" \t\r", dtype=np.uint8))):
+            keep[i] = bool(mm[starts[i]:ends[i]].strip())
+    return np.stack([starts[keep], ends[keep]], axis=1).astype(np.int64)
+
+
+class JsonlDataset:
+    """Accès indexé et itération par batches sur un fichier JSONL, via mmap."""
+
+    def __init__(self, path: str, index_path: str | None = None):
+        self.path = str(path)
+        self.index_path = index_path or f"{self.path}.idx.npy"
+        self.index = self._load_or_build_index()
+        self._file = open(self.path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if len(self.index) else b""
+
+    def _load_or_build_index(self) -> np.ndarray:
+        if os.path.exists(self.index_path) and os.path.getmtime(self.index_path) >= os.path.getmtime(self.path):
+            index = np.load(self.index_path)
+            if len(index) == 0 or index[-1, 1] <= os.path.getsize(self.path):
+                return index
+        index = build_index(self.path)
+        np.save(self.index_path, index)
+        print(f"🗂️ Index construit : {len(index)} enregistrements → {self.index_path}")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, i: int) -> dict:
+        start, end = self.index[i]
+        return loads(self._mm[start:end])
+
+    def close(self):
+        if len(self.index):
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def shard_range(self, shard: int = 0, num_shards: int = 1) -> tuple[int, int]:
+        """Plage [début, fin) d'enregistrements du shard (découpage contigu)."""
+        bounds = np.linspace(0, len(self), num_shards + 1).astype(int)
+        return int(bounds[shard]), int(bounds[shard + 1])
+
+    def iter_batches(self, batch_size: int = 1024, fields: list | None = None,
+                     shard: int = 0, num_shards: int = 1):
+        """Batches colonnaires {champ: [valeurs]} lus paresseusement (une tranche d'octets par batch)."""
+        lo, hi = self.shard_range(shard, num_shards)
+        for b in range(lo, hi, batch_size):
+            idx = self.index[b:min(b + batch_size, hi)]
+            # Les lignes d'un batch sont contiguës : une seule copie d'octets, découpée ensuite
+            base = idx[0, 0]
+            blob = self._mm[base:idx[-1, 1]]
+            records = [loads(blob[s - base:e - base]) for s, e in idx]
+            keys = fields or list(records[0])
+            yield {k: [r.get(k) for r in records] for k in keys}
+
+    def to_parquet(self, out_path: str, batch_size: int = 10000, fields: list | None = None,
+                   compression: str = "zstd"):
+        """Écrit le corpus en Parquet, un row group par batch."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("pyarrow est requis pour la conversion Parquet (pip install pyarrow)") from e
+        writer = None
+        try:
+            for batch in self.iter_batches(batch_size, fields):
+                table = pa.Table.from_pydict(batch)
+                if writer is None:
+                    writer = pq.ParquetWriter(out_path, table.schema, compression=compression)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        print(f"💾 {len(self)} enregistrements → {out_path}")
+
+
+def _run_shard(args):
+    path, fn, shard, num_shards, batch_size = args
+    with JsonlDataset(path) as ds:
+        return fn(ds.iter_batches(batch_size, shard=shard, num_shards=num_shards))
+
+
+def map_shards(path: str, fn, num_workers: int = os.cpu_count() or 1, batch_size: int = 1024) -> list:
+    """
+    Applique fn(itérateur de batches) à chaque shard dans un processus séparé ; retourne les
+    résultats dans l'ordre des shards. fn doit être une fonction de module (picklable).
+    """
+    JsonlDataset(path).close()  # construit l'index une fois avant de lancer les workers
+    jobs = [(path, fn, s, num_workers, batch_size) for s in range(num_workers)]
+    with ProcessPoolExecutor(max_workers=num_workers) as ex:
+        return list(ex.map(_run_shard, jobs))
+
+
+def count_chars(batches) -> dict:
+    """Exemple de traitement par shard : nombre d'enregistrements et de caractères par champ."""
+    out = {"records": 0}
+    for batch in batches:
+        for k, values in batch.items():
+            out[k] = out.get(k, 0) + sum(len(v or "") for v in values)
+        out["records"] += len(next(iter(batch.values())))
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index, lecture par batches et conversion Parquet d'un JSONL.")
+    parser.add_argument("path", nargs="?", default="brighter_subset_explained.jsonl")
+    parser.add_argument("--show", type=int, default=0, help="Afficher les N premiers enregistrements")
+    parser.add_argument("--stats", type=int, default=0, metavar="WORKERS",
+                        help="Compter enregistrements/caractères avec N processus")
+    parser.add_argument("--parquet", default=None, help="Chemin du Parquet de sortie")
+    args = parser.parse_args()
+
+    with JsonlDataset(args.path) as ds:
+        print(f"📄 {args.path} : {len(ds)} enregistrements")
+        for i in range(min(args.show, len(ds))):
+            rec = ds[i]
+            print(f"[{i}] " + " | ".join(f"{k}: {str(v)[:80]}" for k, v in rec.items()))
+        if args.parquet:
+            ds.to_parquet(args.parquet)
+
+    if args.stats:
+        totals = {}
+        for part in map_shards(args.path, count_chars, args.stats):
+            for k, v in part.items():
+                totals[k] = totals.get(k, 0) + v
+        print(f"📊 {totals}")
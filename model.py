@@ -3,51 +3,194 @@ tf.keras.backend.clear_session()
 
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Embedding, LSTM, Dense
-from tensorflow.keras.preprocessing.text import Tokenizer
-from tensorflow.keras.preprocessing.sequence import pad_sequences
-import numpy as np
+import argparse
+import glob
+import json
+import re
+from collections import Counter
 import tensorflowjs as tfjs
 import shutil
 import os
 import zipfile
 
-# Données simples
-texts = [
-    "crée une playlist de rap",
-    "joue une chanson",
-    "mets une playlist jazz",
-    "je veux écouter du rock"
+from intent_text import FILTER_RE, FILTERS, OOV, OUT_DIR, PAD, tokenize
+
+# Entraînement du modèle d'intention (Embedding → LSTM(32) → Dense) puis export TensorFlow.js.
+#
+# Corpus : un ou plusieurs fichiers TSV « intention<TAB>phrase » (un exemple par ligne, motifs glob acceptés).
+#   - vocabulaire construit en une passe streaming (Counter), sauvegardé dans <out_dir>/vocab.json
+#   - pipeline tf.data : lecture entrelacée des fichiers, map parallèle, cache, shuffle,
+#     batches groupés par longueur (padding au plus long du batch), prefetch
+# Sans --corpus, on entraîne sur les quatre phrases de démonstration.
+#
+# Exemple :
+#   python model.py --corpus "data/intents/*.tsv" --epochs 5 --batch_size 256
+
+# --- CONFIG ---
+MAX_LEN = 10                  # longueur max (le hook JS envoie des séquences de 10)
+MAX_VOCAB = 50000
+MIN_COUNT = 1
+VAL_PCT = 5                   # % des lignes en validation (split déterministe par hash)
+EXPORT_PATH = "tfjs_model"
+
+# Données de démonstration (intention 0 = playlist, 1 = écoute)
+DEMO_LINES = [
+    "0\tcrée une playlist de rap",
+    "1\tjoue une chanson",
+    "0\tmets une playlist jazz",
+    "1\tje veux écouter du rock",
 ]
-labels = [0, 1, 0, 1]
-
-# Prétraitement
-tokenizer = Tokenizer()
-tokenizer.fit_on_texts(texts)
-seqs = tokenizer.texts_to_sequences(texts)
-X = pad_sequences(seqs, maxlen=10, padding='post')
-y = np.array(labels)
-
-# Modèle
-model = Sequential()
-model.add(tf.keras.Input(shape=(10,)))
-model.add(Embedding(input_dim=len(tokenizer.word_index)+1, output_dim=16))
-model.add(LSTM(32))
-model.add(Dense(2, activation='softmax'))
-model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
-model.fit(X, y, epochs=10)
-
-# Export vers TensorFlow.js
-export_path = "tfjs_model"
-if os.path.exists(export_path):
-    shutil.rmtree(export_path)
-tfjs.converters.save_keras_model(model, export_path)
-
-# Optionnel : création d'un ZIP pour transport
-with zipfile.ZipFile("tfjs_model.zip", 'w') as zipf:
-    for root, _, files in os.walk(export_path):
-        for file in files:
-            full_path = os.path.join(root, file)
-            arcname = os.path.relpath(full_path, export_path)
-            zipf.write(full_path, arcname)
-
-print("✅ Modèle exporté et compressé dans tfjs_model.zip")
\ No newline at end of file
+
+
+def iter_lines(files):
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                yield line.rstrip("\n")
+
+
+def build_vocab(lines, max_vocab=MAX_VOCAB, min_count=MIN_COUNT):
+    """Une seule passe sur le corpus : fréquences des mots et liste des intentions."""
+    counts, labels, n = Counter(), set(), 0
+    for line in lines:
+        label, sep, text = line.partition("\t")
+        if not sep:
+            continue
+        counts.update(tokenize(text))
+        labels.add(label)
+        n += 1
+    # Intentions numériques triées comme des nombres ("2" avant "10") : l'indice de sortie du modèle
+    # reste égal à l'identifiant quand ils vont de 0 à n-1 ; sinon le front passe par vocab["labels"]
+    numeric = all(re.fullmatch(r"-?\d+", label) for label in labels)
+    labels = sorted(labels, key=int) if numeric else sorted(labels)
+    words = [w for w, c in counts.most_common(max_vocab) if c >= min_count]
+    word_index = {w: i + 2 for i, w in enumerate(words)}
+    print(f"📚 {n} exemples, {len(counts)} mots distincts → vocabulaire de {len(word_index)} mots, {len(labels)} intentions")
+    return {"max_len": MAX_LEN, "filters": FILTERS, "pad": PAD, "oov": OOV,
+            "word_index": word_index, "labels": labels}
+
+
+def save_vocab(vocab, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "vocab.json"), "w", encoding="utf-8") as f:
+        json.dump(vocab, f, ensure_ascii=False)
+
+
+def make_dataset(lines_ds, vocab, batch_size, training, cache="", val_pct=VAL_PCT):
+    """Lignes TSV → batches (ids int32 paddés au plus long du bucket, intention int32)."""
+    words = tf.constant(list(vocab["word_index"]), dtype=tf.string)
+    ids = tf.constant(list(vocab["word_index"].values()), dtype=tf.int64)
+    word_table = tf.lookup.StaticHashTable(tf.lookup.KeyValueTensorInitializer(words, ids), default_value=OOV)
+    label_table = tf.lookup.StaticHashTable(
+        tf.lookup.KeyValueTensorInitializer(tf.constant(vocab["labels"]), tf.range(len(vocab["labels"]), dtype=tf.int64)),
+        default_value=-1)
+    max_len = vocab["max_len"]
+
+    def parse(line):
+        parts = tf.strings.split(line, "\t", maxsplit=1)
+        text = tf.strings.lower(parts[-1], encoding="utf-8")
+        tokens = tf.strings.split(tf.strings.regex_replace(text, FILTER_RE, " "))[:max_len]
+        return tf.cast(word_table.lookup(tokens), tf.int32), tf.cast(label_table.lookup(parts[0]), tf.int32)
+
+    ds = lines_ds.filter(lambda line: tf.strings.regex_full_match(line, "[^\t]+\t.+"))
+    # Split déterministe : une ligne est toujours du même côté, d'une époque à l'autre
+    in_val = lambda line: tf.strings.to_hash_bucket_fast(line, 100) < val_pct
+    ds = ds.filter(lambda line: tf.logical_not(in_val(line)) if training else in_val(line))
+    ds = ds.map(parse, num_parallel_calls=tf.data.AUTOTUNE, deterministic=not training)
+    ds = ds.filter(lambda x, y: tf.size(x) > 0)
+    ds = ds.cache(cache)  # "" = en mémoire ; un chemin = cache disque réutilisé par les époques suivantes
+    if training:
+        ds = ds.shuffle(10000)
+    boundaries = sorted({b for b in (max_len // 4, max_len // 2, 3 * max_len // 4) if b > 1})
+    ds = ds.bucket_by_sequence_length(
+        element_length_func=lambda x, y: tf.shape(x)[0],
+        bucket_boundaries=[b + 1 for b in boundaries],
+        bucket_batch_sizes=[batch_size] * (len(boundaries) + 1),
+        padded_shapes=([None], []),
+        padding_values=(PAD, 0),
+    )
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def build_model(vocab_size, n_labels):
+    model = Sequential()
+    model.add(tf.keras.Input(shape=(None,), dtype="int32"))
+    model.add(Embedding(input_dim=vocab_size, output_dim=16, mask_zero=True))
+    model.add(LSTM(32))
+    model.add(Dense(n_labels, activation='softmax'))
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    return model
+
+
+QUANTIZATION = {"none": None, "float16": {"float16": "*"}, "uint8": {"uint8": "*"}}
+
+
+def write_vocab_index(vocab, path):
+    """Vocabulaire compact pour le front : liste des mots ordonnée par id (id = position + 2)."""
+    words = sorted(vocab["word_index"], key=vocab["word_index"].get)
+    index = {"max_len": vocab["max_len"], "filters": vocab["filters"], "pad": vocab["pad"], "oov": vocab["oov"],
+             "labels": vocab["labels"], "words": words}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def export_tfjs(model, export_path, vocab=None, quantize="none"):
+    """Export TF.js (poids float32, float16 ou uint8) + index du vocabulaire, puis ZIP compressé."""
+    if os.path.exists(export_path):
+        shutil.rmtree(export_path)
+    tfjs.converters.save_keras_model(model, export_path, quantization_dtype_map=QUANTIZATION[quantize])
+    if vocab is not None:
+        write_vocab_index(vocab, os.path.join(export_path, "vocab_index.json"))
+
+    # ZIP pour transport (deflate : les shards quantifiés et le JSON se compressent bien)
+    with zipfile.ZipFile(f"{export_path}.zip", 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as zipf:
+        for root, _, files in os.walk(export_path):
+            for file in files:
+                full_path = os.path.join(root, file)
+                arcname = os.path.relpath(full_path, export_path)
+                zipf.write(full_path, arcname)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entraîne le modèle d'intention et l'exporte en TensorFlow.js.")
+    parser.add_argument("--corpus", nargs="*", default=None, help="Fichiers TSV intention<TAB>phrase (glob accepté)")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch_size", type=int, default=256)
+    parser.add_argument("--max_vocab", type=int, default=MAX_VOCAB)
+    parser.add_argument("--min_count", type=int, default=MIN_COUNT)
+    parser.add_argument("--cache", default="", help="Fichier de cache tf.data (défaut : en mémoire)")
+    parser.add_argument("--out_dir", default=OUT_DIR)
+    parser.add_argument("--export_path", default=EXPORT_PATH)
+    parser.add_argument("--quantize", default="none", choices=list(QUANTIZATION),
+                        help="Quantification des poids TF.js (voir export_intent_model.py pour le rapport)")
+    args = parser.parse_args()
+
+    files = sorted(f for pattern in args.corpus or [] for f in glob.glob(pattern))
+    if args.corpus and not files:
+        raise SystemExit(f"❌ Aucun fichier pour {args.corpus}")
+
+    # 1) Vocabulaire (passe streaming), sauvegardé avec le modèle
+    vocab = build_vocab(iter_lines(files) if files else DEMO_LINES, args.max_vocab, args.min_count)
+    save_vocab(vocab, args.out_dir)
+
+    # 2) Pipelines tf.data
+    if files:
+        lines = tf.data.Dataset.from_tensor_slices(files).interleave(
+            tf.data.TextLineDataset, cycle_length=min(len(files), 8), num_parallel_calls=tf.data.AUTOTUNE)
+        train_ds = make_dataset(lines, vocab, args.batch_size, training=True,
+                                cache=f"{args.cache}_train" if args.cache else "")
+        val_ds = make_dataset(lines, vocab, args.batch_size, training=False,
+                              cache=f"{args.cache}_val" if args.cache else "")
+    else:
+        # Démo : tout en entraînement (4 phrases)
+        lines = tf.data.Dataset.from_tensor_slices(DEMO_LINES)
+        train_ds, val_ds = make_dataset(lines, vocab, args.batch_size, training=True, val_pct=0), None
+
+    # 3) Modèle
+    model = build_model(len(vocab["word_index"]) + 2, len(vocab["labels"]))
+    model.fit(train_ds, validation_data=val_ds, epochs=args.epochs)
+    model.save(os.path.join(args.out_dir, "model.keras"))
+
+    # 4) Export TF.js + ZIP
+    export_tfjs(model, args.export_path, vocab, args.quantize)
+    print(f"✅ Modèle exporté et compressé dans {args.export_path}.zip (vocabulaire : {args.out_dir}/vocab.json)")
@@ -1,6 +1,8 @@
 import * as tf from '@tensorflow/tfjs';
 console.log("✅ TensorFlow.js chargé :", tf);
 let model;
+let tokenizer;
+let labels;
 
 export const loadModel = async () => {
   if (!model) {
@@ -10,11 +12,54 @@ export const loadModel = async () => {
   return model;
 };
 
+// Vocabulaire compact exporté par model.py (vocab_index.json) : id du mot = position + 2
+// Déploiement : vocab_index.json est écrit par `python model.py --export_path ...` (ou export_intent_model.py)
+// à côté de model.json ; copier TOUT le dossier exporté dans public/model/, pas seulement model.json + *.bin.
+const VOCAB_INDEX_URL = '/model/vocab_index.json';
+
+export const loadTokenizer = async () => {
+  if (!tokenizer) {
+    const res = await fetch(VOCAB_INDEX_URL);
+    if (!res.ok) {
+      throw new Error(
+        `❌ ${VOCAB_INDEX_URL} introuvable (HTTP ${res.status}) : copier vocab_index.json exporté par model.py `
+        + 'dans public/model/ à côté de model.json, ou passer un tokenizer à predictIntent.'
+      );
+    }
+    const index = await res.json();
+    labels = index.labels;
+    const ids = new Map(index.words.map((w, i) => [w, i + 2]));
+    const filters = new RegExp(`[${index.filters.replace(/[\\\]^-]/g, '\\$&')}]`, 'g');
+    tokenizer = (text) => {
+      const seq = new Array(index.max_len).fill(index.pad);
+      text.toLowerCase().replace(filters, ' ').split(/\s+/).filter(Boolean)
+        .slice(0, index.max_len)
+        .forEach((w, i) => { seq[i] = ids.get(w) ?? index.oov; });
+      return seq;
+    };
+  }
+  return tokenizer;
+};
+
+// Intention de l'indice de sortie via vocab_index.json (labels) : nombre si l'intention est numérique
+const indexToIntent = (i) => {
+  const label = labels?.[i];
+  if (label === undefined) return i;
+  return /^-?\d+$/.test(label) ? Number(label) : label;
+};
+
 export const predictIntent = async (text, tokenizer) => {
   const model = await loadModel();
-  const input = tokenizer(text);
-  const inputTensor = tf.tensor2d([input], [1, 10], 'int32');
+  let defaultTokenizer;
+  try {
+    defaultTokenizer = await loadTokenizer();  // charge aussi les labels
+  } catch (err) {
+    if (!tokenizer) throw err;
+    console.warn(`${err.message} Labels absents : predictIntent renvoie l'indice de sortie.`);
+  }
+  const input = (tokenizer ?? defaultTokenizer)(text);
+  const inputTensor = tf.tensor2d([input], [1, input.length], 'int32');
   const prediction = model.predict(inputTensor);
   const intentIndex = prediction.argMax(-1).dataSync()[0];
-  return intentIndex;
-};
\ No newline at end of file
+  return indexToIntent(intentIndex);
+};
@@ -12,21 +12,6 @@ import {
 import { getAccessToken } from '../functions/auth'; // Importer les fonctions d'authentification
 
 
-const vocab = {
-  "crée": 1, "une": 2, "playlist": 3, "de": 4, "rap": 5,
-  "lance": 6, "chanson": 7, "ajoute": 8, "cette": 9,
-  "musique": 10, "à": 11, "ma": 12, "joue": 13, "la": 14,
-  "prochaine": 15, "je": 16, "veux": 17, "nouvelle": 18,
-  "mets": 19, "création": 20
-};
-
-const tokenizer = (text) => {
-  const words = text.toLowerCase().split(' ');
-  const tokens = words.map(word => vocab[word] || 0);
-  while (tokens.length < 10) tokens.push(0); // padding
-  return tokens.slice(0, 10);
-};
-
 const detectGenre = (text) => {
   const genres = ["pop", "rap", "rock", "jazz", "classique", "électro", "metal", "lofi"];
   const lowerText = text.toLowerCase();
@@ -91,7 +76,7 @@ function MyAi() {
     if (e.key === 'Enter') {
       setIsLoading(true);
       try {
-        const intentId = await predictIntent(query, tokenizer);
+        const intentId = await predictIntent(query);
         console.log("🧠 Intent détecté :", intentId);
         if (intentId === 0) {
           const genre = detectGenre(query);
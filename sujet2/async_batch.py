@@ -0,0 +1,100 @@
+# async_batch.py
+# Briques communes pour interroger une API LLM en parallèle (asyncio) :
+#   - TokenBucket   : limiteur de débit (remplace les time.sleep fixes)
+#   - with_retries  : backoff exponentiel (+ jitter) sur 429 / 5xx / timeouts
+#                     (Retry-After en secondes ou en date HTTP, voir parse_retry_after)
+#   - run_concurrent: exécution bornée (sémaphore) d'un worker async sur une liste d'items
+
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+    """Erreur transitoire (429, 5xx, timeout) : la requête peut être rejouée."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """En-tête Retry-After → délai en secondes (RFC 9110 : nombre de secondes ou date HTTP), None si illisible."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None  # valeur illisible : backoff calculé
+
+
+class TokenBucket:
+    """Seau à jetons : au plus `rate` requêtes/s en régime établi, rafales jusqu'à `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+async def with_retries(call, max_retries: int = 6, base_delay: float = 1.0, max_delay: float = 60.0):
+    """Appelle `call()` (coroutine) et la rejoue sur RetryableError avec un backoff exponentiel."""
+    for attempt in range(max_retries + 1):
+        try:
+            return await call()
+        except RetryableError as e:
+            if attempt == max_retries:
+                raise
+            if e.retry_after is not None:
+                delay = min(max_delay, e.retry_after)
+            else:
+                delay = min(max_delay, base_delay * 2 ** attempt) * (0.5 + random.random() / 2)
+            await asyncio.sleep(delay)
+
+
+async def run_concurrent(items, worker, concurrency: int, bucket: TokenBucket | None = None,
+                         on_result=None) -> dict:
+    """
+    Exécute `worker(payload)` pour chaque (idx, payload) de `items`, avec au plus
+    `concurrency` requêtes en vol et un débit borné par `bucket`.
+    Chaque résultat est passé à `on_result(idx, résultat)` dès qu'il arrive (ex. mise en cache).
+    Retourne {idx: résultat}.
+    """
+    sem = asyncio.Semaphore(concurrency)
+    results = {}
+
+    async def one(idx, payload):
+        async with sem:
+            if bucket is not None:
+                await bucket.acquire()
+            try:
+                out = await worker(payload)
+            except Exception as e:
+                print(f"⚠️ Erreur (ligne {idx}) :", e)
+                return  # non enregistrée : sera retentée au prochain lancement
+            results[idx] = out
+            if on_result is not None:
+                on_result(idx, out)
+
+    await asyncio.gather(*(one(idx, payload) for idx, payload in items))
+    return results
@@ -0,0 +1,30 @@
+# besstie_data.py
+# Lecture d'une tranche du dataset Parquet partitionné écrit par getDataHuggingFace.py
+# (split=.../task=.../variety=...). Les filtres portent sur les clés de partition :
+# pyarrow ne lit que les fichiers de la tranche demandée (predicate pushdown).
+
+from pathlib import Path
+
+import pandas as pd
+
+PARQUET_ROOT = Path(__file__).resolve().parent / "data" / "BESSTIE" / "parquet"
+
+
+def load_besstie(split: str, task: str, varieties: list | None = None,
+                 root: Path = PARQUET_ROOT, columns: list | None = None) -> pd.DataFrame:
+    """
+    Retourne les lignes (split, task[, variétés]) avec les colonnes du CSV d'origine
+    (text, label, variety, source, task). `task` est insensible à la casse (ex: "sarcasm").
+    """
+    import pyarrow.dataset as pds
+
+    dataset = pds.dataset(str(root), format="parquet", partitioning="hive")
+    expr = (pds.field("split") == split) & (pds.field("task") == task.capitalize())
+    if varieties:
+        expr = expr & pds.field("variety").isin(list(varieties))
+    columns = columns or ["text", "label", "variety", "source", "task"]
+    df = dataset.to_table(columns=columns, filter=expr).to_pandas()
+    for col in ("variety", "source", "task"):
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df.reset_index(drop=True)
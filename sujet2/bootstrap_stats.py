@@ -0,0 +1,147 @@
+# bootstrap_stats.py
+# Intervalles de confiance bootstrap et tests de permutation appariés sur les prédictions sauvegardées.
+# Les rééchantillonnages sont des matrices d'indices (replicats × n) : accuracy et F1 macro de
+# tous les replicats sont calculés d'un coup avec des opérations sur tableaux, sans boucle Python par replicat.
+#
+#   - IC bootstrap (percentiles) par run et par variété, sur les lignes valides (comme metrics_by_variety.json)
+#   - tests appariés entre modèles d'une même tâche, sur les mêmes lignes : à chaque permutation on
+#     échange aléatoirement les prédictions des deux modèles ligne par ligne (une sortie non reconnue compte comme une erreur)
+#
+# Exemple :
+#   python bootstrap_stats.py --n_boot 5000 --n_perm 5000
+
+import argparse
+import itertools
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from metrics_engine import GLOBAL, OUTPUT_ROOT, read_predictions
+
+CHUNK = 500  # replicats traités par bloc (borne la mémoire : CHUNK × n)
+
+
+def accuracy_rows(T: np.ndarray, P: np.ndarray) -> np.ndarray:
+    """Accuracy de chaque ligne d'une matrice (replicats × n)."""
+    return (T == P).mean(axis=-1)
+
+
+def macro_f1_rows(T: np.ndarray, P: np.ndarray) -> np.ndarray:
+    """F1 macro (classes 0 et 1) de chaque ligne ; une prédiction -1 n'est correcte pour aucune classe."""
+    f1s = []
+    for c in (0, 1):
+        tp = ((T == c) & (P == c)).sum(axis=-1)
+        fp = ((T != c) & (P == c)).sum(axis=-1)
+        fn = ((T == c) & (P != c)).sum(axis=-1)
+        denom = 2 * tp + fp + fn
+        f1s.append(np.divide(2 * tp, denom, out=np.zeros(denom.shape), where=denom > 0))
+    return (f1s[0] + f1s[1]) / 2
+
+
+METRICS = {"accuracy": accuracy_rows, "f1_macro": macro_f1_rows}
+
+
+def bootstrap_ci(t: np.ndarray, p: np.ndarray, n_boot: int, rng: np.random.Generator, alpha: float = 0.05) -> dict:
+    """Estimation ponctuelle + IC percentile pour chaque métrique."""
+    n = len(t)
+    samples = {name: [] for name in METRICS}
+    for start in range(0, n_boot, CHUNK):
+        idx = rng.integers(0, n, size=(min(CHUNK, n_boot - start), n))
+        T, P = t[idx], p[idx]
+        for name, fn in METRICS.items():
+            samples[name].append(fn(T, P))
+    out = {"samples": n}
+    for name, fn in METRICS.items():
+        reps = np.concatenate(samples[name])
+        out[name] = float(fn(t, p))
+        out[f"{name}_lo"] = float(np.quantile(reps, alpha / 2))
+        out[f"{name}_hi"] = float(np.quantile(reps, 1 - alpha / 2))
+    return out
+
+
+def paired_permutation(t: np.ndarray, pa: np.ndarray, pb: np.ndarray, n_perm: int,
+                       rng: np.random.Generator) -> dict:
+    """Test bilatéral : H0 = les deux modèles sont échangeables ligne par ligne."""
+    out = {"samples": len(t)}
+    for name, fn in METRICS.items():
+        observed = fn(t, pa) - fn(t, pb)
+        extreme = 0
+        for start in range(0, n_perm, CHUNK):
+            swap = rng.random((min(CHUNK, n_perm - start), len(t))) < 0.5
+            A = np.where(swap, pb, pa)
+            B = np.where(swap, pa, pb)
+            extreme += int((np.abs(fn(t, A) - fn(t, B)) >= abs(observed) - 1e-12).sum())
+        out[f"{name}_diff"] = float(observed)
+        out[f"{name}_p_value"] = (extreme + 1) / (n_perm + 1)
+    return out
+
+
+def load_runs(root: Path) -> dict:
+    """{(tâche, run): DataFrame y_true / y_pred / variety / texte} pour chaque fichier de prédictions."""
+    runs = {}
+    for path in sorted(root.glob("*/predictions*.csv")):
+        df = read_predictions(path)
+        df["text"] = pd.read_csv(path, usecols=["text"])["text"].to_numpy()
+        task, _, model = path.parent.name.partition("_")
+        runs[(task, model)] = df
+    return runs
+
+
+def scopes(df: pd.DataFrame):
+    yield GLOBAL, np.ones(len(df), dtype=bool)
+    for variety in sorted(df["variety"].unique()):
+        yield variety, (df["variety"] == variety).to_numpy()
+
+
+def run_all(root: Path, n_boot: int, n_perm: int, seed: int = 0) -> tuple[pd.DataFrame, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    runs = load_runs(root)
+
+    ci_rows = []
+    for (task, model), df in runs.items():
+        t, p = df["y_true"].to_numpy(), df["y_pred"].to_numpy()
+        for scope, mask in scopes(df):
+            keep = mask & (t >= 0) & (p >= 0)
+            if keep.sum() == 0:
+                continue
+            ci_rows.append({"task": task, "model": model, "scope": scope,
+                            **bootstrap_ci(t[keep], p[keep], n_boot, rng)})
+
+    test_rows = []
+    tasks = sorted({task for task, _ in runs})
+    for task in tasks:
+        models = sorted(m for tk, m in runs if tk == task)
+        for ma, mb in itertools.combinations(models, 2):
+            a, b = runs[(task, ma)], runs[(task, mb)]
+            # Mêmes lignes dans le même ordre ? sinon on aligne sur le texte
+            if len(a) != len(b) or not (a["text"].to_numpy() == b["text"].to_numpy()).all():
+                merged = a.merge(b[["text", "y_pred"]], on="text", suffixes=("_a", "_b")).drop_duplicates("text")
+                a = merged.rename(columns={"y_pred_a": "y_pred"})
+                pb_all = merged["y_pred_b"].to_numpy()
+            else:
+                pb_all = b["y_pred"].to_numpy()
+            t, pa_all = a["y_true"].to_numpy(), a["y_pred"].to_numpy()
+            for scope, mask in scopes(a):
+                keep = mask & (t >= 0)
+                test_rows.append({"task": task, "model_a": ma, "model_b": mb, "scope": scope,
+                                  **paired_permutation(t[keep], pa_all[keep], pb_all[keep], n_perm, rng)})
+    return pd.DataFrame(ci_rows), pd.DataFrame(test_rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="IC bootstrap et tests appariés sur les predictions*.csv de output/.")
+    parser.add_argument("--root", type=Path, default=OUTPUT_ROOT)
+    parser.add_argument("--n_boot", type=int, default=5000)
+    parser.add_argument("--n_perm", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    ci, tests = run_all(args.root, args.n_boot, args.n_perm, args.seed)
+    ci.to_csv(args.root / "bootstrap_ci.csv", index=False)
+    tests.to_csv(args.root / "paired_tests.csv", index=False)
+
+    print("📊 IC 95 % du F1 macro (global) :")
+    for r in ci[ci["scope"] == GLOBAL].itertuples():
+        print(f"- {r.task:<9} {r.model:<28} {r.f1_macro:.4f} [{r.f1_macro_lo:.4f}, {r.f1_macro_hi:.4f}]")
+    print(f"\n✅ {args.root / 'bootstrap_ci.csv'} | {args.root / 'paired_tests.csv'}")
@@ -0,0 +1,55 @@
+# check_retries.py
+# Vérification de bout en bout du client Mistral contre mock_llm_server.py (lancé dans le processus) :
+# un 429 toutes les --fail_every requêtes, avec Retry-After en secondes puis en date HTTP.
+# Attendus : toutes les lignes obtiennent une réponse, et le serveur a vu exactement
+# lignes + 429 requêtes (chaque 429 est rejoué une fois, rien n'est perdu ni dupliqué).
+#
+# Exemple :
+#   python check_retries.py --n 40 --fail_every 5
+
+import argparse
+import asyncio
+import sys
+
+from aiohttp import web
+
+from async_batch import run_concurrent
+from mistral_client import MistralClient
+from mock_llm_server import fake_answer, make_app
+
+
+async def check(n: int, fail_every: int, concurrency: int) -> bool:
+    app = make_app(latency=0.01, fail_every=fail_every)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        items = [(i, f"Text:\n exemple {i}") for i in range(n)]
+        async with MistralClient("mock", "mock", api_url=f"http://127.0.0.1:{port}/v1/chat/completions",
+                                 concurrency=concurrency) as client:
+            results = await run_concurrent(items, client.complete, concurrency)
+    finally:
+        await runner.cleanup()
+
+    stats = app["stats"]
+    checks = {
+        "toutes les lignes ont une réponse": len(results) == n,
+        "réponses correctes": all(results[i] == fake_answer(p) for i, p in items if i in results),
+        "au moins un 429 rejoué": stats["errors"] > 0,
+        f"requêtes = {n} + 429 ({stats['requests']} = {n} + {stats['errors']})":
+            stats["requests"] == n + stats["errors"],
+    }
+    for name, ok in checks.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+    return all(checks.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test du backoff sur 429 (Retry-After) contre le faux serveur.")
+    parser.add_argument("--n", type=int, default=40)
+    parser.add_argument("--fail_every", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(check(args.n, args.fail_every, args.concurrency)) else 1)
@@ -0,0 +1,152 @@
+# embedding_probe.py
+# Criblage rapide d'encodeurs sur BESSTIE : au lieu d'un fine-tuning complet de 3 époques,
+# chaque encodeur est passé une seule fois sur train et validation, les embeddings (mean pooling)
+# sont mis en cache dans des .npy memory-mappés, puis une régression logistique est entraînée
+# par tâche (et optionnellement par variété) à partir du cache.
+# Sorties au même format que testTransformeers.py : metrics_global.json / metrics_by_variety.json.
+#
+# Exemple :
+#   python embedding_probe.py --task sentiment sarcasm --models distilbert-base-uncased roberta-base xlm-roberta-base
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score, log_loss
+from transformers import AutoModel, AutoTokenizer
+
+from tokenized_cache import file_sha256
+
+CACHE_DIR = Path(__file__).resolve().parent / "cache" / "embeddings"
+MAX_LENGTH = 128
+BATCH_SIZE = 64
+
+
+def embedding_path(data_path, model_name: str, max_length: int, cache_dir: Path = CACHE_DIR) -> Path:
+    slug = model_name.replace("/", "-")
+    return Path(cache_dir) / f"{slug}_L{max_length}_{file_sha256(data_path)[:16]}.npy"
+
+
+def encode_texts(texts: list, model_name: str, out_path: Path, max_length: int = MAX_LENGTH,
+                 batch_size: int = BATCH_SIZE) -> np.ndarray:
+    """Encode les textes (mean pooling du dernier état caché) directement dans un .npy memory-mappé."""
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    dim = model.config.hidden_size
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_suffix(".tmp.npy")
+    emb = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(len(texts), dim))
+    order = np.argsort([len(t) for t in texts], kind="stable")  # batches homogènes → moins de pad
+    with torch.inference_mode():
+        for i in range(0, len(texts), batch_size):
+            idx = order[i:i + batch_size]
+            enc = tokenizer([texts[j] for j in idx], truncation=True, max_length=max_length,
+                            padding=True, return_tensors="pt")
+            hidden = model(**enc).last_hidden_state
+            mask = enc["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+            emb[idx] = pooled.numpy()
+    emb.flush()
+    del emb
+    tmp_path.replace(out_path)  # écriture atomique : pas de cache à moitié rempli
+    return np.load(out_path, mmap_mode="r")
+
+
+def load_embeddings(data_path, model_name: str, max_length: int = MAX_LENGTH) -> tuple[pd.DataFrame, np.ndarray]:
+    df = pd.read_csv(data_path)
+    path = embedding_path(data_path, model_name, max_length)
+    if path.exists():
+        print(f"🗃️ Embeddings en cache : {path.name}")
+        return df, np.load(path, mmap_mode="r")
+    print(f"🧮 Encodage de {Path(data_path).name} avec {model_name} ({len(df)} textes)")
+    return df, encode_texts(df["text"].astype(str).tolist(), model_name, path, max_length)
+
+
+def fit_probe(X: np.ndarray, y: np.ndarray, C: float = 1.0) -> LogisticRegression:
+    return LogisticRegression(C=C, max_iter=2000).fit(X, y)
+
+
+def evaluate_probe(probe: LogisticRegression, X: np.ndarray, y: np.ndarray) -> dict:
+    probas = probe.predict_proba(X)
+    preds = probas.argmax(axis=1)
+    return {
+        "accuracy": float(accuracy_score(y, preds)),
+        "f1_macro": float(f1_score(y, preds, average="macro")),
+        "loss": float(log_loss(y, probas, labels=probe.classes_)),
+        "samples": int(len(y)),
+    }
+
+
+def run(task: str, model_name: str, data_dir: str | None = None, output_root: str = "./output",
+        per_variety_probe: bool = False, C: float = 1.0, max_length: int = MAX_LENGTH) -> tuple[dict, dict]:
+    data_dir = data_dir or f"./BESSTIE/{task}"
+    output_dir = Path(output_root) / f"{task}_{model_name.replace('/', '-')}_probe"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    train_df, X_train = load_embeddings(f"{data_dir}/train_{task}.csv", model_name, max_length)
+    valid_df, X_valid = load_embeddings(f"{data_dir}/validation_{task}.csv", model_name, max_length)
+    y_train = train_df["label"].to_numpy()
+    y_valid = valid_df["label"].to_numpy()
+
+    probe = fit_probe(X_train, y_train, C)
+    m = evaluate_probe(probe, X_valid, y_valid)
+    metrics_global = {
+        "eval_accuracy": m["accuracy"],
+        "eval_f1_macro": m["f1_macro"],
+        "eval_loss": m["loss"],
+        "samples": m["samples"],
+    }
+
+    metrics_by_variety, skipped = {}, {}
+    if "variety" in valid_df.columns:
+        for variety in sorted(valid_df["variety"].unique()):
+            v_mask = (valid_df["variety"] == variety).to_numpy()
+            v_probe = probe
+            if per_variety_probe:
+                t_mask = (train_df["variety"] == variety).to_numpy()
+                n_classes = len(np.unique(y_train[t_mask]))
+                if n_classes < 2:
+                    # LogisticRegression exige au moins deux classes dans le train de la variété
+                    skipped[variety] = "absente du train" if not t_mask.any() else f"{n_classes} classe dans le train"
+                    continue
+                v_probe = fit_probe(X_train[t_mask], y_train[t_mask], C)
+            mv = evaluate_probe(v_probe, X_valid[v_mask], y_valid[v_mask])
+            metrics_by_variety[variety] = {
+                "samples": mv["samples"],
+                "accuracy": mv["accuracy"],
+                "f1_macro": mv["f1_macro"],
+            }
+
+    with (output_dir / "metrics_global.json").open("w", encoding="utf-8") as f:
+        json.dump(metrics_global, f, indent=2)
+    with (output_dir / "metrics_by_variety.json").open("w", encoding="utf-8") as f:
+        json.dump(metrics_by_variety, f, indent=2)
+    if skipped:
+        with (output_dir / "skipped_varieties.json").open("w", encoding="utf-8") as f:
+            json.dump(skipped, f, indent=2, ensure_ascii=False)
+        for variety, reason in skipped.items():
+            print(f"⚠️ Variété {variety} ignorée (sonde par variété) : {reason}")
+
+    print(f"✅ {task} / {model_name} : acc={metrics_global['eval_accuracy']:.4f} "
+          f"f1={metrics_global['eval_f1_macro']:.4f} → {output_dir}")
+    return metrics_global, metrics_by_variety
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Criblage d'encodeurs par sonde linéaire sur embeddings en cache.")
+    parser.add_argument("--task", nargs="+", default=["sentiment", "sarcasm"], choices=["sentiment", "sarcasm"])
+    parser.add_argument("--models", nargs="+", required=True)
+    parser.add_argument("--per_variety_probe", action="store_true",
+                        help="Entraîner une sonde par variété (sinon la sonde globale est évaluée par variété).")
+    parser.add_argument("--C", type=float, default=1.0, help="Inverse de la régularisation L2.")
+    parser.add_argument("--max_length", type=int, default=MAX_LENGTH)
+    args = parser.parse_args()
+
+    for model_name in args.models:
+        for task in args.task:
+            run(task, model_name, per_variety_probe=args.per_variety_probe, C=args.C, max_length=args.max_length)
@@ -0,0 +1,178 @@
+# fast_inference.py
+# Inférence CPU rapide pour les classifieurs BESSTIE fine-tunés (testTransformeers.py → output/*/best_model).
+#   - export ONNX (ONNX Runtime) ou quantification dynamique int8 (torch.quantization.quantize_dynamic)
+#   - vérification de l'accord avec predictions.csv (label_pred, proba_*) à une tolérance près
+#   - API predict(texts) par batch (tri par longueur + padding dynamique)
+#   - benchmark latence / débit pour des batches de 1 à 64
+#
+# Exemple :
+#   python fast_inference.py --model_dir output/sentiment_roberta-base/best_model --backend onnx --verify --benchmark
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+BACKENDS = ("fp32", "int8", "onnx")
+BENCH_BATCH_SIZES = (1, 2, 4, 8, 16, 32, 64)
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    exp_logits = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp_logits / exp_logits.sum(axis=1, keepdims=True)
+
+
+def export_onnx(model_dir: Path, onnx_path: Path, opset: int = 17) -> Path:
+    """Exporte le modèle en ONNX avec axes dynamiques (batch, séquence)."""
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir).eval()
+    sample = tokenizer(["export"], return_tensors="pt")
+    dynamic = {0: "batch", 1: "sequence"}
+    onnx_path.parent.mkdir(parents=True, exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            str(onnx_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={"input_ids": dynamic, "attention_mask": dynamic, "logits": {0: "batch"}},
+            opset_version=opset,
+        )
+    return onnx_path
+
+
+class FastClassifier:
+    """Classifieur CPU : backend fp32 (référence), int8 (quantification dynamique) ou onnx."""
+
+    def __init__(self, model_dir, backend: str = "onnx", max_length: int = 128, num_threads: int | None = None):
+        model_dir = Path(model_dir)
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend inconnu : {backend} (attendu : {', '.join(BACKENDS)})")
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.backend = backend
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        if backend == "onnx":
+            import onnxruntime as ort
+            onnx_path = model_dir / "model.onnx"
+            if not onnx_path.exists():
+                print(f"📦 Export ONNX → {onnx_path}")
+                export_onnx(model_dir, onnx_path)
+            opts = ort.SessionOptions()
+            opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if num_threads:
+                opts.intra_op_num_threads = num_threads
+            self.session = ort.InferenceSession(str(onnx_path), opts, providers=["CPUExecutionProvider"])
+        else:
+            model = AutoModelForSequenceClassification.from_pretrained(model_dir).eval()
+            if backend == "int8":
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.model = model
+
+    def _logits(self, texts: list) -> np.ndarray:
+        enc = self.tokenizer(texts, truncation=True, max_length=self.max_length, padding=True,
+                             return_tensors="np" if self.backend == "onnx" else "pt")
+        if self.backend == "onnx":
+            feeds = {"input_ids": enc["input_ids"].astype(np.int64),
+                     "attention_mask": enc["attention_mask"].astype(np.int64)}
+            return self.session.run(["logits"], feeds)[0]
+        with torch.inference_mode():
+            return self.model(input_ids=enc["input_ids"], attention_mask=enc["attention_mask"]).logits.numpy()
+
+    def predict_proba(self, texts, batch_size: int = 32) -> np.ndarray:
+        """Probabilités (n, num_labels), dans l'ordre des textes d'entrée."""
+        texts = list(texts)
+        order = np.argsort([len(t) for t in texts], kind="stable")  # batches homogènes → moins de pad
+        out = None
+        for i in range(0, len(texts), batch_size):
+            idx = order[i:i + batch_size]
+            probas = softmax(self._logits([texts[j] for j in idx]))
+            if out is None:
+                out = np.empty((len(texts), probas.shape[1]), dtype=np.float32)
+            out[idx] = probas
+        return out if out is not None else np.empty((0, 2), dtype=np.float32)
+
+    def predict(self, texts, batch_size: int = 32) -> np.ndarray:
+        return self.predict_proba(texts, batch_size).argmax(axis=1)
+
+
+def verify(clf: FastClassifier, predictions_csv: Path, atol: float = 1e-2) -> dict:
+    """Compare avec les label_pred / proba_* sauvegardés par testTransformeers.py."""
+    ref = pd.read_csv(predictions_csv)
+    probas = clf.predict_proba(ref["text"].astype(str).tolist())
+    proba_cols = sorted(c for c in ref.columns if c.startswith("proba_"))
+    ref_probas = ref[proba_cols].to_numpy(dtype=np.float32)
+    max_abs = float(np.abs(probas[:, :len(proba_cols)] - ref_probas).max())
+    agreement = float((probas.argmax(axis=1) == ref["label_pred"].to_numpy()).mean())
+    report = {
+        "backend": clf.backend,
+        "samples": int(len(ref)),
+        "label_agreement": agreement,
+        "max_abs_proba_diff": max_abs,
+        "atol": atol,
+        "within_tolerance": bool(max_abs <= atol),
+    }
+    print(f"🔎 Accord label_pred : {agreement:.4%} | écart max proba : {max_abs:.2e} "
+          f"({'✅' if report['within_tolerance'] else '⚠️'} tolérance {atol})")
+    return report
+
+
+def benchmark(clf: FastClassifier, texts: list, batch_sizes=BENCH_BATCH_SIZES, repeats: int = 5) -> list:
+    """Latence (p50/p95 par batch) et débit (textes/s) pour chaque taille de batch."""
+    rows = []
+    for bs in batch_sizes:
+        batch = texts[:bs]
+        clf._logits(batch)  # échauffement
+        times = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            clf._logits(batch)
+            times.append(time.perf_counter() - t0)
+        times = np.asarray(times)
+        rows.append({
+            "backend": clf.backend,
+            "batch_size": bs,
+            "latency_p50_ms": float(np.percentile(times, 50) * 1000),
+            "latency_p95_ms": float(np.percentile(times, 95) * 1000),
+            "throughput_per_s": float(bs / np.median(times)),
+        })
+        print(f"  bs={bs:>2} p50={rows[-1]['latency_p50_ms']:.1f} ms  {rows[-1]['throughput_per_s']:.1f} textes/s")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export et inférence CPU rapide des classifieurs BESSTIE.")
+    parser.add_argument("--model_dir", type=Path, required=True, help="Dossier best_model de testTransformeers.py")
+    parser.add_argument("--backend", nargs="+", default=["onnx"], choices=BACKENDS)
+    parser.add_argument("--max_length", type=int, default=128)
+    parser.add_argument("--num_threads", type=int, default=None)
+    parser.add_argument("--verify", action="store_true", help="Comparer avec predictions.csv du même dossier de sortie")
+    parser.add_argument("--atol", type=float, default=1e-2)
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    run_dir = args.model_dir.parent
+    predictions_csv = run_dir / "predictions.csv"
+    bench_texts = pd.read_csv(predictions_csv)["text"].astype(str).tolist()
+
+    report = {"verify": [], "benchmark": []}
+    for backend in args.backend:
+        print(f"\n⚙️ Backend {backend}")
+        clf = FastClassifier(args.model_dir, backend, args.max_length, args.num_threads)
+        if args.verify:
+            report["verify"].append(verify(clf, predictions_csv, args.atol))
+        if args.benchmark:
+            report["benchmark"].extend(benchmark(clf, bench_texts))
+
+    report_path = run_dir / "fast_inference_report.json"
+    with report_path.open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📊 Rapport : {report_path.resolve()}")
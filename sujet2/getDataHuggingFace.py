@@ -1,65 +1,77 @@
 # get_besstie.py
-# Télécharge BESSTIE et exporte en CSV/Parquet par split, tâche et (optionnel) variété.
+# Télécharge BESSTIE et exporte :
+#   - un dataset Parquet unique, partitionné par split / task / variety, avec des dtypes catégoriels
+#     (lecture d'une tranche avec besstie_data.load_besstie : seuls les fichiers de la tranche sont lus)
+#   - les CSV par split et par tâche utilisés par les scripts d'évaluation (désactivables avec --no_csv)
 
 import argparse
 from pathlib import Path
 import pandas as pd
 from datasets import load_dataset
 
-def export_df(df: pd.DataFrame, out_dir: Path, name: str):
+CATEGORICAL = ["split", "task", "variety", "source"]
+PARTITIONS = ["split", "task", "variety"]
+
+def export_csv(df: pd.DataFrame, out_dir: Path, name: str):
     out_dir.mkdir(parents=True, exist_ok=True)
-    df.to_csv(out_dir / f"{name}.csv", index=False)
+    df.drop(columns="split").to_csv(out_dir / f"{name}.csv", index=False)
+
+def export_parquet(df: pd.DataFrame, out_dir: Path):
+    """Écrit un seul dataset Parquet partitionné (split=.../task=.../variety=.../*.parquet)."""
     try:
-        df.to_parquet(out_dir / f"{name}.parquet", index=False)
-    except Exception:
-        pass  # pyarrow facultatif
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("pyarrow est requis pour l'export Parquet partitionné (pip install pyarrow)") from e
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_to_dataset(table, root_path=str(out_dir), partition_cols=PARTITIONS,
+                        existing_data_behavior="delete_matching")
 
-def main(out_dir: str, variety: str | None):
+def main(out_dir: str, variety: str | None, write_csv: bool = True):
     # 1) Charger le dataset depuis Hugging Face
     ds = load_dataset("unswnlporg/BESSTIE")  # splits: train / validation
 
-    # 2) Convertir en pandas
-    train_df = ds["train"].to_pandas()
-    valid_df = ds["validation"].to_pandas()
+    # 2) Convertir en pandas : une seule table avec une colonne "split"
+    df = pd.concat(
+        [ds["train"].to_pandas().assign(split="train"), ds["validation"].to_pandas().assign(split="validation")],
+        ignore_index=True,
+    )
 
     # 3) (Optionnel) Filtrer par variété (en-AU, en-IN, en-UK)
     if variety:
-        keep = {variety}
-        train_df = train_df[train_df["variety"].isin(keep)]
-        valid_df = valid_df[valid_df["variety"].isin(keep)]
+        df = df[df["variety"] == variety]
 
-    # 4) Export global (toutes tâches confondues)
-    out = Path(out_dir)
-    export_df(train_df, out / "all", "train_all")
-    export_df(valid_df, out / "all", "validation_all")
+    # 4) Dtypes compacts : catégories pour les colonnes répétitives, entier court pour le label
+    for col in CATEGORICAL:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    df["label"] = df["label"].astype("int8")
 
-    # 5) Export par tâche (Sentiment / Sarcasm)
-    for task_name in sorted(set(train_df["task"]).union(set(valid_df["task"]))):
-        t_train = train_df[train_df["task"] == task_name]
-        t_valid = valid_df[valid_df["task"] == task_name]
-        # Normaliser noms de fichiers
-        tslug = task_name.lower()
-        export_df(t_train, out / tslug, f"train_{tslug}")
-        export_df(t_valid, out / tslug, f"validation_{tslug}")
+    # 5) Dataset Parquet partitionné par split / task / variety
+    out = Path(out_dir)
+    export_parquet(df, out / "parquet")
 
-    # 6) (Optionnel) Export par tâche ET par variété
-    if variety:
-        for task_name in sorted(set(train_df["task"]).union(set(valid_df["task"]))):
-            tslug = task_name.lower()
-            vslug = variety.replace("-", "").lower()
-            t_train = train_df[train_df["task"] == task_name]
-            t_valid = valid_df[valid_df["task"] == task_name]
-            export_df(t_train, out / f"{tslug}_{vslug}", f"train_{tslug}_{vslug}")
-            export_df(t_valid, out / f"{tslug}_{vslug}", f"validation_{tslug}_{vslug}")
+    # 6) CSV par split et par tâche (un seul groupby, sans refiltrer par masque)
+    if write_csv:
+        for split, s_df in df.groupby("split", observed=True):
+            export_csv(s_df, out / "all", f"{split}_all")
+            for task_name, t_df in s_df.groupby("task", observed=True):
+                tslug = task_name.lower()
+                if variety:
+                    vslug = variety.replace("-", "").lower()
+                    export_csv(t_df, out / f"{tslug}_{vslug}", f"{split}_{tslug}_{vslug}")
+                else:
+                    export_csv(t_df, out / tslug, f"{split}_{tslug}")
 
     # 7) Petite info
     print("Exports terminés dans :", out.resolve())
-    print("Colonnes disponibles :", list(train_df.columns))
+    print("Colonnes disponibles :", [c for c in df.columns if c != "split"])
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--out_dir", type=str, default="data/BESSTIE", help="Dossier de sortie")
     parser.add_argument("--variety", type=str, default=None,
                         help="Filtrer par variété (ex: en-AU, en-IN, en-UK). Laisse vide pour tout garder.")
+    parser.add_argument("--no_csv", action="store_true", help="N'écrire que le dataset Parquet partitionné.")
     args = parser.parse_args()
-    main(args.out_dir, args.variety)
\ No newline at end of file
+    main(args.out_dir, args.variety, not args.no_csv)
@@ -0,0 +1,181 @@
+# grid_runner.py
+# Planificateur d'expériences BESSTIE : tâche × modèle (× epochs × batch size).
+# Chaque configuration lance testTransformeers.py dans un sous-processus avec
+# --num_threads (torch.set_num_threads) ; les workers tournent en parallèle tant que
+# le budget de cœurs CPU et de mémoire le permet. Chaque configuration a son propre
+# dossier : tâche_modèle, suivi des clés de la grille qui diffèrent des valeurs par
+# défaut de testTransformeers.py (ex. sentiment_roberta-base__epochs-5) ; une configuration
+# par défaut garde donc le nom historique et ses sorties existantes sont reconnues.
+# Les configurations dont les métriques existent déjà sont sautées, puis tous les
+# metrics_*.json de output/ sont rassemblés dans une seule table.
+# Tests du nommage : python -m doctest grid_runner.py
+#
+# Exemple :
+#   python grid_runner.py --grid grid.json --cores 32 --memory_gb 64 --threads_per_run 8
+#   grid.json : {"task": ["sentiment", "sarcasm"], "model_name": ["roberta-base", "xlm-roberta-base"], "epochs": [3]}
+
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+HERE = Path(__file__).resolve().parent
+OUTPUT_ROOT = HERE / "output"
+DEFAULT_GRID = {
+    "task": ["sentiment", "sarcasm"],
+    "model_name": ["distilbert-base-uncased", "roberta-base", "xlm-roberta-base"],
+    "epochs": [3],
+    "batch_size": [16],
+}
+# Estimation grossière de la mémoire d'un fine-tuning CPU (Go), par modèle
+MEMORY_GB = {"distilbert-base-uncased": 3, "roberta-base": 5, "xlm-roberta-base": 8}
+DEFAULT_MEMORY_GB = 6
+# Valeurs par défaut de testTransformeers.py (CONFIG) : absentes du nom de run
+SCRIPT_DEFAULTS = {"epochs": 3, "batch_size": 16, "padding": "dynamic"}
+
+
+def expand_grid(grid: dict) -> list:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def run_name(config: dict) -> str:
+    """
+    tâche_modèle suivi des autres clés de la grille dont la valeur diffère de SCRIPT_DEFAULTS.
+
+    >>> run_name({"task": "sentiment", "model_name": "roberta-base", "epochs": 3, "batch_size": 16})
+    'sentiment_roberta-base'
+    >>> run_name({"task": "sarcasm", "model_name": "org/model", "epochs": 5, "batch_size": 16})
+    'sarcasm_org-model__epochs-5'
+    """
+    name = f"{config['task']}_{config['model_name'].replace('/', '-')}"
+    extra = "".join(f"__{k}-{str(v).replace('/', '-')}" for k, v in config.items()
+                    if k not in ("task", "model_name") and str(v) != str(SCRIPT_DEFAULTS.get(k)))
+    return name + extra
+
+
+def parse_run_name(name: str) -> tuple[str, str, dict]:
+    """
+    Inverse de run_name : (tâche, modèle, {clé: valeur}) ; les clés absentes valent SCRIPT_DEFAULTS.
+
+    >>> parse_run_name(run_name({"task": "sarcasm", "model_name": "xlm-roberta-base", "epochs": 5,
+    ...                          "batch_size": 32, "padding": "dynamic"}))
+    ('sarcasm', 'xlm-roberta-base', {'epochs': '5', 'batch_size': '32', 'padding': 'dynamic'})
+    >>> parse_run_name("sentiment_roberta-base")
+    ('sentiment', 'roberta-base', {'epochs': '3', 'batch_size': '16', 'padding': 'dynamic'})
+    """
+    base, *params = name.split("__")
+    task, _, model = base.partition("_")
+    extra = {k: str(v) for k, v in SCRIPT_DEFAULTS.items()}
+    extra.update(p.partition("-")[::2] for p in params)
+    return task, model, extra
+
+
+def run_dir(config: dict) -> Path:
+    return OUTPUT_ROOT / run_name(config)
+
+
+def is_done(config: dict) -> bool:
+    return (run_dir(config) / "metrics_global.json").exists()
+
+
+def launch(config: dict, threads: int, log_dir: Path) -> subprocess.Popen:
+    cmd = [sys.executable, "testTransformeers.py", "--num_threads", str(threads), "--output_dir", str(run_dir(config))]
+    for k, v in config.items():
+        cmd += [f"--{k}", str(v)]
+    # Bornes aussi pour les bibliothèques natives (OpenMP / MKL) utilisées par torch
+    env = {**os.environ, "OMP_NUM_THREADS": str(threads), "MKL_NUM_THREADS": str(threads),
+           "TOKENIZERS_PARALLELISM": "false"}
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log = open(log_dir / f"{run_dir(config).name}.log", "w", encoding="utf-8")
+    proc = subprocess.Popen(cmd, cwd=HERE, env=env, stdout=log, stderr=subprocess.STDOUT)
+    proc.log = log
+    return proc
+
+
+def schedule(configs: list, cores: int, memory_gb: float, threads_per_run: int, log_dir: Path) -> dict:
+    """Lance les configurations dès que les cœurs et la mémoire disponibles le permettent."""
+    pending = [c for c in configs if not is_done(c)]
+    skipped = len(configs) - len(pending)
+    if skipped:
+        print(f"⏭️ {skipped} configuration(s) déjà faites, sautées")
+    running = []  # (config, process, need_gb, start)
+    status = {}
+    free_cores, free_mem = cores, memory_gb
+
+    while pending or running:
+        # Démarrer tout ce qui rentre dans le budget
+        for config in list(pending):
+            need = MEMORY_GB.get(config["model_name"], DEFAULT_MEMORY_GB)
+            if threads_per_run <= free_cores and need <= free_mem:
+                proc = launch(config, threads_per_run, log_dir)
+                running.append((config, proc, need, time.perf_counter()))
+                pending.remove(config)
+                free_cores -= threads_per_run
+                free_mem -= need
+                print(f"🚀 {run_dir(config).name} ({threads_per_run} threads, ~{need} Go)")
+        if not running and pending:
+            raise RuntimeError("Budget insuffisant pour lancer la configuration suivante "
+                               f"({pending[0]}) : augmente --cores / --memory_gb.")
+        time.sleep(1)
+        # Récupérer les workers terminés
+        for item in list(running):
+            config, proc, need, start = item
+            if proc.poll() is None:
+                continue
+            running.remove(item)
+            proc.log.close()
+            free_cores += threads_per_run
+            free_mem += need
+            ok = proc.returncode == 0
+            status[run_dir(config).name] = "ok" if ok else f"échec ({proc.returncode})"
+            print(f"{'✅' if ok else '❌'} {run_dir(config).name} en {time.perf_counter() - start:.0f} s")
+    return status
+
+
+def collect_results(output_root: Path = OUTPUT_ROOT) -> pd.DataFrame:
+    """Une ligne par (run, portée) : portée = 'global' ou la variété."""
+    rows = []
+    for run in sorted(p for p in output_root.iterdir() if p.is_dir()):
+        task, model, extra = parse_run_name(run.name)
+        for path in sorted(run.glob("metrics_*.json")):
+            with path.open(encoding="utf-8") as f:
+                data = json.load(f)
+            if path.name == "metrics_by_variety.json":
+                for variety, m in data.items():
+                    rows.append({"run": run.name, "task": task, "model": model, **extra, "scope": variety,
+                                 "source": path.name, **{k: v for k, v in m.items() if not isinstance(v, (dict, list))}})
+            else:
+                rows.append({"run": run.name, "task": task, "model": model, **extra, "scope": "global",
+                             "source": path.name, **{k: v for k, v in data.items() if not isinstance(v, (dict, list))}})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grille d'expériences BESSTIE en parallèle sous budget CPU/mémoire.")
+    parser.add_argument("--grid", type=Path, default=None, help="Fichier JSON {paramètre: [valeurs]} (défaut : DEFAULT_GRID)")
+    parser.add_argument("--cores", type=int, default=os.cpu_count())
+    parser.add_argument("--memory_gb", type=float, default=32)
+    parser.add_argument("--threads_per_run", type=int, default=4)
+    parser.add_argument("--collect_only", action="store_true", help="Seulement rassembler les métriques existantes")
+    parser.add_argument("--results", type=Path, default=OUTPUT_ROOT / "results_table.csv")
+    args = parser.parse_args()
+
+    if not args.collect_only:
+        grid = json.loads(args.grid.read_text()) if args.grid else DEFAULT_GRID
+        configs = expand_grid(grid)
+        print(f"🧪 {len(configs)} configuration(s), budget : {args.cores} cœurs / {args.memory_gb} Go")
+        status = schedule(configs, args.cores, args.memory_gb, min(args.threads_per_run, args.cores),
+                          OUTPUT_ROOT / "logs")
+        for name, st in status.items():
+            print(f"- {name}: {st}")
+
+    table = collect_results()
+    table.to_csv(args.results, index=False)
+    print(f"\n📊 {len(table)} lignes de métriques → {args.results.resolve()}")
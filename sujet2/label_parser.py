@@ -0,0 +1,169 @@
+# label_parser.py
+# Normalisation des sorties LLM en étiquettes, partagée par tous les backends et par les scripts de métriques.
+#
+#   - parse_outputs : colonne de réponses brutes → (étiquette 0/1/-1, code de confiance)
+#     Une seule regex compilée par tâche, appliquée aux valeurs uniques de la colonne (catégorielle),
+#     puis diffusée à toutes les lignes ; les résultats par valeur unique sont mis en cache sur disque
+#     (clé = version des règles : regex, réponses attendues et code de parse_one), donc re-étiqueter
+#     des centaines de milliers de réponses ne coûte que les réponses jamais vues. Le cache est lu une
+#     fois par processus et réécrit une seule fois, à la sortie (ou par save_caches()).
+#   - normalize_labels : étiquettes texte/numériques ("positive", "1", "1.0", ...) → 0/1/-1
+#
+# Les étiquettes produites sont identiques à l'ancien map_output_to_label (règles par sous-chaîne).
+
+import atexit
+import hashlib
+import inspect
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = Path(__file__).resolve().parent / "cache" / "label_parser"
+
+# Codes de confiance du parsing
+UNPARSED = 0   # aucune règle ne s'applique (étiquette -1)
+SUBSTRING = 1  # étiquette déduite d'une sous-chaîne (règle historique)
+LEADING = 2    # la réponse commence par la réponse attendue
+EXACT = 3      # la réponse est exactement une des réponses attendues
+
+# Une regex par tâche : chaque groupe nommé correspond à un indice cherché dans la réponse
+PATTERNS = {
+    "sentiment": re.compile(r"(?P<pos>pos)|(?P<neg>neg)"),
+    "sarcasm": re.compile(r"(?P<sarc>sarcastic)|(?P<neg>not)"),
+}
+# Réponses attendues (après minuscules et retrait de la ponctuation) → étiquette
+EXPECTED = {
+    "sentiment": {"positive": 1, "negative": 0},
+    "sarcasm": {"sarcastic": 1, "not sarcastic": 0},
+}
+PUNCT_RE = re.compile(r"[^\w\s]+")
+SPACES_RE = re.compile(r"\s+")
+
+# Étiquettes de référence ou déjà numériques (même mappage que recalculate_metrics.py)
+LABEL_MAPPING = {
+    "positive": 1, "pos": 1, "1": 1, "true": 1, "yes": 1, "sarcastic": 1,
+    "negative": 0, "neg": 0, "0": 0, "false": 0, "no": 0, "notsarcastic": 0
+}
+
+
+def parse_one(output: str, task: str) -> tuple[int, int]:
+    """(étiquette, code de confiance) pour une réponse brute."""
+    o = str(output).lower()
+    found = {m.lastgroup for m in PATTERNS[task].finditer(o)}
+    # Priorités identiques à l'ancien map_output_to_label
+    if task == "sentiment":
+        label = 1 if "pos" in found else 0 if "neg" in found else -1
+    else:
+        label = 0 if "neg" in found else 1 if "sarc" in found else -1
+    if label == -1:
+        return -1, UNPARSED
+
+    cleaned = SPACES_RE.sub(" ", PUNCT_RE.sub(" ", o)).strip()
+    expected = EXPECTED[task]
+    if expected.get(cleaned) == label:
+        return label, EXACT
+    if any(cleaned.startswith(ans) and lab == label for ans, lab in expected.items()):
+        return label, LEADING
+    return label, SUBSTRING
+
+
+@lru_cache(maxsize=None)
+def rules_version(task: str) -> str:
+    """Hash des règles : regex et réponses attendues de la tâche, nettoyage et logique de priorité de parse_one."""
+    spec = json.dumps([PATTERNS[task].pattern, EXPECTED[task], PUNCT_RE.pattern, SPACES_RE.pattern,
+                       inspect.getsource(parse_one)], sort_keys=True)
+    return hashlib.sha256(spec.encode()).hexdigest()[:12]
+
+
+_CACHES = {}      # tâche → {réponse: (étiquette, code)}, chargé une seule fois par processus
+_DIRTY = set()    # tâches dont le cache a des entrées nouvelles
+
+
+def _cache_path(task: str) -> Path:
+    return CACHE_DIR / f"{task}_{rules_version(task)}.json"
+
+
+def _get_cache(task: str) -> dict:
+    if task not in _CACHES:
+        path = _cache_path(task)
+        _CACHES[task] = {}
+        if path.exists():
+            with path.open(encoding="utf-8") as f:
+                _CACHES[task] = json.load(f)
+    return _CACHES[task]
+
+
+def save_caches() -> None:
+    """Écrit les caches modifiés (appelé automatiquement à la sortie du processus)."""
+    for task in sorted(_DIRTY):
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = _cache_path(task)
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(_CACHES[task], f, ensure_ascii=False)
+        tmp.replace(path)
+    _DIRTY.clear()
+
+
+atexit.register(save_caches)
+
+
+def parse_outputs(outputs, task: str, use_cache: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parse une colonne de réponses brutes. Retourne deux tableaux alignés sur l'entrée :
+    étiquettes (int8 : 0, 1 ou -1) et codes de confiance (int8, voir UNPARSED..EXACT).
+    """
+    cat = pd.Series(outputs).astype(str).astype("category")
+    uniques = list(cat.cat.categories)
+    cache = _get_cache(task) if use_cache else {}
+    n_before = len(cache)
+    for u in uniques:
+        if u not in cache:
+            cache[u] = parse_one(u, task)
+    if use_cache and len(cache) > n_before:
+        _DIRTY.add(task)
+
+    lut = np.array([cache[u] for u in uniques], dtype=np.int8).reshape(-1, 2)
+    codes = cat.cat.codes.to_numpy()
+    return lut[codes, 0], lut[codes, 1]
+
+
+def normalize_labels(col: pd.Series) -> np.ndarray:
+    """Étiquettes → 0/1, -1 si non reconnues. Le nettoyage se fait sur les valeurs uniques seulement."""
+    cat = col.astype("category")
+    cleaned = cat.cat.categories.astype(str).str.strip().str.lower().str.replace(r"\.0$", "", regex=True)
+    cleaned = cleaned.map(lambda v: LABEL_MAPPING.get(v, -1))  # "1.0" (colonne float) → "1" → 1
+    lut = np.append(np.asarray(cleaned, dtype=np.int8), -1)  # code -1 (NaN) → dernière case → -1
+    return lut[cat.cat.codes.to_numpy()]
+
+
+def relabel(path: Path, task: str) -> dict:
+    """Recalcule pred_label et parse_confidence d'un fichier de prédictions à partir de raw_output."""
+    df = pd.read_csv(path, dtype={"raw_output": "category"}, keep_default_na=False)
+    df["pred_label"], df["parse_confidence"] = parse_outputs(df["raw_output"], task)
+    df.to_csv(path, index=False)
+    codes = np.bincount(df["parse_confidence"].to_numpy(), minlength=EXACT + 1)
+    return {name: int(codes[c]) for c, name in enumerate(["unparsed", "substring", "leading", "exact"])}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-étiquette les predictions*.csv (colonne raw_output) avec les règles courantes.")
+    parser.add_argument("paths", nargs="*", type=Path,
+                        help="Fichiers de prédictions (défaut : output/*/predictions*.csv avec raw_output)")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted((Path(__file__).resolve().parent / "output").glob("*/predictions*.csv"))
+    for path in paths:
+        if "raw_output" not in pd.read_csv(path, nrows=0).columns:
+            continue
+        task = path.parent.name.partition("_")[0]
+        if task not in PATTERNS:
+            print(f"⚠️ Tâche inconnue pour {path}, ignoré")
+            continue
+        print(f"🏷️ {path.parent.name}: {relabel(path, task)}")
@@ -0,0 +1,124 @@
+# metrics_engine.py
+# Recalcule en une passe les métriques de tous les fichiers de prédictions de output/.
+# Toutes les paires (vrai, prédit) sont encodées dans un seul np.bincount qui donne un
+# tenseur de confusion (run × variété × vrai × prédit) ; accuracy, précision, rappel,
+# F1 (classe 1) et F1 macro sont ensuite calculés pour tous les groupes à la fois.
+#
+# Exemple :
+#   python metrics_engine.py                 → output/metrics_comparison.csv + .json
+#   python metrics_engine.py --root output --out comparaison
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from label_parser import normalize_labels
+
+OUTPUT_ROOT = Path(__file__).resolve().parent / "output"
+GLOBAL = "global"
+
+def read_predictions(path: Path) -> pd.DataFrame:
+    """Lit seulement les colonnes utiles : (label_true, label_pred) ou (label, pred_label), et variety."""
+    cols = pd.read_csv(path, nrows=0).columns
+    true_col = "label_true" if "label_true" in cols else "label"
+    pred_col = "label_pred" if "label_pred" in cols else "pred_label"
+    usecols = [true_col, pred_col] + (["variety"] if "variety" in cols else [])
+    df = pd.read_csv(path, usecols=usecols)
+    return pd.DataFrame({
+        "y_true": normalize_labels(df[true_col]),
+        "y_pred": normalize_labels(df[pred_col]),
+        "variety": df["variety"].astype(str) if "variety" in df else "n/a",
+    })
+
+
+def confusion_tensor(frames: dict) -> tuple[np.ndarray, list, list, np.ndarray]:
+    """
+    Concatène tous les runs et construit le tenseur de confusion C[run, variété, vrai, prédit]
+    avec un seul np.bincount. Retourne aussi le nombre de lignes invalides par (run, variété).
+    """
+    runs = list(frames)
+    all_df = pd.concat(frames.values(), keys=range(len(runs)), names=["run_idx"]).reset_index(level=0)
+    variety_cat = all_df["variety"].astype("category")
+    varieties = list(variety_cat.cat.categories)
+    r = all_df["run_idx"].to_numpy()
+    v = variety_cat.cat.codes.to_numpy()
+    t = all_df["y_true"].to_numpy()
+    p = all_df["y_pred"].to_numpy()
+
+    R, V = len(runs), len(varieties)
+    valid = (t >= 0) & (p >= 0)
+    flat = ((r[valid] * V + v[valid]) * 2 + t[valid]) * 2 + p[valid]
+    C = np.bincount(flat, minlength=R * V * 4).reshape(R, V, 2, 2)
+    invalid = np.bincount(r[~valid] * V + v[~valid], minlength=R * V).reshape(R, V)
+    return C, runs, varieties, invalid
+
+
+def metrics_from_confusion(C: np.ndarray) -> dict:
+    """Métriques binaires (classe positive = 1) + F1 macro, vectorisées sur les axes de tête."""
+    tn, fp, fn, tp = C[..., 0, 0], C[..., 0, 1], C[..., 1, 0], C[..., 1, 1]
+    n = tn + fp + fn + tp
+    with np.errstate(divide="ignore", invalid="ignore"):
+        accuracy = np.where(n > 0, (tp + tn) / n, 0.0)
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = np.where(tp + fn > 0, tp / (tp + fn), 0.0)
+        f1 = np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), 0.0)
+        f1_neg = np.where(2 * tn + fp + fn > 0, 2 * tn / (2 * tn + fp + fn), 0.0)
+    return {
+        "support": n,
+        "accuracy": accuracy,
+        "precision": precision,
+        "recall": recall,
+        "f1_score": f1,
+        "f1_macro": (f1 + f1_neg) / 2,
+    }
+
+
+def compute_all(root: Path = OUTPUT_ROOT) -> pd.DataFrame:
+    paths = sorted(root.glob("*/predictions*.csv"))
+    frames = {f"{p.parent.name}/{p.name}": read_predictions(p) for p in paths}
+    if not frames:
+        return pd.DataFrame()
+    C, runs, varieties, invalid = confusion_tensor(frames)
+
+    # Ajoute la portée "global" (somme sur les variétés) comme dernière colonne
+    C = np.concatenate([C, C.sum(axis=1, keepdims=True)], axis=1)
+    invalid = np.concatenate([invalid, invalid.sum(axis=1, keepdims=True)], axis=1)
+    scopes = varieties + [GLOBAL]
+    m = metrics_from_confusion(C)
+
+    rows = []
+    for i, run in enumerate(runs):
+        run_dir, _, file = run.partition("/")
+        task, _, model = run_dir.partition("_")
+        for j, scope in enumerate(scopes):
+            if m["support"][i, j] == 0 and invalid[i, j] == 0:
+                continue  # variété absente de ce fichier
+            rows.append({
+                "run": run_dir, "file": file, "task": task, "model": model, "scope": scope,
+                **{k: (int(val[i, j]) if k == "support" else float(val[i, j])) for k, val in m.items()},
+                "invalid": int(invalid[i, j]),
+                "confusion_matrix": C[i, j].tolist(),
+            })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Métriques de tous les fichiers de prédictions en une passe.")
+    parser.add_argument("--root", type=Path, default=OUTPUT_ROOT)
+    parser.add_argument("--out", default="metrics_comparison", help="Nom (sans extension) des fichiers de sortie dans --root")
+    args = parser.parse_args()
+
+    table = compute_all(args.root)
+    if table.empty:
+        print(f"⚠️ Aucun fichier predictions*.csv dans {args.root}")
+    else:
+        table.drop(columns="confusion_matrix").to_csv(args.root / f"{args.out}.csv", index=False)
+        with open(args.root / f"{args.out}.json", "w", encoding="utf-8") as f:
+            json.dump(table.to_dict(orient="records"), f, indent=2)
+        pivot = table[table["scope"] == GLOBAL].pivot_table(index="model", columns="task", values="f1_macro")
+        print("📊 F1 macro (global) :")
+        print(pivot.round(4).to_string())
+        print(f"\n✅ {len(table)} lignes → {(args.root / args.out).resolve()}.csv / .json")
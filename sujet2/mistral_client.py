@@ -0,0 +1,62 @@
+# mistral_client.py
+# Client asynchrone pour l'API chat/completions de Mistral :
+# une session HTTP partagée (connexions keep-alive), backoff sur 429/5xx.
+# L'URL est configurable pour tester contre le serveur local mock_llm_server.py.
+
+import asyncio
+
+import aiohttp
+
+from async_batch import RETRYABLE_STATUS, RetryableError, parse_retry_after, with_retries
+
+API_URL = "https://api.mistral.ai/v1/chat/completions"
+SYSTEM_PROMPT = "You are a text classification assistant."
+
+
+class MistralClient:
+    """Session aiohttp réutilisée pour toutes les requêtes ; à utiliser avec `async with`."""
+
+    def __init__(self, api_key: str, model: str, api_url: str = API_URL, concurrency: int = 8,
+                 temperature: float = 0.0, max_tokens: int = 20, timeout: float = 30, max_retries: int = 6,
+                 system_prompt: str = SYSTEM_PROMPT):
+        self.api_url = api_url
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.system_prompt = system_prompt
+        self.max_retries = max_retries
+        self.headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.concurrency = concurrency
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def _post(self, payload: dict) -> str:
+        try:
+            async with self.session.post(self.api_url, json=payload) as r:
+                if r.status in RETRYABLE_STATUS:
+                    raise RetryableError(f"HTTP {r.status}", parse_retry_after(r.headers.get("Retry-After")))
+                r.raise_for_status()
+                data = await r.json()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            raise RetryableError(repr(e)) from e
+        return data["choices"][0]["message"]["content"].strip()
+
+    async def complete(self, prompt: str) -> str:
+        payload = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+        }
+        return await with_retries(lambda: self._post(payload), max_retries=self.max_retries)
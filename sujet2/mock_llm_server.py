@@ -0,0 +1,100 @@
+# mock_llm_server.py
+# Faux serveur LLM local pour tester les clients sans quota ni GPU.
+#   POST /v1/chat/completions  (format Mistral)
+#   POST /api/generate         (format Ollama, avec ou sans streaming)
+# Réponses déterministes, latence simulée et une fraction de 429/503 pour exercer le backoff
+# (ou un 429 toutes les N requêtes avec --fail_every, Retry-After en secondes ou en date HTTP).
+# GET /stats : nombre de requêtes et d'erreurs renvoyées (utilisé par check_retries.py).
+#
+# Exemple :
+#   python mock_llm_server.py --port 8089 --error_rate 0.1
+#   python testMistralAi.py --api_url http://127.0.0.1:8089/v1/chat/completions
+#   python testOllama.py --ollama_url http://127.0.0.1:8089
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import zlib
+from email.utils import formatdate
+
+from aiohttp import web
+
+
+def fake_answer(prompt: str) -> str:
+    """Réponse déterministe selon le prompt (même texte -> même étiquette)."""
+    positive = zlib.crc32(prompt.encode("utf-8")) % 2 == 1
+    if "sarcasm" in prompt.lower():
+        return "Sarcastic" if positive else "Not Sarcastic"
+    return "Positive" if positive else "Negative"
+
+
+def make_app(latency: float = 0.05, error_rate: float = 0.0, fail_every: int = 0) -> web.Application:
+    stats = {"requests": 0, "errors": 0}
+
+    async def maybe_fail():
+        stats["requests"] += 1
+        n = stats["requests"]
+        await asyncio.sleep(random.uniform(0.5, 1.5) * latency)
+        if fail_every and n % fail_every == 0:
+            stats["errors"] += 1
+            # Alternance des deux formes de Retry-After autorisées par la RFC 9110
+            retry_after = "0.1" if (n // fail_every) % 2 else formatdate(time.time() + 1, usegmt=True)
+            return web.Response(status=429, headers={"Retry-After": retry_after})
+        if random.random() < error_rate:
+            stats["errors"] += 1
+            if random.random() < 0.5:
+                return web.Response(status=429, headers={"Retry-After": "0.1"})
+            return web.Response(status=503)
+        return None
+
+    async def chat_completions(request: web.Request) -> web.Response:
+        failure = await maybe_fail()
+        if failure is not None:
+            return failure
+        payload = await request.json()
+        prompt = payload["messages"][-1]["content"]
+        return web.json_response({
+            "model": payload.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": fake_answer(prompt)}}],
+        })
+
+    async def generate(request: web.Request) -> web.StreamResponse:
+        failure = await maybe_fail()
+        if failure is not None:
+            return failure
+        payload = await request.json()
+        answer = fake_answer(payload["prompt"])
+        model = payload.get("model", "mock")
+        if not payload.get("stream", True):
+            return web.json_response({"model": model, "response": answer, "done": True})
+        # Streaming NDJSON, un fragment par mot comme Ollama
+        resp = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await resp.prepare(request)
+        for word in answer.split(" "):
+            await resp.write((json.dumps({"model": model, "response": word + " ", "done": False}) + "\n").encode())
+        await resp.write((json.dumps({"model": model, "response": "", "done": True}) + "\n").encode())
+        await resp.write_eof()
+        return resp
+
+    async def get_stats(request: web.Request) -> web.Response:
+        return web.json_response(stats)
+
+    app = web.Application()
+    app["stats"] = stats
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_post("/api/generate", generate)
+    app.router.add_get("/stats", get_stats)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Faux serveur LLM local (tests des clients).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.05, help="Latence moyenne simulée (s).")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Fraction de réponses 429/503.")
+    parser.add_argument("--fail_every", type=int, default=0, help="Un 429 toutes les N requêtes (0 = jamais).")
+    args = parser.parse_args()
+    web.run_app(make_app(args.latency, args.error_rate, args.fail_every), host=args.host, port=args.port)
@@ -0,0 +1,73 @@
+# ollama_client.py
+# Client asynchrone pour l'API HTTP locale d'Ollama (POST /api/generate) :
+# une session keep-alive partagée au lieu d'un `ollama run` (nouveau processus) par texte,
+# plusieurs requêtes en vol et option de réponse en streaming (NDJSON).
+# Côté serveur, le parallélisme effectif dépend de OLLAMA_NUM_PARALLEL.
+
+import asyncio
+import json
+
+import aiohttp
+
+from async_batch import RETRYABLE_STATUS, RetryableError, with_retries
+
+OLLAMA_URL = "http://127.0.0.1:11434"
+
+
+class OllamaClient:
+    """Session aiohttp réutilisée pour toutes les requêtes ; à utiliser avec `async with`."""
+
+    def __init__(self, model: str, base_url: str = OLLAMA_URL, concurrency: int = 4, stream: bool = False,
+                 temperature: float = 0.0, num_predict: int = 20, keep_alive: str = "10m",
+                 timeout: float = 60, max_retries: int = 3, system: str = ""):
+        self.url = base_url.rstrip("/") + "/api/generate"
+        self.model = model
+        self.stream = stream
+        self.system = system  # prompt système ("" = celui du Modelfile)
+        self.options = {"temperature": temperature, "num_predict": num_predict}
+        self.keep_alive = keep_alive  # garde le modèle chargé entre les requêtes
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def _generate(self, prompt: str) -> str:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": self.stream,
+            "options": self.options,
+            "keep_alive": self.keep_alive,
+        }
+        if self.system:
+            payload["system"] = self.system
+        try:
+            async with self.session.post(self.url, json=payload) as r:
+                if r.status in RETRYABLE_STATUS:
+                    raise RetryableError(f"HTTP {r.status}")
+                r.raise_for_status()
+                if not self.stream:
+                    return (await r.json())["response"].strip()
+                # Streaming : une ligne JSON par fragment, jusqu'à "done": true
+                parts = []
+                async for line in r.content:
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    parts.append(chunk.get("response", ""))
+                    if chunk.get("done"):
+                        break
+                return "".join(parts).strip()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            raise RetryableError(repr(e)) from e
+
+    async def complete(self, prompt: str) -> str:
+        return await with_retries(lambda: self._generate(prompt), max_retries=self.max_retries)
@@ -0,0 +1,62 @@
+# prompt_cache.py
+# Cache persistant des réponses LLM (SQLite), clé = (backend, modèle, hash du prompt, température,
+# max_tokens, hash du prompt système).
+# Réévaluer avec une autre métrique ou un autre mapping d'étiquettes ne réinterroge jamais le modèle ;
+# il sert aussi de point de reprise : chaque réponse est validée (commit) dès qu'elle arrive,
+# un arrêt brutal ne perd donc aucune réponse déjà payée.
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+
+DEFAULT_CACHE = Path(__file__).resolve().parent / "cache" / "llm_responses.sqlite"
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class PromptCache:
+    def __init__(self, path: Path = DEFAULT_CACHE):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # WAL : un commit par réponse reste peu coûteux
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses_v2 ("
+            " backend TEXT, model TEXT, prompt_sha TEXT, temperature REAL, max_tokens INTEGER, system_sha TEXT,"
+            " response TEXT, created REAL,"
+            " PRIMARY KEY (backend, model, prompt_sha, temperature, max_tokens, system_sha))"
+        )
+
+    def get_many(self, backend: str, model: str, temperature: float, max_tokens: int, system: str,
+                 prompts: list) -> dict:
+        """Retourne {prompt: réponse} pour les prompts déjà en cache."""
+        by_sha = {prompt_hash(p): p for p in prompts}
+        found = {}
+        shas = list(by_sha)
+        for i in range(0, len(shas), 500):  # limite du nombre de paramètres SQLite
+            chunk = shas[i:i + 500]
+            rows = self.conn.execute(
+                "SELECT prompt_sha, response FROM responses_v2"
+                " WHERE backend = ? AND model = ? AND temperature = ? AND max_tokens = ? AND system_sha = ?"
+                f" AND prompt_sha IN ({','.join('?' * len(chunk))})",
+                (backend, model, temperature, max_tokens, prompt_hash(system), *chunk),
+            )
+            for sha, response in rows:
+                found[by_sha[sha]] = response
+        return found
+
+    def put(self, backend: str, model: str, temperature: float, max_tokens: int, system: str,
+            prompt: str, response: str) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses_v2 VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (backend, model, prompt_hash(prompt), temperature, max_tokens, prompt_hash(system), response, time.time()),
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
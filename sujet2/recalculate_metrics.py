@@ -11,6 +11,8 @@ from sklearn.metrics import (
     classification_report
 )
 
+from label_parser import normalize_labels
+
 # --- Charger le CSV ---
 if len(sys.argv) < 2:
     print("Usage: python recalculate_metrics_for_mistral.py predictions_mistral_api.csv")
@@ -27,20 +29,12 @@ if not required.issubset(df.columns):
 
 # --- Nettoyage des données ---
 print("🧹 Nettoyage des labels...")
-df = df.dropna(subset=["label", "pred_label"])
-df["label"] = df["label"].astype(str).str.strip().str.lower()
-df["pred_label"] = df["pred_label"].astype(str).str.strip().str.lower()
-
-# Mappage vers 0/1
-mapping = {
-    "positive": 1, "pos": 1, "1": 1, "true": 1, "yes": 1, "sarcastic": 1,
-    "negative": 0, "neg": 0, "0": 0, "false": 0, "no": 0, "notsarcastic": 0
-}
-df["label"] = df["label"].map(mapping)
-df["pred_label"] = df["pred_label"].map(mapping)
+# Mappage vers 0/1 (label_parser.LABEL_MAPPING, appliqué aux valeurs uniques seulement ; -1 = invalide)
+df["label"] = normalize_labels(df["label"])
+df["pred_label"] = normalize_labels(df["pred_label"])
 
 # Supprimer les lignes invalides
-df = df.dropna(subset=["label", "pred_label"])
+df = df[(df["label"] >= 0) & (df["pred_label"] >= 0)]
 df["label"] = df["label"].astype(int)
 df["pred_label"] = df["pred_label"].astype(int)
 
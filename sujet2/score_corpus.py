@@ -0,0 +1,128 @@
+# score_corpus.py
+# Applique un classifieur BESSTIE sauvegardé (testTransformeers.py → output/*/best_model) à un corpus
+# quelconque : JSONL (ex: brighter_subset_explained.jsonl) ou CSV, colonne de texte au choix.
+#   - lecture en streaming par blocs (JSONL indexé via jsonl_loader, CSV via read_csv(chunksize))
+#   - pool de processus, chacun avec son FastClassifier ; dans un bloc, batches triés par longueur
+#   - probabilités écrites au fur et à mesure dans un Parquet (un row group par bloc)
+#   - débit (docs/s) affiché pendant le run et sauvegardé dans <sortie>.json
+#
+# Exemple :
+#   python score_corpus.py --model_dir output/sentiment_roberta-base/best_model \
+#       --input ../brighter_subset_explained.jsonl --text_col text --workers 4 --out scores/brighter_sentiment.parquet
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fast_inference import BACKENDS, FastClassifier
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # jsonl_loader.py est à la racine du dépôt
+
+_clf = None  # un classifieur par processus worker
+
+
+def _init_worker(model_dir, backend, max_length, num_threads):
+    global _clf
+    _clf = FastClassifier(model_dir, backend, max_length, num_threads)
+
+
+def _score_chunk(start, texts, batch_size):
+    return start, _clf.predict_proba(texts, batch_size)
+
+
+def iter_chunks(path: Path, text_col: str, chunk_size: int):
+    """(indice de la première ligne, liste de textes) par bloc de chunk_size documents."""
+    if path.suffix == ".jsonl":
+        from jsonl_loader import JsonlDataset
+        with JsonlDataset(path) as ds:
+            start = 0
+            for batch in ds.iter_batches(chunk_size, fields=[text_col]):
+                texts = ["" if t is None else str(t) for t in batch[text_col]]
+                yield start, texts
+                start += len(texts)
+    else:
+        start = 0
+        for df in pd.read_csv(path, usecols=[text_col], chunksize=chunk_size):
+            texts = df[text_col].fillna("").astype(str).tolist()
+            yield start, texts
+            start += len(texts)
+
+
+def score_corpus(model_dir: Path, input_path: Path, out_path: Path, text_col: str = "text",
+                 backend: str = "onnx", workers: int = 1, chunk_size: int = 4096, batch_size: int = 64,
+                 max_length: int = 128) -> dict:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("pyarrow est requis pour l'écriture Parquet (pip install pyarrow)") from e
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    if backend == "onnx" and not (Path(model_dir) / "model.onnx").exists():
+        FastClassifier(model_dir, backend, max_length)  # export ONNX une seule fois, avant les workers
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+
+    writer, n_docs, start_time = None, 0, time.perf_counter()
+
+    def write(start, probas):
+        nonlocal writer, n_docs
+        cols = {"row_id": np.arange(start, start + len(probas), dtype=np.int64)}
+        cols.update({f"proba_{k}": probas[:, k] for k in range(probas.shape[1])})
+        cols["label_pred"] = probas.argmax(axis=1).astype(np.int8)
+        table = pa.Table.from_pydict(cols)
+        if writer is None:
+            writer = pq.ParquetWriter(str(out_path), table.schema, compression="zstd")
+        writer.write_table(table)
+        n_docs += len(probas)
+        elapsed = time.perf_counter() - start_time
+        print(f"\r⚡ {n_docs} docs | {n_docs / elapsed:.1f} docs/s", end="", flush=True)
+
+    # Au plus 2 blocs en attente par worker : la mémoire reste bornée quelle que soit la taille du corpus
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(model_dir, backend, max_length, num_threads)) as ex:
+        pending = set()
+        try:
+            for start, texts in iter_chunks(input_path, text_col, chunk_size):
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        write(*fut.result())
+                pending.add(ex.submit(_score_chunk, start, texts, batch_size))
+            for fut in wait(pending).done:
+                write(*fut.result())
+        finally:
+            if writer is not None:
+                writer.close()
+
+    elapsed = time.perf_counter() - start_time
+    report = {"input": str(input_path), "model_dir": str(model_dir), "backend": backend, "workers": workers,
+              "docs": n_docs, "seconds": round(elapsed, 2), "docs_per_s": round(n_docs / elapsed, 1) if elapsed else None}
+    with out_path.with_suffix(".json").open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ {n_docs} docs en {elapsed:.1f} s ({report['docs_per_s']} docs/s) → {out_path.resolve()}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score un corpus JSONL/CSV avec un classifieur BESSTIE sauvegardé.")
+    parser.add_argument("--model_dir", type=Path, required=True, help="Dossier best_model de testTransformeers.py")
+    parser.add_argument("--input", type=Path, required=True, help="Fichier .jsonl ou .csv")
+    parser.add_argument("--text_col", default="text")
+    parser.add_argument("--out", type=Path, default=None, help="Parquet de sortie (défaut : scores/<input>_<run>.parquet)")
+    parser.add_argument("--backend", default="onnx", choices=BACKENDS)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk_size", type=int, default=4096, help="Documents par bloc envoyé à un worker")
+    parser.add_argument("--batch_size", type=int, default=64)
+    parser.add_argument("--max_length", type=int, default=128)
+    args = parser.parse_args()
+
+    out = args.out or Path("scores") / f"{args.input.stem}_{args.model_dir.parent.name}.parquet"
+    score_corpus(args.model_dir, args.input, out, args.text_col, args.backend, args.workers,
+                 args.chunk_size, args.batch_size, args.max_length)
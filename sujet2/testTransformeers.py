@@ -2,45 +2,73 @@
 # Test d’un modèle Transformer (DistilBERT) sur BESSTIE local
 # + sauvegarde des prédictions et des métriques globales et par variété linguistique
 
+import argparse
 import json
+import time
 from pathlib import Path
 import numpy as np
 import pandas as pd
-from datasets import Dataset
-from transformers import AutoTokenizer, AutoModelForSequenceClassification, TrainingArguments, Trainer
+import torch
+from transformers import (AutoTokenizer, AutoModelForSequenceClassification, TrainingArguments, Trainer,
+                          DataCollatorWithPadding)
 from sklearn.metrics import f1_score, accuracy_score
 
+from tokenized_cache import load_tokenized
+
 # ---------- CONFIG ----------
 TASK = "sentiment"  # ou "sarcasm"
 DATA_DIR = f"./BESSTIE/{TASK}"
 MODEL_NAME = "xlm-roberta-base" #distilbert-base-uncased / roberta-base
 EPOCHS = 3 
 BATCH_SIZE = 16
+MAX_LENGTH = 128
+PADDING = "dynamic"  # "dynamic" (padding par batch + regroupement par longueur) ou "max_length" (ancien mode)
 OUTPUT_DIR = Path(f"./output/{TASK}_{MODEL_NAME.replace('/','-')}")
+NUM_THREADS = None  # threads torch (None = défaut) ; fixé par grid_runner.py pour chaque worker
 # ----------------------------
 
+# Surcharges en ligne de commande (utilisées par grid_runner.py) ; sans argument, la CONFIG s'applique
+parser = argparse.ArgumentParser()
+parser.add_argument("--task", default=TASK, choices=["sentiment", "sarcasm"])
+parser.add_argument("--model_name", default=MODEL_NAME)
+parser.add_argument("--epochs", type=int, default=EPOCHS)
+parser.add_argument("--batch_size", type=int, default=BATCH_SIZE)
+parser.add_argument("--padding", default=PADDING, choices=["dynamic", "max_length"])
+parser.add_argument("--num_threads", type=int, default=NUM_THREADS)
+parser.add_argument("--output_dir", type=Path, default=None, help="Dossier du run (grid_runner : un par configuration)")
+args = parser.parse_args()
+TASK, MODEL_NAME, EPOCHS, BATCH_SIZE, PADDING = args.task, args.model_name, args.epochs, args.batch_size, args.padding
+DATA_DIR = f"./BESSTIE/{TASK}"
+OUTPUT_DIR = args.output_dir or Path(f"./output/{TASK}_{MODEL_NAME.replace('/','-')}")
+if args.num_threads:
+    torch.set_num_threads(args.num_threads)
+
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-# 1️⃣ Charger les CSV locaux
-train_df = pd.read_csv(f"{DATA_DIR}/train_{TASK}.csv")
+# 1️⃣ Charger le CSV de validation (pour joindre les prédictions)
 valid_df = pd.read_csv(f"{DATA_DIR}/validation_{TASK}.csv").reset_index(drop=True)
 
-# 2️⃣ Conversion en Dataset Hugging Face
-train_dataset = Dataset.from_pandas(train_df)
-valid_dataset = Dataset.from_pandas(valid_df)
-
-# 3️⃣ Tokenization
+# 2️⃣ + 3️⃣ Datasets tokenisés, depuis le cache partagé (clé : fichier, tokenizer, max_length, padding)
 tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
 def tokenize_fn(batch):
-    return tokenizer(batch["text"], truncation=True, padding="max_length", max_length=128)
+    if PADDING == "max_length":
+        enc = tokenizer(batch["text"], truncation=True, padding="max_length", max_length=MAX_LENGTH)
+    else:
+        # Pas de padding ici : le data collator complète chaque batch à la longueur de son plus long exemple
+        enc = tokenizer(batch["text"], truncation=True, max_length=MAX_LENGTH)
+    enc["length"] = [sum(m) for m in enc["attention_mask"]]  # longueur réelle (hors pad)
+    return enc
 
-train_dataset = train_dataset.map(tokenize_fn, batched=True)
-valid_dataset = valid_dataset.map(tokenize_fn, batched=True)
+train_dataset = load_tokenized(f"{DATA_DIR}/train_{TASK}.csv", tokenizer, tokenize_fn, MAX_LENGTH, PADDING)
+valid_dataset = load_tokenized(f"{DATA_DIR}/validation_{TASK}.csv", tokenizer, tokenize_fn, MAX_LENGTH, PADDING)
 
 train_dataset = train_dataset.rename_column("label", "labels")
 valid_dataset = valid_dataset.rename_column("label", "labels")
-train_dataset.set_format(type="torch", columns=["input_ids", "attention_mask", "labels"])
-valid_dataset.set_format(type="torch", columns=["input_ids", "attention_mask", "labels"])
+train_dataset.set_format(type="torch", columns=["input_ids", "attention_mask", "labels"], output_all_columns=True)
+valid_dataset.set_format(type="torch", columns=["input_ids", "attention_mask", "labels"], output_all_columns=True)
+
+# Padding dynamique : collator par batch ; l'ancien mode garde des tenseurs déjà à MAX_LENGTH
+data_collator = DataCollatorWithPadding(tokenizer) if PADDING == "dynamic" else None
 
 # 4️⃣ Modèle
 model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME, num_labels=2)
@@ -54,9 +82,17 @@ def compute_metrics(eval_pred):
         "f1_macro": f1_score(labels, preds, average="macro"),
     }
 
+def pad_efficiency(lengths, order, batch_size):
+    """Part des tokens réels dans les batches (1.0 = aucun token de pad calculé pour rien)."""
+    padded = 0
+    for i in range(0, len(order), batch_size):
+        batch = lengths[order[i:i + batch_size]]
+        padded += (MAX_LENGTH if PADDING == "max_length" else batch.max()) * len(batch)
+    return float(lengths.sum() / padded)
+
 # 6️⃣ Entraînement
 args = TrainingArguments(
-    output_dir=f"results_{TASK}",
+    output_dir=f"results_{OUTPUT_DIR.name}",  # distinct par configuration : runs concurrents
     evaluation_strategy="epoch",
     save_strategy="epoch",
     per_device_train_batch_size=BATCH_SIZE,
@@ -65,6 +101,9 @@ args = TrainingArguments(
     learning_rate=2e-5,
     load_best_model_at_end=True,
     metric_for_best_model="f1_macro",
+    group_by_length=(PADDING == "dynamic"),  # batches de longueurs voisines → moins de pad
+    length_column_name="length",
+    remove_unused_columns=True,
 )
 
 trainer = Trainer(
@@ -73,17 +112,31 @@ trainer = Trainer(
     train_dataset=train_dataset,
     eval_dataset=valid_dataset,
     tokenizer=tokenizer,
+    data_collator=data_collator,
     compute_metrics=compute_metrics,
 )
 
-trainer.train()
+t0 = time.perf_counter()
+train_out = trainer.train()
+train_time = time.perf_counter() - t0
 results = trainer.evaluate()
 print("\n✅ Résultats globaux :", results)
 
+# Meilleur checkpoint (load_best_model_at_end) + tokenizer, pour fast_inference.py
+best_model_dir = OUTPUT_DIR / "best_model"
+trainer.save_model(best_model_dir)
+
 # 7️⃣ Prédictions sur validation
-pred_out = trainer.predict(valid_dataset)
-logits = pred_out.predictions
-y_true = pred_out.label_ids
+# En mode dynamique, on prédit dans l'ordre des longueurs (batches homogènes) puis on remet l'ordre d'origine
+lengths = np.asarray(valid_dataset["length"])
+order = np.argsort(lengths, kind="stable") if PADDING == "dynamic" else np.arange(len(valid_dataset))
+t0 = time.perf_counter()
+pred_out = trainer.predict(valid_dataset.select(order))
+predict_time = time.perf_counter() - t0
+inverse = np.empty_like(order)
+inverse[order] = np.arange(len(order))
+logits = pred_out.predictions[inverse]
+y_true = pred_out.label_ids[inverse]
 y_pred = np.argmax(logits, axis=1)
 
 # Softmax (probas)
@@ -132,6 +185,28 @@ metrics_by_lang_path = OUTPUT_DIR / "metrics_by_variety.json"
 with metrics_by_lang_path.open("w", encoding="utf-8") as f:
     json.dump(metrics_by_variety, f, indent=2)
 
+# 🔹 Mesures de débit (comparer PADDING="dynamic" et PADDING="max_length")
+n_train_seen = len(train_dataset) * EPOCHS
+timing = {
+    "padding": PADDING,
+    "max_length": MAX_LENGTH,
+    "batch_size": BATCH_SIZE,
+    "train_time_s": train_time,
+    "train_samples_per_s": n_train_seen / train_time,
+    "predict_time_s": predict_time,
+    "predict_samples_per_s": len(valid_dataset) / predict_time,
+    # fraction de tokens réels dans les batches de prédiction (1.0 = aucun pad)
+    "predict_pad_efficiency": pad_efficiency(lengths, order, BATCH_SIZE),
+    "train_runtime_reported_s": float(train_out.metrics.get("train_runtime", train_time)),
+}
+timing_path = OUTPUT_DIR / f"timing_{PADDING}.json"
+with timing_path.open("w", encoding="utf-8") as f:
+    json.dump(timing, f, indent=2)
+print(f"\n⏱️ Entraînement : {train_time:.1f} s ({timing['train_samples_per_s']:.1f} ex/s) | "
+      f"Prédiction : {predict_time:.1f} s ({timing['predict_samples_per_s']:.1f} ex/s) | "
+      f"efficacité pad : {timing['predict_pad_efficiency']:.2%}")
+
 print(f"\n📊 Métriques globales enregistrées dans : {metrics_path.resolve()}")
 print(f"🌍 Métriques par variété enregistrées dans : {metrics_by_lang_path.resolve()}")
 print(f"💾 Prédictions complètes dans : {pred_path.resolve()}")
+print(f"⏱️ Mesures de débit dans : {timing_path.resolve()}")
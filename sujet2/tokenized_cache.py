@@ -0,0 +1,66 @@
+# tokenized_cache.py
+# Cache de datasets pré-tokenisés partagé entre les lancements et les modèles.
+# Clé = (hash du fichier de données, tokenizer, max_length, mode de padding) ;
+# chaque entrée est un dossier Arrow (save_to_disk) relu par memory-mapping (load_from_disk),
+# donc un second lancement avec le même modèle ne relit ni ne retokenise le CSV.
+# L'entrée est écrite dans un dossier temporaire voisin puis renommée d'un coup (os.replace) :
+# un arrêt brutal ou deux runs concurrents (grid_runner.py) ne laissent jamais d'entrée partielle.
+
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import pandas as pd
+from datasets import Dataset, load_from_disk
+
+CACHE_DIR = Path(__file__).resolve().parent / "cache" / "tokenized"
+
+
+def file_sha256(path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_key(data_path, tokenizer, max_length: int, padding: str) -> str:
+    spec = {
+        "data_sha256": file_sha256(data_path),
+        "tokenizer": tokenizer.name_or_path,
+        "tokenizer_class": type(tokenizer).__name__,
+        "vocab_size": len(tokenizer),
+        "max_length": max_length,
+        "padding": padding,
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:24]
+
+
+def load_tokenized(data_path, tokenizer, tokenize_fn, max_length: int, padding: str,
+                   cache_dir: Path = CACHE_DIR) -> Dataset:
+    """
+    Retourne le Dataset tokenisé de `data_path` (CSV), depuis le cache s'il existe,
+    sinon le construit avec `tokenize_fn` (batched) et l'enregistre.
+    """
+    key = cache_key(data_path, tokenizer, max_length, padding)
+    entry = Path(cache_dir) / key
+    if entry.is_dir():
+        print(f"🗃️ Tokenisation en cache : {Path(data_path).name} → {entry.name}")
+        return load_from_disk(str(entry))
+
+    print(f"🔤 Tokenisation de {Path(data_path).name} ({tokenizer.name_or_path}, max_length={max_length}, {padding})")
+    dataset = Dataset.from_pandas(pd.read_csv(data_path), preserve_index=False)
+    dataset = dataset.map(tokenize_fn, batched=True)
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    tmp = entry.with_name(f"{key}.tmp-{os.getpid()}-{uuid.uuid4().hex[:8]}")
+    dataset.save_to_disk(str(tmp))
+    try:
+        os.replace(tmp, entry)  # renommage atomique : l'entrée n'apparaît que complète
+    except OSError:
+        # Un run concurrent a publié la même entrée entre-temps : on garde la sienne
+        shutil.rmtree(tmp, ignore_errors=True)
+    # Relire depuis le disque : tables Arrow memory-mappées plutôt qu'en mémoire
+    return load_from_disk(str(entry))
@@ -0,0 +1,222 @@
+# zero_shot_runner.py
+# Évaluation zero-shot unifiée sur BESSTIE avec backends interchangeables :
+#   - mistral      : API Mistral (MistralClient)
+#   - ollama       : serveur Ollama local (OllamaClient)
+#   - transformers : pipeline text-generation local
+# Toutes les réponses passent par PromptCache (clé : backend, modèle, prompt, température,
+# max_tokens, prompt système) : un balayage tâches × variétés ne paie que les prompts nouveaux,
+# et changer de mapping ne réinterroge pas le modèle.
+#
+# Exemple :
+#   python zero_shot_runner.py --task sarcasm --backend ollama --model llama3.1 --run_name ollama_llama31
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score
+
+from async_batch import TokenBucket, run_concurrent
+from label_parser import parse_outputs
+from prompt_cache import DEFAULT_CACHE, PromptCache
+
+BACKENDS = ("mistral", "ollama", "transformers")
+
+
+# --- Prompts ------------------------------------------------------------------
+
+def make_prompt(text: str, task: str) -> str:
+    if task == "sentiment":
+        return (
+            "Classify the following text as either 'Positive' or 'Negative'. "
+            "Respond with only one word: Positive or Negative.\n\n"
+            f"Text:\n{text}"
+        )
+    else:
+        return (
+            "Determine if the following text contains sarcasm. "
+            "Respond only with 'Sarcastic' or 'Not Sarcastic'.\n\n"
+            f"Text:\n{text}"
+        )
+
+
+# --- Backends -----------------------------------------------------------------
+
+class TransformersBackend:
+    """Pipeline text-generation local, exécuté dans un thread (une génération à la fois)."""
+
+    def __init__(self, model: str, temperature: float = 0.0, max_new_tokens: int = 20, system: str = ""):
+        from transformers import pipeline
+        self.pipe = pipeline("text-generation", model=model)
+        self.system = system
+        self.gen_kwargs = {"max_new_tokens": max_new_tokens, "return_full_text": False}
+        if temperature > 0:
+            self.gen_kwargs.update(do_sample=True, temperature=temperature)
+        else:
+            self.gen_kwargs.update(do_sample=False)
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def complete(self, prompt: str) -> str:
+        if self.system:
+            prompt = f"{self.system}\n\n{prompt}"
+        async with self._lock:
+            out = await asyncio.to_thread(self.pipe, prompt, **self.gen_kwargs)
+        return out[0]["generated_text"].strip()
+
+
+def default_system(name: str) -> str:
+    """Prompt système utilisé par défaut par chaque backend (fait partie de la clé du cache)."""
+    if name == "mistral":
+        from mistral_client import SYSTEM_PROMPT
+        return SYSTEM_PROMPT
+    return ""
+
+
+def make_backend(name: str, model: str, temperature: float, concurrency: int, url: str | None = None,
+                 api_key: str | None = None, max_tokens: int = 20, system: str = "", stream: bool = False):
+    if name == "mistral":
+        from mistral_client import API_URL, MistralClient
+        return MistralClient(api_key, model, api_url=url or API_URL, concurrency=concurrency, temperature=temperature,
+                             max_tokens=max_tokens, system_prompt=system)
+    if name == "ollama":
+        from ollama_client import OLLAMA_URL, OllamaClient
+        return OllamaClient(model, base_url=url or OLLAMA_URL, concurrency=concurrency, stream=stream,
+                            temperature=temperature, num_predict=max_tokens, system=system)
+    if name == "transformers":
+        return TransformersBackend(model, temperature=temperature, max_new_tokens=max_tokens, system=system)
+    raise ValueError(f"Backend inconnu : {name} (attendu : {', '.join(BACKENDS)})")
+
+
+# --- Métriques ----------------------------------------------------------------
+
+def compute_metrics(df: pd.DataFrame) -> tuple[dict, dict]:
+    """Métriques globales et par variété sur les lignes dont la sortie a été reconnue (0/1)."""
+    df_valid = df[df["pred_label"].isin([0, 1])]
+    metrics = {
+        "accuracy": float(accuracy_score(df_valid["label"], df_valid["pred_label"])),
+        "f1_macro": float(f1_score(df_valid["label"], df_valid["pred_label"], average="macro")),
+        "samples": int(len(df_valid)),
+    }
+    metrics_by_variety = {}
+    if "variety" in df_valid.columns:
+        for variety, sub in df_valid.groupby("variety"):
+            metrics_by_variety[variety] = {
+                "samples": int(len(sub)),
+                "accuracy": float(accuracy_score(sub["label"], sub["pred_label"])),
+                "f1_macro": float(f1_score(sub["label"], sub["pred_label"], average="macro")),
+            }
+    return metrics, metrics_by_variety
+
+
+# --- Exécution ----------------------------------------------------------------
+
+async def query_prompts(prompts: list, backend: str, model: str, temperature: float, cache: PromptCache,
+                        concurrency: int, rate: float | None, url: str | None, api_key: str | None,
+                        max_tokens: int = 20, system: str = "", stream: bool = False) -> dict:
+    """Retourne {prompt: réponse} en n'interrogeant le backend que pour les prompts absents du cache."""
+    unique = list(dict.fromkeys(prompts))
+    cached = cache.get_many(backend, model, temperature, max_tokens, system, unique)
+    todo = [(p, p) for p in unique if p not in cached]
+    print(f"🗃️ {len(cached)} réponses en cache, 🚀 {len(todo)} prompts à envoyer")
+    if not todo:
+        return cached
+
+    def store(prompt, response):
+        cache.put(backend, model, temperature, max_tokens, system, prompt, response)
+
+    client = make_backend(backend, model, temperature, concurrency, url, api_key, max_tokens, system, stream)
+    async with client:
+        new = await run_concurrent(todo, client.complete, concurrency,
+                                   bucket=TokenBucket(rate) if rate else None, on_result=store)
+    return {**cached, **new}
+
+
+def run(task: str, backend: str, model: str, run_name: str | None = None, data_dir: str | None = None,
+        output_root: str = "./output", varieties: list | None = None, n_samples: int | None = None,
+        temperature: float = 0.0, concurrency: int = 4, rate: float | None = None, url: str | None = None,
+        api_key: str | None = None, cache_path: Path = DEFAULT_CACHE,
+        parquet_root: Path | None = None, max_tokens: int = 20, system: str | None = None,
+        stream: bool = False) -> tuple[dict, dict]:
+    """system=None : prompt système par défaut du backend (voir default_system)."""
+    run_name = run_name or f"{backend}_{model.replace('/', '-')}"
+    data_dir = data_dir or f"./BESSTIE/{task}"
+    output_dir = Path(output_root) / f"{task}_{run_name}"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if parquet_root:
+        # Dataset partitionné : seule la tranche (validation, tâche, variétés) est lue
+        from besstie_data import load_besstie
+        df = load_besstie("validation", task, varieties, root=parquet_root)
+    else:
+        df = pd.read_csv(f"{data_dir}/validation_{task}.csv")
+        if varieties:
+            df = df[df["variety"].isin(varieties)].reset_index(drop=True)
+    if n_samples:
+        df = df.sample(n_samples, random_state=42).reset_index(drop=True)
+
+    prompts = [make_prompt(t, task) for t in df["text"]]
+    system = default_system(backend) if system is None else system
+    cache = PromptCache(cache_path)
+    start = time.perf_counter()
+    try:
+        outputs = asyncio.run(query_prompts(prompts, backend, model, temperature, cache,
+                                            concurrency, rate, url, api_key, max_tokens, system, stream))
+    finally:
+        cache.close()
+    print(f"⏱️ {len(df)} lignes en {time.perf_counter() - start:.1f} s")
+
+    # Les prompts en échec ne sont pas mis en cache : ils seront retentés au prochain lancement
+    df["raw_output"] = [outputs.get(p, "error") for p in prompts]
+    df["pred_label"], df["parse_confidence"] = parse_outputs(df["raw_output"], task)
+    pred_path = output_dir / f"predictions_{run_name}.csv"
+    df.to_csv(pred_path, index=False)
+
+    metrics, metrics_by_variety = compute_metrics(df)
+    with open(output_dir / f"metrics_{run_name}.json", "w") as f:
+        json.dump(metrics, f, indent=2)
+    if metrics_by_variety:
+        with open(output_dir / "metrics_by_variety.json", "w") as f:
+            json.dump(metrics_by_variety, f, indent=2)
+
+    print(f"\n✅ Résultats finaux ({backend} / {model})")
+    print(f"   Accuracy : {metrics['accuracy']:.3f} | F1-macro : {metrics['f1_macro']:.3f} | Samples : {metrics['samples']}")
+    print(f"📂 Prédictions : {pred_path.resolve()}")
+    return metrics, metrics_by_variety
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Évaluation zero-shot BESSTIE avec cache des réponses.")
+    parser.add_argument("--task", nargs="+", default=["sentiment"], choices=["sentiment", "sarcasm"],
+                        help="Une ou plusieurs tâches (balayage).")
+    parser.add_argument("--backend", required=True, choices=BACKENDS)
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--run_name", default=None, help="Suffixe du dossier de sortie (ex: mistral_api).")
+    parser.add_argument("--variety", nargs="+", default=None, help="Restreindre à des variétés (ex: en-AU en-IN).")
+    parser.add_argument("--n_samples", type=int, default=None)
+    parser.add_argument("--temperature", type=float, default=0.0)
+    parser.add_argument("--max_tokens", type=int, default=20, help="Longueur maximale de la réponse.")
+    parser.add_argument("--system", default=None, help="Prompt système (défaut : celui du backend).")
+    parser.add_argument("--stream", action="store_true", help="Réponses en streaming (backend ollama)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=None, help="Requêtes/s maximum (seau à jetons).")
+    parser.add_argument("--url", default=None, help="URL du backend (ex: mock_llm_server.py).")
+    parser.add_argument("--api_key", default=None)
+    parser.add_argument("--cache", type=Path, default=DEFAULT_CACHE)
+    parser.add_argument("--parquet_root", type=Path, default=None,
+                        help="Lire depuis le dataset Parquet partitionné de getDataHuggingFace.py")
+    args = parser.parse_args()
+
+    for task in args.task:
+        run(task, args.backend, args.model, run_name=args.run_name, varieties=args.variety,
+            n_samples=args.n_samples, temperature=args.temperature, concurrency=args.concurrency,
+            rate=args.rate, url=args.url, api_key=args.api_key, cache_path=args.cache,
+            parquet_root=args.parquet_root, max_tokens=args.max_tokens, system=args.system, stream=args.stream)